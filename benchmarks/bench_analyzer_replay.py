@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# bench_analyzer_replay.py
+#
+# Analyzer and formatter overhead at large scale, with git replaced by a ReplayExecutor
+# (git_executor) serving synthetic `git diff` / `git check-attr` output in-process.
+# No repository and no git processes are needed, so the timings contain only parsing,
+# analysis and formatting.
+#
+# Usage:
+#   python3 benchmarks/bench_analyzer_replay.py [--files N]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from git_executor import ReplayExecutor, use_executor  # noqa: E402
+from file_attributes import ATTRIBUTE_NAMES, read_file_attributes  # noqa: E402
+from staged_files import read_staged_files  # noqa: E402
+from change_analyzer import IncrementalAnalyzer  # noqa: E402
+from message_formatter import format_message  # noqa: E402
+
+ZERO_SHA = '0' * 40
+DIFF_ARGS = ['git', 'diff', '--cached', '--raw', '--numstat', '-z', '--no-abbrev']
+CHECK_ATTR_ARGS = ['git', 'check-attr', '--cached', '--stdin', '-z'] + list(ATTRIBUTE_NAMES)
+TOPLEVEL_ARGS = ['git', 'rev-parse', '--show-toplevel', '--absolute-git-dir']
+CONFIG_ARGS = ['git', 'config', '-z', '--get-regexp', r'^cmsg\.']
+
+
+def file_path(i):
+    kind = ('src', 'tests', 'docs', 'config')[i % 4]
+    extension = ('.py', '.py', '.md', '.yml')[i % 4]
+    return f"packages/pkg{i % 500}/{kind}/module_{i}{extension}"
+
+
+def make_diff_output(file_count):
+    """Builds synthetic `git diff --cached --raw --numstat -z` output for file_count files."""
+    raw = []
+    numstat = []
+    for i in range(file_count):
+        path = file_path(i)
+        status = 'A' if i % 3 == 0 else 'M'
+        raw.append(f":100644 100644 {ZERO_SHA} {ZERO_SHA} {status}\0{path}\0")
+        numstat.append(f"{i % 97}\t{i % 13}\t{path}\0")
+    return "".join(raw) + "".join(numstat)
+
+
+def make_check_attr_output(file_count):
+    """
+    Synthetic `git check-attr -z` output marking every 10th file linguist-generated.
+    Rows for unspecified attributes are omitted to keep the fixture small.
+    """
+    return "".join(f"{file_path(i)}\0linguist-generated\0set\0" for i in range(0, file_count, 10))
+
+
+def timed(label, function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    print(f"{label:<28}{time.perf_counter() - start:>10.3f}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time analyzer and formatter stages against replayed git output.")
+    parser.add_argument('--files', type=int, default=1_000_000, help="Number of staged files (default: 1000000).")
+    args = parser.parse_args()
+
+    executor = ReplayExecutor(entries=[
+        {'args': DIFF_ARGS, 'stdout': make_diff_output(args.files), 'returncode': 0},
+        # check-attr runs from the work tree root; the replayed process never uses the directory
+        {'args': TOPLEVEL_ARGS, 'stdout': '/replay\n/replay/.git\n', 'returncode': 0},
+        {'args': CHECK_ATTR_ARGS, 'stdout': make_check_attr_output(args.files), 'returncode': 0},
+        {'args': CONFIG_ARGS, 'stdout': '', 'returncode': 1},  # no cmsg.* settings
+    ])
+
+    print(f"{args.files} staged files (replayed git)")
+    print(f"{'stage':<28}{'time s':>10}")
+    with use_executor(executor):
+        staged = timed("read_staged_files", read_staged_files)
+        attributes = timed("read_file_attributes", read_file_attributes, staged.paths)
+        analyzer = timed("IncrementalAnalyzer", IncrementalAnalyzer, staged, attributes=attributes)
+        suggestion = timed("suggestions", analyzer.suggestions)
+        commit_data = dict(suggestion, body='', issues='')
+        timed("format_message", format_message, commit_data, staged, 'en')
+    if executor.misses:
+        print(f"unexpected git calls (not replayed): {executor.misses}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
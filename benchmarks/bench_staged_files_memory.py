@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# bench_staged_files_memory.py
+#
+# Memory benchmark: columnar StagedFiles vs. the previous list of per-file dicts
+# (analysis['file_operations']), measured with tracemalloc on a synthetic changeset.
+#
+# Usage:
+#   python3 benchmarks/bench_staged_files_memory.py [--files N]
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from staged_files import StagedFiles, OPERATION_NAMES, classify_operation  # noqa: E402
+
+ZERO_SHA = '0' * 40
+
+
+def make_diff_output(file_count):
+    """Builds synthetic `git diff --cached --raw --numstat -z` output for file_count files."""
+    raw = []
+    numstat = []
+    for i in range(file_count):
+        path = f"packages/pkg{i % 500}/src/generated/module_{i}.py"
+        status = 'A' if i % 3 == 0 else 'M'
+        raw.append(f":100644 100644 {ZERO_SHA} {ZERO_SHA} {status}\0{path}\0")
+        numstat.append(f"{i % 97}\t{i % 13}\t{path}\0")
+    return "".join(raw) + "".join(numstat)
+
+
+def build_dict_records(output):
+    """The previous representation: one five-key dict per file."""
+    staged = StagedFiles.from_diff_output(output)  # parsing only; released before the peak is read
+    records = []
+    for i, path in enumerate(staged.paths):
+        additions = staged.additions[i]
+        deletions = staged.deletions[i]
+        is_new = staged.status(i) == 'A'
+        records.append({
+            'path': path,
+            'operation': OPERATION_NAMES[classify_operation(staged.status(i), additions, deletions)],
+            'additions': additions,
+            'deletions': deletions,
+            'is_new': is_new
+        })
+    del staged
+    return records
+
+
+def measure(label, builder, output):
+    """Runs builder(output) under tracemalloc and prints peak / retained memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = builder(output)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22}{peak / 2**20:>12.1f}{retained / 2**20:>14.1f}{elapsed:>10.2f}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory use of StagedFiles and per-file dicts.")
+    parser.add_argument('--files', type=int, default=500_000, help="Number of staged files (default: 500000).")
+    args = parser.parse_args()
+
+    output = make_diff_output(args.files)
+    print(f"{args.files} staged files")
+    print(f"{'representation':<22}{'peak MiB':>12}{'retained MiB':>14}{'time s':>10}")
+    records = measure("dict per file", build_dict_records, output)
+    del records
+    measure("StagedFiles (columns)", StagedFiles.from_diff_output, output)
+
+
+if __name__ == "__main__":
+    main()
@@ -47,6 +47,23 @@ echo "ساخت فایل اجرایی با PyInstaller..."
 pyinstaller --onefile git_cmsg.py
 echo "ساخت PyInstaller کامل شد."
 
+# 3.1. ساخت نسخه سریع (onedir بدون UPX) از روی git_cmsg_fast.spec
+# این نسخه در هر اجرا خودش را در پوشه موقت باز نمی‌کند و برای CI و استفاده مکرر مناسب‌تر است
+echo "ساخت نسخه سریع (onedir) با PyInstaller..."
+pyinstaller --noconfirm git_cmsg_fast.spec
+echo "ساخت نسخه سریع کامل شد."
+
+# 3.2. مقایسه زمان شروع سرد و گرم دو نسخه
+# با تعیین STARTUP_BUDGET_MS، اگر شروع سرد نسخه سریع از این بودجه بیشتر شود، ساخت متوقف می‌شود
+echo "اندازه‌گیری زمان شروع (cold/warm) نسخه‌ها..."
+BENCH_ARGS=(--runs "${STARTUP_BENCH_RUNS:-20}")
+if [ -n "$STARTUP_BUDGET_MS" ]; then
+  BENCH_ARGS+=(--budget-ms "$STARTUP_BUDGET_MS" --budget-build fast)
+fi
+python3 build-scripts/startup_bench.py "${BENCH_ARGS[@]}" \
+    onefile=dist/git_cmsg \
+    fast=dist/git_cmsg_fast/git_cmsg
+
 # --- 4. ایجاد ساختار موقت برای اسکریپت های نصاب لینوکس ---
 echo "Creating temporary structure for Linux installer scripts..."
 LINUX_PACKAGING_DIR="linux_packaging"
@@ -149,6 +166,11 @@ fpm -s dir -t rpm \
 
 echo ".rpm package built."
 
+# بسته‌بندی نسخه سریع به صورت tarball (پوشه کامل onedir)
+echo "Building fast-start tarball..."
+tar -C dist -czf "$RELEASES_DIR/git-cmsg-fast_${VERSION#v}_linux_amd64.tar.gz" git_cmsg_fast
+echo "Fast-start tarball built."
+
 # 7. پاکسازی فایل های موقت
 echo "Cleaning up build artifacts..."
 rm -rf build/
@@ -159,4 +181,4 @@ rm -rf "$LINUX_PACKAGING_DIR" # پاکسازی پوشه موقت اسکریپت
 echo "Cleanup complete."
 
 echo "Linux package build process finished."
-echo "Packages (.deb, .rpm) are in the '$RELEASES_DIR' directory in the project root."
\ No newline at end of file
+echo "Packages (.deb, .rpm, fast-start .tar.gz) are in the '$RELEASES_DIR' directory in the project root."
\ No newline at end of file
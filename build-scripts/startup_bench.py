@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# startup_bench.py
+#
+# Cold-start / warm-start timing harness for git-cmsg builds.
+# Runs each binary with `--version` (which exits before any git work), so the
+# measured time is pure startup: bootloader, unpacking, interpreter and imports.
+#
+# Usage:
+#   python3 build-scripts/startup_bench.py [--runs N] [--budget-ms MS [--budget-build NAME]] NAME=PATH [...]
+#
+# Example (as run by build_linux.sh):
+#   python3 build-scripts/startup_bench.py onefile=dist/git_cmsg fast=dist/git_cmsg_fast/git_cmsg
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DROP_CACHES_PATH = '/proc/sys/vm/drop_caches'
+
+
+def drop_page_cache():
+    """
+    Tries to drop the OS page cache so the next run is a real cold start.
+    Only possible as root on Linux; returns False otherwise.
+    """
+    try:
+        subprocess.run(['sync'], check=False)
+        with open(DROP_CACHES_PATH, 'w') as f:
+            f.write('3\n')
+        return True
+    except (OSError, PermissionError):
+        return False
+
+
+def time_run(binary_path):
+    """Runs the binary once and returns the wall time in milliseconds."""
+    start = time.perf_counter()
+    result = subprocess.run([binary_path, '--version'], capture_output=True)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"{binary_path} --version exited with {result.returncode}: "
+            f"{result.stderr.decode(errors='replace').strip()}")
+    return elapsed_ms
+
+
+def measure(binary_path, runs):
+    """
+    Measures one cold run followed by `runs` warm runs.
+
+    Returns:
+        dict: cold, warm p50/p95/min in milliseconds and whether the cache was really dropped.
+    """
+    cache_dropped = drop_page_cache()
+    cold_ms = time_run(binary_path)
+    warm = sorted(time_run(binary_path) for _ in range(runs))
+    p95_index = max(0, int(round(len(warm) * 0.95)) - 1)
+    return {
+        'cold': cold_ms,
+        'cache_dropped': cache_dropped,
+        'warm_p50': statistics.median(warm),
+        'warm_p95': warm[p95_index],
+        'warm_min': warm[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cold/warm startup time of git-cmsg builds.")
+    parser.add_argument('builds', nargs='+', metavar='NAME=PATH',
+                        help="Build label and path to its executable.")
+    parser.add_argument('--runs', type=int, default=20, help="Number of warm runs per build (default: 20).")
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help="Fail (exit 1) if a checked build's cold start exceeds this budget.")
+    parser.add_argument('--budget-build', action='append', default=None, metavar='NAME',
+                        help="Build(s) the budget applies to (default: all builds).")
+    args = parser.parse_args()
+
+    builds = []
+    for item in args.builds:
+        name, sep, path = item.partition('=')
+        if not sep:
+            name, path = os.path.basename(item), item
+        if not os.access(path, os.X_OK):
+            print(f"Error: '{path}' is not an executable file.", file=sys.stderr)
+            sys.exit(1)
+        builds.append((name, path))
+
+    print(f"{'build':<12}{'cold ms':>10}{'warm p50':>10}{'warm p95':>10}{'warm min':>10}")
+    results = {}
+    all_caches_dropped = True
+    for name, path in builds:
+        stats = measure(path, args.runs)
+        results[name] = stats
+        all_caches_dropped = all_caches_dropped and stats['cache_dropped']
+        print(f"{name:<12}{stats['cold']:>10.1f}{stats['warm_p50']:>10.1f}"
+              f"{stats['warm_p95']:>10.1f}{stats['warm_min']:>10.1f}")
+
+    if not all_caches_dropped:
+        print("Note: page cache could not be dropped (needs root); 'cold' is the first run only.",
+              file=sys.stderr)
+
+    if args.budget_ms is not None:
+        checked = args.budget_build or list(results)
+        over_budget = [name for name in checked
+                       if name in results and results[name]['cold'] > args.budget_ms]
+        if over_budget:
+            print(f"Startup budget of {args.budget_ms:.0f} ms exceeded by: {', '.join(over_budget)}",
+                  file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
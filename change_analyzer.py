@@ -1,144 +1,360 @@
 # change_analyzer.py
 
 import os
-import subprocess
-import sys
 import re
 
+from staged_files import as_staged_files
+from diff_signals import read_diff_signals, WHITESPACE_ONLY, COMMENT_ONLY
+from symbol_diff import read_symbol_changes, summarize_symbol_names
+from submodule_summary import read_submodule_summaries, submodule_subject
+from file_attributes import read_file_attributes, touches_gitattributes
+
+# بیشتر از این تعداد مسیر تغییر یافته، سیگنال‌ها برای کل index دوباره خوانده می‌شوند
+# (تا خط فرمان گیت بیش از حد طولانی نشود؛ تعداد فراخوانی‌ها در هر حال ثابت است)
+SIGNAL_PATHSPEC_LIMIT = 1000
+
 def analyze_staged_changes(staged_files):
     """
     تحلیل تغییرات فایل‌های stage شده و ارائه پیشنهاد برای نوع، محدوده و موضوع کامیت
     
     Args:
-        staged_files (list): لیست فایل‌های stage شده
+        staged_files (StagedFiles | list): فایل‌های stage شده (ساختار ستونی یا لیست مسیرها)
         
     Returns:
         dict: دیکشنری شامل نوع، محدوده و موضوع پیشنهادی برای کامیت
     """
-    # بررسی اینکه آیا تغییرات شامل فایل‌های جدید است یا خیر
-    new_files = [f for f in staged_files if check_if_new_file(f)]
-    
-    # بررسی نوع محتوای فایل‌ها
-    file_types = analyze_file_types(staged_files)
-    
-    # تحلیل تغییرات برای تشخیص نوع کامیت
-    changes_analysis = analyze_file_changes(staged_files)
-    
-    # تعیین نوع کامیت بر اساس تحلیل‌ها
-    suggested_type = determine_commit_type(new_files, file_types, changes_analysis)
-    
-    # پیشنهاد محدوده بر اساس ساختار فایل‌ها
-    suggested_scope = determine_commit_scope(staged_files)
-    
-    # پیشنهاد موضوع کامیت بر اساس تغییرات و محتوا
-    suggested_subject = determine_commit_subject(new_files, file_types, changes_analysis, suggested_type)
-    
-    return {
-        'type': suggested_type,
-        'scope': suggested_scope,
-        'subject': suggested_subject
-    }
+    # ساختار ستونی یک بار ساخته شده و بین همه مراحل مشترک است
+    return analyze_content(as_staged_files(staged_files)).suggestions()
+
+
+def analyze_content(staged_files, stats=None, base=None, attributes=None):
+    """
+    IncrementalAnalyzer با همه مراحل وابسته به محتوا (سیگنال‌های diff، نمادهای پایتون، submodule ها).
+    ویژگی‌های .gitattributes یک بار خوانده می‌شوند (مگر اینکه attributes داده شود) و فایل‌های
+    generated، vendored و باینری به مراحل محتوا داده نمی‌شوند.
+    """
+    if attributes is None:
+        attributes = read_file_attributes(staged_files.paths)
+    excluded = attributes.content_excluded()
+    return IncrementalAnalyzer(staged_files, read_diff_signals(base=base, exclude=excluded),
+                               read_symbol_changes(stats=stats, base=base, exclude=excluded),
+                               read_submodule_summaries(staged_files.gitlinks), base=base,
+                               attributes=attributes)
+
+
+class IncrementalAnalyzer:
+    """
+    نتایج تحلیل را به صورت جمع‌پذیر (accumulator) نگه می‌دارد تا بعد از تغییر index
+    فقط فایل‌های اضافه، حذف یا تغییر یافته دوباره تحلیل شوند.
+
+    هر فایل سهم مستقلی در شمارش نوع فایل‌ها، وزن‌های مسیر، دایرکتوری‌ها و مجموع خطوط دارد؛
+    با کم کردن سهم نسخه قدیمی و اضافه کردن سهم نسخه جدید، نتیجه با تحلیل کامل برابر می‌ماند.
+    """
+
+    def __init__(self, staged_files, signals=None, symbols=None, submodules=None, base=None, attributes=None):
+        """
+        signals (اختیاری) خروجی read_diff_signals است ({مسیر: پرچم‌ها})؛ اگر داده شود،
+        فایل‌های «فقط فاصله‌گذاری» و «فقط توضیح» در وزن‌دهی نوع کامیت شمرده می‌شوند
+        و بعد از refresh برای فایل‌های تغییر یافته دوباره خوانده می‌شود.
+
+        symbols (اختیاری) خروجی read_symbol_changes است ({مسیر: نمادهای تغییر یافته})؛
+        نام توابع و کلاس‌ها به جای "Python" در موضوع پیشنهادی می‌آیند.
+
+        submodules (اختیاری) خروجی read_submodule_summaries است ({مسیر: خلاصه بازه کامیت‌ها})؛
+        تعداد انواع کامیت‌های هر submodule در موضوع پیشنهادی برای جابجایی اشاره‌گرها می‌آید.
+        خود اشاره‌گرها (staged_files.gitlinks) همیشه، حتی بدون خلاصه، شمرده می‌شوند.
+
+        base (اختیاری) کامیت مبنای diff است (مثلاً HEAD^ برای --amend)؛ در refresh هم استفاده می‌شود.
+
+        attributes (اختیاری) خروجی read_file_attributes است؛ فایل‌های generated و vendored در هیچ
+        شمارنده‌ای (نوع، مسیر، دایرکتوری، خطوط) سهم ندارند و linguist-language جای پسوند را می‌گیرد.
+        در refresh ویژگی فایل‌های جدید خوانده می‌شود.
+        """
+        self.staged = staged_files
+        self.signals = signals
+        self.symbols = symbols
+        self.submodules = submodules
+        self.base = base
+        self.attributes = attributes
+        self._reset_counters()
+        for index, path in enumerate(staged_files.paths):
+            self._account(path, staged_files.status(index),
+                          staged_files.additions[index], staged_files.deletions[index], 1)
+
+    def _reset_counters(self):
+        self.whitespace_only = 0
+        self.comment_only = 0
+        self.file_symbols = {}  # نمادهای تغییر یافته فایل‌هایی که در snapshot فعلی هستند
+        self.file_types = dict.fromkeys(FILE_TYPE_KEYS, 0)
+        self.path_hints = {}
+        self.directories = {}
+        self.new_files = {}  # dict به عنوان مجموعه مرتب مسیرهای جدید
+        self.total_additions = 0
+        self.total_deletions = 0
+
+    def _account(self, path, status, additions, deletions, sign):
+        """سهم یک فایل را به شمارنده‌ها اضافه (sign=1) یا از آن‌ها کم (sign=-1) می‌کند."""
+        extension = None
+        if self.attributes:
+            if not self.attributes.is_weighted(path):
+                return  # generated یا vendored: diff بزرگ آن نباید پیشنهادها را منحرف کند
+            extension = self.attributes.language_extension(path)
+        for key, amount in classify_file_type(path, extension):
+            self.file_types[key] += amount * sign
+        hint = path_type_hint(path)
+        if hint:
+            self.path_hints[hint] = self.path_hints.get(hint, 0) + sign
+            if self.path_hints[hint] == 0:
+                del self.path_hints[hint]
+        top_directory = get_top_directory(path)
+        if top_directory:
+            self.directories[top_directory] = self.directories.get(top_directory, 0) + sign
+            if self.directories[top_directory] == 0:
+                del self.directories[top_directory]
+        if status == 'A':
+            if sign > 0:
+                self.new_files[path] = None
+            else:
+                self.new_files.pop(path, None)
+        self.total_additions += additions * sign
+        self.total_deletions += deletions * sign
+        if self.symbols and path in self.symbols:
+            if sign > 0:
+                self.file_symbols[path] = self.symbols[path]
+            else:
+                self.file_symbols.pop(path, None)
+        flags = self.signals.get(path, 0) if self.signals else 0
+        if flags & WHITESPACE_ONLY:
+            self.whitespace_only += sign
+        elif flags & COMMENT_ONLY:
+            self.comment_only += sign
+
+    def _refresh_signals(self, paths):
+        """پرچم‌های فایل‌های paths را دوباره می‌خواند (با تعداد ثابت فراخوانی گیت)."""
+        for path in paths:
+            self.signals.pop(path, None)
+        excluded = self._content_excluded()
+        if len(paths) > SIGNAL_PATHSPEC_LIMIT:
+            fresh = read_diff_signals(base=self.base, exclude=excluded)
+            self.signals.update((path, fresh[path]) for path in paths if path in fresh)
+        else:
+            self.signals.update(read_diff_signals(paths, base=self.base, exclude=excluded))
+
+    def apply_snapshot(self, new_staged):
+        """
+        snapshot جدید index را با snapshot فعلی مقایسه کرده و فقط ورودی‌های متفاوت را دوباره تحلیل می‌کند.
+
+        Returns:
+            dict: لیست مسیرهای 'added'، 'removed' و 'changed'.
+        """
+        old = self.staged
+        old_positions = {path: index for index, path in enumerate(old.paths)}
+        added, changed = [], []
+        new_indices = []  # ورودی‌هایی که سهم نسخه جدیدشان باید اضافه شود
+
+        for index, path in enumerate(new_staged.paths):
+            old_index = old_positions.pop(path, None)
+            # شناسه blob هم مقایسه می‌شود: محتوای جدید با همان تعداد خطوط هم تغییر است
+            record = (new_staged.statuses[index], new_staged.additions[index], new_staged.deletions[index],
+                      new_staged.blob(index))
+            if old_index is None:
+                added.append(path)
+                new_indices.append(index)
+            elif record != (old.statuses[old_index], old.additions[old_index], old.deletions[old_index],
+                            old.blob(old_index)):
+                changed.append(path)
+                new_indices.append(index)
+                self._account(path, old.status(old_index), old.additions[old_index], old.deletions[old_index], -1)
+
+        # هر چه در old_positions مانده از index حذف شده است
+        removed = list(old_positions)
+        if self.attributes is not None and touches_gitattributes(added + changed + removed):
+            # ویژگی هر فایلی ممکن است عوض شده باشد: همه چیز با ویژگی‌های تازه از نو شمرده می‌شود
+            self._recount(new_staged)
+            return {'added': added, 'removed': removed, 'changed': changed}
+        for path in removed:
+            old_index = old_positions[path]
+            self._account(path, old.status(old_index), old.additions[old_index], old.deletions[old_index], -1)
+        if self.attributes is not None:
+            self.attributes.update(read_file_attributes(added), added + removed)
+
+        # سهم قدیمی با پرچم‌های قدیمی کم شد؛ حالا پرچم‌ها بروز و سهم جدید اضافه می‌شود
+        if self.signals is not None:
+            for path in removed:
+                self.signals.pop(path, None)
+            if added or changed:
+                self._refresh_signals(added + changed)
+        if self.symbols is not None and (added or changed):
+            # blob های قبلی از کش خوانده می‌شوند، پس فقط فایل‌های تغییر یافته واقعاً parse می‌شوند
+            self.symbols = read_symbol_changes(base=self.base, exclude=self._content_excluded())
+        if self.submodules is not None and new_staged.gitlinks != old.gitlinks:
+            # خلاصه submodule هایی که SHA آن‌ها تغییر نکرده دوباره استفاده می‌شود
+            self.submodules = read_submodule_summaries(new_staged.gitlinks, self.submodules)
+        for index in new_indices:
+            self._account(new_staged.paths[index], new_staged.status(index),
+                          new_staged.additions[index], new_staged.deletions[index], 1)
+
+        self.staged = new_staged
+        return {'added': added, 'removed': removed, 'changed': changed}
+
+    def weighted_files(self):
+        """فایل‌هایی که در وزن‌دهی نوع و محدوده شمرده می‌شوند (همه فایل‌ها اگر همه generated باشند)."""
+        if not self.attributes or not self.attributes.flags:
+            return self.staged
+        indices = [index for index, path in enumerate(self.staged.paths) if self.attributes.is_weighted(path)]
+        if not indices or len(indices) == len(self.staged):
+            return self.staged
+        return self.staged.select(indices)
+
+    def _content_excluded(self):
+        return self.attributes.content_excluded() if self.attributes else ()
+
+    def _recount(self, new_staged):
+        """ویژگی‌ها، سیگنال‌ها و نمادها را برای کل snapshot دوباره می‌خواند و شمارنده‌ها را از نو می‌سازد."""
+        self.attributes = read_file_attributes(new_staged.paths)
+        if self.signals is not None:
+            self.signals = read_diff_signals(base=self.base, exclude=self._content_excluded())
+        if self.symbols is not None:
+            self.symbols = read_symbol_changes(base=self.base, exclude=self._content_excluded())
+        if self.submodules is not None and new_staged.gitlinks != self.staged.gitlinks:
+            self.submodules = read_submodule_summaries(new_staged.gitlinks, self.submodules)
+        self.staged = new_staged
+        self._reset_counters()
+        for index, path in enumerate(new_staged.paths):
+            self._account(path, new_staged.status(index),
+                          new_staged.additions[index], new_staged.deletions[index], 1)
+
+    def suggestions(self):
+        """پیشنهاد نوع، محدوده و موضوع را از شمارنده‌های فعلی محاسبه می‌کند."""
+        new_files = list(self.new_files)
+        file_types = dict(self.file_types)
+        # فایل‌های generated و vendored در نسبت‌ها (مثلاً «همه فایل‌ها جدیدند») و محدوده هم شمرده نمی‌شوند
+        weighted = self.weighted_files()
+        changes_analysis = {
+            'total_additions': self.total_additions,
+            'total_deletions': self.total_deletions,
+            'files': weighted,
+            'change_type': classify_change_type(self.total_additions, self.total_deletions),
+            'whitespace_only_files': self.whitespace_only,
+            'comment_only_files': self.comment_only,
+            'symbol_names': summarize_symbol_names(self.file_symbols),
+            'submodule_files': len(weighted.gitlinks)
+        }
+        if self.staged.gitlinks and len(self.staged.gitlinks) == len(self.staged):
+            # فقط اشاره‌گرهای submodule جابجا شده‌اند
+            changes_analysis['submodule_subject'] = submodule_subject(self.staged.gitlinks, self.submodules or {})
+        suggested_type = determine_commit_type(new_files, file_types, changes_analysis, self.path_hints)
+        return {
+            'type': suggested_type,
+            'scope': determine_commit_scope(weighted, self.directories),
+            'subject': determine_commit_subject(new_files, file_types, changes_analysis, suggested_type)
+        }
+
+
+# حداکثر تعداد محدوده‌های ممکن که rank_scope_candidates برمی‌گرداند
+SCOPE_CANDIDATE_LIMIT = 10
+
+# کلیدهای شمارش نوع فایل‌ها
+FILE_TYPE_KEYS = (
+    'python',  # .py
+    'document',  # .md, .txt, etc.
+    'config',  # .json, .yaml, .ini, etc.
+    'style',  # .css, .scss, etc.
+    'script',  # .sh, .js, etc.
+    'test',  # test_ files
+    'ui',  # UI related files
+    'data',  # .csv, .xml, etc.
+)
 
 def analyze_file_types(staged_files):
     """تحلیل نوع فایل‌ها بر اساس پسوند و محتوا"""
-    file_types = {
-        'python': 0,  # .py
-        'document': 0,  # .md, .txt, etc.
-        'config': 0,  # .json, .yaml, .ini, etc.
-        'style': 0,  # .css, .scss, etc.
-        'script': 0,  # .sh, .js, etc.
-        'test': 0,  # test_ files
-        'ui': 0,  # UI related files
-        'data': 0,  # .csv, .xml, etc.
-    }
+    file_types = dict.fromkeys(FILE_TYPE_KEYS, 0)
     
     for file_path in staged_files:
-        filename = os.path.basename(file_path)
-        ext = os.path.splitext(filename)[1].lower()
+        for key, amount in classify_file_type(file_path):
+            file_types[key] += amount
+    
+    return file_types
+
+def classify_file_type(file_path, extension=None):
+    """
+    سهم یک فایل در شمارش نوع فایل‌ها را به صورت لیست (کلید، مقدار) برمی‌گرداند
+    extension (اختیاری) پسوند زبان از linguist-language است و جای پسوند واقعی فایل را می‌گیرد.
+    """
+    contributions = []
+    filename = os.path.basename(file_path)
+    ext = extension or os.path.splitext(filename)[1].lower()
+    
+    # Check Python files
+    if ext == '.py':
+        contributions.append(('python', 1))
+        # Check if it's a test file
+        if 'test_' in filename or '_test' in filename or 'tests/' in file_path:
+            contributions.append(('test', 2))  # Give higher weight to test files
+    
+    # Check document files
+    elif ext in ['.md', '.txt', '.rst', '.adoc']:
+        contributions.append(('document', 1))
+        
+    # Check config files
+    elif ext in ['.json', '.yaml', '.yml', '.ini', '.toml', '.conf']:
+        contributions.append(('config', 1))
+        
+    # Check style files
+    elif ext in ['.css', '.scss', '.less', '.sass']:
+        contributions.append(('style', 1))
         
-        # Check Python files
-        if ext == '.py':
-            file_types['python'] += 1
-            # Check if it's a test file
-            if 'test_' in filename or '_test' in filename or 'tests/' in file_path:
-                file_types['test'] += 2  # Give higher weight to test files
+    # Check script files
+    elif ext in ['.sh', '.bash', '.js', '.ts']:
+        contributions.append(('script', 1))
         
-        # Check document files
-        elif ext in ['.md', '.txt', '.rst', '.adoc']:
-            file_types['document'] += 1
-            
-        # Check config files
-        elif ext in ['.json', '.yaml', '.yml', '.ini', '.toml', '.conf']:
-            file_types['config'] += 1
-            
-        # Check style files
-        elif ext in ['.css', '.scss', '.less', '.sass']:
-            file_types['style'] += 1
-            
-        # Check script files
-        elif ext in ['.sh', '.bash', '.js', '.ts']:
-            file_types['script'] += 1
-            
-        # Check data files
-        elif ext in ['.csv', '.xml', '.json', '.sql']:
-            file_types['data'] += 1
-            
-        # Check if file is likely UI related
-        if 'ui' in file_path.lower() or 'interface' in file_path.lower() or 'view' in file_path.lower():
-            file_types['ui'] += 1
+    # Check data files
+    elif ext in ['.csv', '.xml', '.json', '.sql']:
+        contributions.append(('data', 1))
+        
+    # Check if file is likely UI related
+    lower_path = file_path.lower()
+    if 'ui' in lower_path or 'interface' in lower_path or 'view' in lower_path:
+        contributions.append(('ui', 1))
     
-    return file_types
+    return contributions
 
 def analyze_file_changes(staged_files):
     """تحلیل تغییرات در فایل‌ها برای تشخیص نوع عملیات"""
+    # آمار هر فایل و نوع عملیات آن در ستون‌های StagedFiles است (بدون dict برای هر فایل)
+    staged_files = as_staged_files(staged_files)
     analysis = {
-        'total_additions': 0,
-        'total_deletions': 0,
-        'file_operations': [],  # اطلاعات تغییرات هر فایل
+        'total_additions': staged_files.total_additions(),
+        'total_deletions': staged_files.total_deletions(),
+        'files': staged_files,  # اطلاعات تغییرات هر فایل (ساختار ستونی)
         'change_type': 'neutral'  # 'add', 'remove', 'modify', یا 'neutral'
     }
     
-    for file_path in staged_files:
-        additions, deletions = get_diff_stats(file_path)
-        is_new = check_if_new_file(file_path)
-        
-        analysis['total_additions'] += additions
-        analysis['total_deletions'] += deletions
-        
-        # تعیین نوع تغییر برای هر فایل
-        if is_new:
-            file_op = 'add'
-        elif deletions > additions * 2:
-            file_op = 'remove'
-        elif additions > deletions * 2:
-            file_op = 'enhance'
-        else:
-            file_op = 'modify'
-            
-        analysis['file_operations'].append({
-            'path': file_path,
-            'operation': file_op,
-            'additions': additions,
-            'deletions': deletions,
-            'is_new': is_new
-        })
-    
     # تعیین نوع کلی تغییرات
-    if analysis['total_additions'] > 0 and analysis['total_deletions'] == 0:
-        analysis['change_type'] = 'add'
-    elif analysis['total_deletions'] > 0 and analysis['total_additions'] == 0:
-        analysis['change_type'] = 'remove'
-    elif analysis['total_additions'] > analysis['total_deletions'] * 2:
-        analysis['change_type'] = 'enhance'
-    elif analysis['total_deletions'] > analysis['total_additions'] * 2:
-        analysis['change_type'] = 'refactor'
-    else:
-        analysis['change_type'] = 'modify'
+    analysis['change_type'] = classify_change_type(analysis['total_additions'], analysis['total_deletions'])
         
     return analysis
 
-def determine_commit_type(new_files, file_types, changes_analysis):
-    """تعیین نوع کامیت بر اساس تحلیل‌های مختلف"""
+def classify_change_type(total_additions, total_deletions):
+    """نوع کلی تغییرات را از مجموع خطوط اضافه و حذف شده تعیین می‌کند"""
+    if total_additions > 0 and total_deletions == 0:
+        return 'add'
+    elif total_deletions > 0 and total_additions == 0:
+        return 'remove'
+    elif total_additions > total_deletions * 2:
+        return 'enhance'
+    elif total_deletions > total_additions * 2:
+        return 'refactor'
+    else:
+        return 'modify'
+
+def determine_commit_type(new_files, file_types, changes_analysis, path_hints=None):
+    """
+    تعیین نوع کامیت بر اساس تحلیل‌های مختلف
+
+    path_hints (اختیاری) شمارش از پیش محاسبه شده path_type_hint برای همه فایل‌هاست
+    (IncrementalAnalyzer آن را به صورت افزایشی نگه می‌دارد).
+    """
     # وزن‌دهی برای هر نوع کامیت بر اساس تحلیل‌ها
     type_weights = {
         'feat': 0,
@@ -152,7 +368,7 @@ def determine_commit_type(new_files, file_types, changes_analysis):
     
     # افزایش وزن بر اساس فایل‌های جدید
     if len(new_files) > 0:
-        if len(new_files) == len(changes_analysis['file_operations']):
+        if len(new_files) == len(changes_analysis['files']):
             # اگر همه فایل‌ها جدید باشند
             type_weights['feat'] += 3
         else:
@@ -171,6 +387,25 @@ def determine_commit_type(new_files, file_types, changes_analysis):
     
     if file_types['config'] > 0:
         type_weights['chore'] += file_types['config']
+
+    # جابجایی اشاره‌گر submodule ها (gitlink) نگهداری وابستگی‌هاست
+    submodule_files = changes_analysis.get('submodule_files', 0)
+    if submodule_files > 0:
+        type_weights['chore'] += submodule_files * 2
+        if submodule_files == len(changes_analysis['files']):
+            type_weights['chore'] += 3
+
+    # فایل‌هایی که فقط فاصله‌گذاری یا فقط توضیحات آن‌ها تغییر کرده (diff_signals)
+    whitespace_only = changes_analysis.get('whitespace_only_files', 0)
+    comment_only = changes_analysis.get('comment_only_files', 0)
+    if whitespace_only > 0:
+        type_weights['style'] += whitespace_only * 2
+        if whitespace_only == len(changes_analysis['files']):
+            type_weights['style'] += 3  # کل تغییرات یک reformat است
+    if comment_only > 0:
+        type_weights['docs'] += comment_only * 2
+        if comment_only == len(changes_analysis['files']):
+            type_weights['docs'] += 3  # فقط توضیحات و docstring ها تغییر کرده‌اند
     
     # افزایش وزن بر اساس نوع تغییرات
     if changes_analysis['change_type'] == 'add':
@@ -185,21 +420,15 @@ def determine_commit_type(new_files, file_types, changes_analysis):
     elif changes_analysis['change_type'] == 'modify':
         type_weights['fix'] += 2
     
-    # بررسی پسوند فایل‌ها برای تشخیص نوع تغییرات
-    for file_op in changes_analysis['file_operations']:
-        filepath = file_op['path']
-        # بررسی اگر فایل به تست‌ها مربوط است
-        if 'test' in filepath or 'spec' in filepath:
-            type_weights['test'] += 1
-        # بررسی اگر فایل به داکیومنت مربوط است
-        elif 'doc' in filepath or 'README' in filepath or 'CHANGELOG' in filepath:
-            type_weights['docs'] += 1
-        # بررسی اگر فایل به استایل مربوط است
-        elif 'style' in filepath or 'css' in filepath:
-            type_weights['style'] += 1
-        # بررسی اگر فایل به تنظیمات مربوط است
-        elif 'config' in filepath or '.json' in filepath or '.yml' in filepath:
-            type_weights['chore'] += 1
+    # بررسی مسیر فایل‌ها برای تشخیص نوع تغییرات
+    if path_hints is None:
+        path_hints = {}
+        for filepath in changes_analysis['files']:
+            hint = path_type_hint(filepath)
+            if hint:
+                path_hints[hint] = path_hints.get(hint, 0) + 1
+    for type_name, count in path_hints.items():
+        type_weights[type_name] += count
     
     # تعیین نوع کامیت با بیشترین وزن
     max_weight = 0
@@ -213,7 +442,7 @@ def determine_commit_type(new_files, file_types, changes_analysis):
     # اگر نتوانستیم به یک نتیجه مشخص برسیم
     if max_weight == 0:
         # برای حالت‌های خاص
-        if len(changes_analysis['file_operations']) <= 3:
+        if len(changes_analysis['files']) <= 3:
             # برای تغییرات کوچک
             suggested_type = 'fix'
         else:
@@ -222,18 +451,43 @@ def determine_commit_type(new_files, file_types, changes_analysis):
     
     return suggested_type
 
-def determine_commit_scope(staged_files):
-    """تعیین محدوده کامیت بر اساس ساختار فایل‌ها"""
+def path_type_hint(filepath):
+    """نوع کامیتی که مسیر فایل به آن اشاره دارد (یا None)"""
+    # بررسی اگر فایل به تست‌ها مربوط است
+    if 'test' in filepath or 'spec' in filepath:
+        return 'test'
+    # بررسی اگر فایل به داکیومنت مربوط است
+    elif 'doc' in filepath or 'README' in filepath or 'CHANGELOG' in filepath:
+        return 'docs'
+    # بررسی اگر فایل به استایل مربوط است
+    elif 'style' in filepath or 'css' in filepath:
+        return 'style'
+    # بررسی اگر فایل به تنظیمات مربوط است
+    elif 'config' in filepath or '.json' in filepath or '.yml' in filepath:
+        return 'chore'
+    return None
+
+def get_top_directory(file_path):
+    """دایرکتوری سطح اول یک مسیر را برمی‌گرداند (برای فایل‌های ریشه None)"""
+    parts = os.path.normpath(file_path).split(os.sep)
+    if len(parts) > 1 and parts[0]:
+        return parts[0]
+    return None
+
+def determine_commit_scope(staged_files, directories=None):
+    """
+    تعیین محدوده کامیت بر اساس ساختار فایل‌ها
+
+    directories (اختیاری) شمارش از پیش محاسبه شده دایرکتوری‌های سطح اول است.
+    """
     # جمع‌آوری اطلاعات مسیر فایل‌ها
-    directories = {}
-    
-    for file_path in staged_files:
-        parts = os.path.normpath(file_path).split(os.sep)
-        
-        # بررسی دایرکتوری اصلی
-        if len(parts) > 1 and parts[0]:
-            dir_name = parts[0]
-            directories[dir_name] = directories.get(dir_name, 0) + 1
+    if directories is None:
+        directories = {}
+        for file_path in staged_files:
+            # بررسی دایرکتوری اصلی
+            dir_name = get_top_directory(file_path)
+            if dir_name:
+                directories[dir_name] = directories.get(dir_name, 0) + 1
     
     # اگر همه فایل‌ها در یک دایرکتوری هستند
     if len(directories) == 1 and len(directories) == len(staged_files):
@@ -260,6 +514,24 @@ def determine_commit_scope(staged_files):
     # اگر نتوانستیم محدوده مناسبی پیدا کنیم
     return ""
 
+def rank_scope_candidates(staged_files, suggested_scope="", limit=SCOPE_CANDIDATE_LIMIT):
+    """
+    محدوده‌های ممکن به ترتیب اولویت: محدوده پیشنهادی اول، سپس دایرکتوری‌ها (و مسیرهای تجمعی آن‌ها)
+    بر اساس تعداد فایل‌های stage شده زیر هر کدام؛ در تعداد برابر، مسیر کوتاه‌تر اول می‌آید.
+    (مسیرهای گیت همیشه با '/' جدا می‌شوند.)
+    """
+    counts = {}
+    for file_path in staged_files:
+        parts = file_path.split('/')[:-1]
+        for depth in range(1, len(parts) + 1):
+            scope = '/'.join(parts[:depth])
+            counts[scope] = counts.get(scope, 0) + 1
+    ranked = sorted(counts, key=lambda scope: (-counts[scope], scope.count('/'), scope))
+    if suggested_scope:
+        ranked = [suggested_scope] + [scope for scope in ranked if scope != suggested_scope]
+    return ranked[:limit]
+
+
 def find_common_prefix(file_paths):
     """پیدا کردن پیشوند مشترک در نام فایل‌ها"""
     filenames = [os.path.basename(path) for path in file_paths]
@@ -267,19 +539,17 @@ def find_common_prefix(file_paths):
     # حذف پسوندها
     names_without_ext = [os.path.splitext(name)[0] for name in filenames]
     
-    # پیدا کردن پیشوندهای مشترک
-    prefixes = []
-    
+    # شمارش همه پیشوندها در یک گذر (به جای شمارش دوباره همه نام‌ها برای هر پیشوند)
+    prefix_counts = {}
     for name in names_without_ext:
-        for i in range(3, len(name) + 1):
-            prefix = name[:i].lower()
-            if len(prefix) < 3:  # پیشوندهای خیلی کوتاه را نادیده بگیر
-                continue
-                
-            prefix_count = sum(1 for n in names_without_ext if n.lower().startswith(prefix))
-            
-            if prefix_count >= len(names_without_ext) * 0.5:  # اگر حداقل 50٪ فایل‌ها این پیشوند را داشته باشند
-                prefixes.append((prefix, prefix_count))
+        lower_name = name.lower()
+        for i in range(3, len(lower_name) + 1):  # پیشوندهای کوتاه‌تر از 3 حرف نادیده گرفته می‌شوند
+            prefix = lower_name[:i]
+            prefix_counts[prefix] = prefix_counts.get(prefix, 0) + 1
+
+    # پیدا کردن پیشوندهای مشترک
+    prefixes = [(prefix, prefix_count) for prefix, prefix_count in prefix_counts.items()
+                if prefix_count >= len(names_without_ext) * 0.5]  # اگر حداقل 50٪ فایل‌ها این پیشوند را داشته باشند
     
     # مرتب‌سازی بر اساس تعداد تطابق و طول پیشوند
     prefixes.sort(key=lambda x: (-x[1], len(x[0])))
@@ -288,6 +558,10 @@ def find_common_prefix(file_paths):
 
 def determine_commit_subject(new_files, file_types, changes_analysis, commit_type):
     """تعیین موضوع کامیت براساس تحلیل‌ها و نوع کامیت"""
+    # کامیتی که فقط اشاره‌گر submodule ها را جابجا می‌کند موضوع مخصوص خودش را دارد
+    if changes_analysis.get('submodule_subject'):
+        return changes_analysis['submodule_subject']
+
     # لیست پیشنهادات مناسب برای هر نوع کامیت
     subject_templates = {
         'feat': [
@@ -345,7 +619,10 @@ def determine_commit_subject(new_files, file_types, changes_analysis, commit_typ
     keyword = ""
     
     # تعیین کلمه کلیدی بر اساس نوع فایل
-    if file_types['python'] > 0:
+    # برای فایل‌های پایتون، نام توابع و کلاس‌های اضافه، حذف یا تغییر نام یافته (symbol_diff) ترجیح دارد
+    if file_types['python'] > 0 and changes_analysis.get('symbol_names'):
+        keyword = changes_analysis['symbol_names']
+    elif file_types['python'] > 0:
         keyword = "Python"
     elif file_types['document'] > 0:
         keyword = "documentation"
@@ -361,9 +638,9 @@ def determine_commit_subject(new_files, file_types, changes_analysis, commit_typ
         keyword = "data processing"
     
     # اگر نتوانستیم از نوع فایل تشخیص دهیم، از نام فایل استفاده می‌کنیم
-    if not keyword and len(changes_analysis['file_operations']) <= 2:
+    if not keyword and len(changes_analysis['files']) <= 2:
         # استفاده از نام فایل برای کلمه کلیدی
-        filename = os.path.splitext(os.path.basename(changes_analysis['file_operations'][0]['path']))[0]
+        filename = os.path.splitext(os.path.basename(changes_analysis['files'][0]))[0]
         if not filename.startswith('.') and len(filename) <= 20:
             keyword = filename
     
@@ -397,42 +674,3 @@ def determine_commit_subject(new_files, file_types, changes_analysis, commit_typ
     )
     
     return suggested_subject
-
-def check_if_new_file(file_path):
-    """بررسی می‌کند که آیا فایل جدید است یا خیر"""
-    try:
-        result = subprocess.run(
-            ['git', 'diff', '--cached', '--name-status', file_path],
-            check=False,
-            capture_output=True,
-            text=True
-        )
-        # 'A' نشان‌دهنده فایل جدید است
-        return result.stdout.strip().startswith('A')
-    except Exception:
-        return False
-
-def get_diff_stats(file_path):
-    """تعداد خطوط اضافه و حذف شده را محاسبه می‌کند"""
-    try:
-        result = subprocess.run(
-            ['git', 'diff', '--cached', '--numstat', file_path],
-            check=False,
-            capture_output=True,
-            text=True
-        )
-        
-        if result.returncode != 0 or not result.stdout.strip():
-            return 0, 0
-            
-        # خروجی به صورت "additions    deletions    file_path" است
-        numbers = result.stdout.strip().split(None, 2)
-        if len(numbers) >= 2:
-            try:
-                return int(numbers[0]), int(numbers[1])
-            except ValueError:
-                return 0, 0
-        return 0, 0
-    except Exception as e:
-        print(f"Error getting diff stats: {e}", file=sys.stderr)
-        return 0, 0
\ No newline at end of file
@@ -0,0 +1,292 @@
+# changelog_generator.py
+
+import argparse
+import itertools
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+from commit_linter import HEADER_PATTERN, FOOTER_PATTERN, iter_log_messages
+from message_formatter import COMMIT_TYPES
+from messages import get_localized_message
+from cmsg_config import get_setting
+from git_executor import git_cwd, popen_git
+
+# Parsed commits are cached per commit id in this file inside the git directory
+CACHE_FILENAME = 'cmsg-changelog-cache.sqlite'
+# Bump when the parsed columns change; an old cache is then discarded
+CACHE_SCHEMA_VERSION = 1
+# Rows inserted into sqlite per executemany() call
+INSERT_BATCH_SIZE = 5000
+
+CHANGELOG_FORMATS = ('markdown', 'json')
+BREAKING_FOOTER_TOKENS = ('BREAKING CHANGE', 'BREAKING-CHANGE')
+
+
+def parse_commit_message(message):
+    """
+    Parses a conventional commit message.
+
+    Returns:
+        tuple: (type, scope, breaking, subject, breaking_note, references).
+               type is None for messages that do not follow the conventional format.
+               references holds the non-breaking footer lines, joined by newlines.
+    """
+    message = message.strip()
+    header = message.split("\n", 1)[0].rstrip()
+    match = HEADER_PATTERN.match(header)
+    if not match:
+        return (None, '', 0, header, '', '')
+
+    breaking_notes = []
+    references = []
+    paragraphs = message.split("\n\n")
+    if len(paragraphs) > 1:
+        footer_lines = paragraphs[-1].strip("\n").split("\n")
+        if FOOTER_PATTERN.match(footer_lines[0]):
+            current = None  # the list the previous footer went to (for continuation lines)
+            for line in footer_lines:
+                if line[:1].isspace() and current is not None:
+                    current[-1] += " " + line.strip()
+                elif line.startswith(BREAKING_FOOTER_TOKENS):
+                    breaking_notes.append(line.split(':', 1)[-1].strip())
+                    current = breaking_notes
+                elif FOOTER_PATTERN.match(line):
+                    references.append(line.strip())
+                    current = references
+
+    breaking = 1 if match.group('breaking') or breaking_notes else 0
+    return (match.group('type'), match.group('scope') or '', breaking,
+            match.group('subject').strip(), "\n".join(breaking_notes), "\n".join(references))
+
+
+def open_cache(cache_path):
+    """Opens (or creates) the parsed-commit cache; ':memory:' disables persistence."""
+    connection = sqlite3.connect(cache_path)
+    # Only a cache: losing the last writes on a crash is fine, fsync on every commit is not
+    connection.execute("PRAGMA synchronous = OFF")
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version != CACHE_SCHEMA_VERSION:
+        connection.execute("DROP TABLE IF EXISTS commits")
+        connection.execute(f"PRAGMA user_version = {CACHE_SCHEMA_VERSION}")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS commits ("
+        " id TEXT PRIMARY KEY, type TEXT, scope TEXT, breaking INTEGER,"
+        " subject TEXT, breaking_note TEXT, refs TEXT) WITHOUT ROWID")
+    # The commits of the current run, in `git rev-list` order (newest first)
+    connection.execute("CREATE TEMP TABLE run_commits (seq INTEGER PRIMARY KEY, id TEXT)")
+    connection.commit()
+    return connection
+
+
+def iter_revision_ids(revision_range):
+    """Streams the ids of the non-merge commits in a range from `git rev-list`."""
+    process = popen_git(
+        ['git', 'rev-list', '--no-merges', revision_range],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        cwd=git_cwd()
+    )
+    try:
+        for line in process.stdout:
+            yield line.rstrip("\n")
+    finally:
+        process.stdout.close()
+        error_output = process.stderr.read().strip()
+        process.stderr.close()
+        if process.wait() != 0 and error_output:
+            raise RuntimeError(error_output)
+
+
+def load_range(connection, revision_range):
+    """
+    Fills run_commits with the range and parses the commits missing from the cache.
+
+    Only the ids stream through Python for cached commits; the messages of new commits
+    are read with one `git log --no-walk --stdin` call. Both passes work in batches, so
+    memory does not depend on the number of commits.
+
+    Returns:
+        tuple: (commits in the range, commits parsed in this run)
+    """
+    total = 0
+    ids = iter_revision_ids(revision_range)
+    while True:
+        batch = [(commit_id,) for commit_id in itertools.islice(ids, INSERT_BATCH_SIZE)]
+        if not batch:
+            break
+        connection.executemany("INSERT INTO run_commits (id) VALUES (?)", batch)
+        total += len(batch)
+
+    missing = connection.execute(
+        "SELECT r.id FROM run_commits r LEFT JOIN commits c ON c.id = r.id WHERE c.id IS NULL")
+    with tempfile.TemporaryFile() as id_file:
+        parsed = 0
+        for (commit_id,) in missing:
+            id_file.write(commit_id.encode('ascii') + b"\n")
+            parsed += 1
+        if parsed == 0:
+            return total, 0
+        id_file.seek(0)
+
+        messages = iter_log_messages(None, ('--no-walk=unsorted', '--stdin'), stdin=id_file)
+        rows = ((commit_id,) + parse_commit_message(message) for commit_id, message in messages)
+        while True:
+            batch = list(itertools.islice(rows, INSERT_BATCH_SIZE))
+            if not batch:
+                break
+            connection.executemany("INSERT OR REPLACE INTO commits VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+            connection.commit()
+    return total, parsed
+
+
+def type_order_sql():
+    """SQL expression that sorts the known types in menu order and the others after them."""
+    cases = " ".join(f"WHEN '{commit_type}' THEN {i}" for i, commit_type in enumerate(COMMIT_TYPES))
+    return f"CASE c.type {cases} ELSE {len(COMMIT_TYPES)} END"
+
+
+def iter_grouped_entries(connection):
+    """
+    Yields (type, [(scope, entries)]) groups of the conventional commits in run_commits,
+    ordered by type, then scope, then newest first. Rows come straight from a sqlite cursor.
+    """
+    cursor = connection.execute(
+        "SELECT c.type, c.scope, c.id, c.subject, c.breaking, c.refs"
+        " FROM run_commits r JOIN commits c ON c.id = r.id"
+        f" WHERE c.type IS NOT NULL ORDER BY {type_order_sql()}, c.type, c.scope, r.seq")
+    for commit_type, type_rows in itertools.groupby(cursor, key=lambda row: row[0]):
+        yield commit_type, ((scope, (row[2:] for row in scope_rows))
+                            for scope, scope_rows in itertools.groupby(type_rows, key=lambda row: row[1]))
+
+
+def iter_breaking_changes(connection):
+    """Yields (scope, id, subject, breaking_note) of the breaking commits, newest first."""
+    return connection.execute(
+        "SELECT c.scope, c.id, c.subject, c.breaking_note"
+        " FROM run_commits r JOIN commits c ON c.id = r.id"
+        " WHERE c.type IS NOT NULL AND c.breaking = 1 ORDER BY r.seq")
+
+
+def type_title(commit_type, language_code):
+    """Section title of a commit type; types without a translation use the type itself."""
+    if commit_type in COMMIT_TYPES:
+        return get_localized_message(f"changelog_type_{commit_type}", language_code)
+    return commit_type
+
+
+def render_markdown(connection, revision_range, language_code, stream):
+    """Writes the changelog as Markdown, one section per type."""
+    stream.write(f"## {get_localized_message('changelog_title', language_code, range=revision_range)}\n")
+
+    breaking_rows = iter_breaking_changes(connection)
+    first = next(breaking_rows, None)
+    if first is not None:
+        stream.write(f"\n### {get_localized_message('changelog_breaking_changes', language_code)}\n\n")
+        for scope, commit_id, subject, note in itertools.chain([first], breaking_rows):
+            prefix = f"**{scope}:** " if scope else ""
+            stream.write(f"- {prefix}{note or subject} ({commit_id[:7]})\n")
+
+    for commit_type, scopes in iter_grouped_entries(connection):
+        stream.write(f"\n### {type_title(commit_type, language_code)}\n\n")
+        for scope, entries in scopes:
+            prefix = f"**{scope}:** " if scope else ""
+            for commit_id, subject, breaking, refs in entries:
+                line = f"- {prefix}{subject} ({commit_id[:7]})"
+                if refs:
+                    line += ", " + ", ".join(refs.split("\n"))
+                stream.write(line + "\n")
+
+
+def render_json(connection, revision_range, language_code, stream):
+    """
+    Writes the changelog as one JSON document:
+      {"range": ..., "breaking_changes": [...], "sections": [{"type", "title", "scopes": [...]}]}
+    The document is written while the rows are read, so it is never held in memory.
+    """
+    stream.write('{"range": ' + json.dumps(revision_range) + ', "breaking_changes": [')
+    for i, (scope, commit_id, subject, note) in enumerate(iter_breaking_changes(connection)):
+        stream.write((", " if i else "") + json.dumps(
+            {'id': commit_id, 'scope': scope, 'subject': subject, 'note': note}, ensure_ascii=False))
+
+    stream.write('], "sections": [')
+    for i, (commit_type, scopes) in enumerate(iter_grouped_entries(connection)):
+        stream.write((", " if i else "") + '{"type": ' + json.dumps(commit_type) + ', "title": '
+                     + json.dumps(type_title(commit_type, language_code), ensure_ascii=False) + ', "scopes": [')
+        for j, (scope, entries) in enumerate(scopes):
+            stream.write((", " if j else "") + '{"scope": ' + json.dumps(scope, ensure_ascii=False) + ', "entries": [')
+            for k, (commit_id, subject, breaking, refs) in enumerate(entries):
+                entry = {'id': commit_id, 'subject': subject, 'breaking': bool(breaking),
+                         'references': refs.split("\n") if refs else []}
+                stream.write((", " if k else "") + json.dumps(entry, ensure_ascii=False))
+            stream.write(']}')
+        stream.write(']}')
+    stream.write(']}\n')
+
+
+def generate_changelog(revision_range, output_format='markdown', language_code='en',
+                       cache_path=None, stream=None):
+    """
+    Writes the changelog of a revision range to `stream`.
+
+    Args:
+        cache_path (str): sqlite cache file; None keeps the parsed commits in memory only.
+
+    Returns:
+        tuple: (commits in the range, commits parsed in this run)
+    """
+    stream = stream or sys.stdout
+    connection = open_cache(cache_path or ':memory:')
+    try:
+        counts = load_range(connection, revision_range)
+        renderer = render_json if output_format == 'json' else render_markdown
+        renderer(connection, revision_range, language_code, stream)
+        stream.flush()
+        return counts
+    finally:
+        connection.close()
+
+
+def run_changelog_command(argv):
+    """
+    Entry point of `git-cmsg changelog FROM..TO`.
+
+    Returns:
+        int: The process exit code (0 success, 2 usage or git error).
+    """
+    parser = argparse.ArgumentParser(
+        prog='git-cmsg changelog',
+        description="Generate a changelog from the conventional commit messages in a range.")
+    parser.add_argument('range', help="Revision range, e.g. v0.2.0..HEAD.")
+    parser.add_argument('--format', choices=CHANGELOG_FORMATS, default='markdown',
+                        help="Output format (default: markdown).")
+    parser.add_argument('--lang', choices=('en', 'fa'), default=None,
+                        help="Language of the section titles (default: cmsg.lang or en).")
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f"Do not read or update {CACHE_FILENAME} in the git directory.")
+    args = parser.parse_args(argv)
+    args.lang = args.lang or get_setting('cmsg.lang', 'en')
+
+    cache_path = None
+    if not args.no_cache:
+        from git_utils import get_git_dir
+        git_dir = get_git_dir()
+        if not git_dir:
+            print("Error: Not a git repository.", file=sys.stderr)
+            return 2
+        cache_path = os.path.join(git_dir, CACHE_FILENAME)
+
+    try:
+        total, parsed = generate_changelog(args.range, args.format, args.lang, cache_path)
+    except RuntimeError as e:
+        print(f"Error running git:\n{e}", file=sys.stderr)
+        return 2
+    except sqlite3.Error as e:
+        print(f"Error: Could not use the changelog cache '{cache_path}': {e}", file=sys.stderr)
+        return 2
+    print(f"{total} commits, {parsed} parsed, {total - parsed} from cache.", file=sys.stderr)
+    return 0
@@ -0,0 +1,98 @@
+# cmsg_api.py
+
+# API کتابخانه git-cmsg برای استفاده درون فرایند (language server، daemon، ابزارهای CI):
+# هیچ تابعی چاپ نمی‌کند یا sys.exit صدا نمی‌زند؛ خطاها به صورت استثناهای نوع‌دار (git_utils) برمی‌گردند.
+#
+#   repo = Repository('/path/to/work/tree')
+#   staged = repo.staged()                         # NothingStagedError اگر چیزی stage نشده باشد
+#   suggestion = repo.suggest(staged)              # {'type', 'scope', 'subject'}
+#   message = repo.format_message(dict(suggestion, body='', issues=''), staged, 'en')
+#   commit_id = repo.commit(message, mode='stdin')
+#
+# رابط خط فرمان (git_cmsg.py) همین توابع را از طریق wrapper های git_utils صدا می‌زند
+# (is_in_git_repository، get_staged_files، get_current_branch_name، perform_commit) که خطا را چاپ می‌کنند.
+#
+# هر Repository فراخوانی‌های گیت خودش را با git_executor.working_directory در مسیر مخزن اجرا می‌کند
+# (مقدار context، نه os.chdir)، پس چند Repository در thread های مختلف همزمان و بدون قفل کار می‌کنند
+# و دایرکتوری جاری فرایند هیچ وقت عوض نمی‌شود.
+
+# استثناها از همین ماژول هم قابل import هستند: from cmsg_api import Repository, NothingStagedError
+from git_utils import (CmsgError, GitNotFoundError, NotARepositoryError, GitCommandError,
+                       NothingStagedError, CommitError, find_repository, read_branch_name,
+                       read_staged_snapshot, create_commit)
+from git_executor import working_directory
+from change_analyzer import analyze_content
+import message_formatter
+
+
+class Repository:
+    """
+    یک work tree گیت: repository → staged snapshot → suggestions → formatted message → commit.
+
+    Raises:
+        GitNotFoundError, NotARepositoryError: در سازنده، اگر گیت نصب نیست یا path داخل مخزن نیست.
+    """
+
+    def __init__(self, path=None):
+        self.path, self.git_dir = find_repository(path)
+
+    def __repr__(self):
+        return f"Repository({self.path!r})"
+
+    def _active(self):
+        # فقط فراخوانی‌های گیت همین context (thread) در مسیر مخزن اجرا می‌شوند؛ git config هم برای
+        # هر مسیر جدا نگه داشته می‌شود (cmsg_config)
+        return working_directory(self.path)
+
+    def branch_name(self):
+        """نام شاخه فعلی، یا None در حالت detached HEAD."""
+        with self._active():
+            return read_branch_name()
+
+    def staged(self, base=None):
+        """
+        Returns:
+            StagedFiles: تغییرات stage شده (در برابر HEAD، یا base مثلاً برای amend).
+
+        Raises:
+            NothingStagedError, GitCommandError
+        """
+        with self._active():
+            return read_staged_snapshot(base=base)
+
+    def suggest(self, staged=None, base=None):
+        """
+        پیشنهاد نوع، محدوده و موضوع با تحلیل کامل (.gitattributes، سیگنال‌های diff، نمادهای پایتون، submodule ها).
+
+        Returns:
+            dict: {'type', 'scope', 'subject'}
+        """
+        with self._active():
+            if staged is None:
+                staged = read_staged_snapshot(base=base)
+            return analyze_content(staged, base=base).suggestions()
+
+    def issue_candidates(self):
+        """کلیدهای ایشو از نام شاخه و تاریخچه اخیر، تازه‌ترین اول."""
+        with self._active():
+            from issue_matcher import read_issue_candidates
+            return read_issue_candidates()
+
+    def format_message(self, commit_data, staged, language_code='en'):
+        """پیام کامیت با لیست فایل‌های stage شده (message_formatter.format_message)."""
+        return message_formatter.format_message(commit_data, staged, language_code)
+
+    def commit(self, message, mode='stdin', no_verify=False, amend=False):
+        """
+        کامیت را می‌سازد (git_utils.create_commit).
+
+        Returns:
+            str: شناسه کامل کامیت جدید.
+
+        Raises:
+            ValueError, GitNotFoundError, CommitError
+        """
+        with self._active():
+            commit_id, _ = create_commit(message, mode=mode, no_verify=no_verify, amend=amend,
+                                         git_dir=self.git_dir)
+            return commit_id
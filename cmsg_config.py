@@ -0,0 +1,123 @@
+# cmsg_config.py
+
+import os
+import sys
+
+from git_executor import git_cwd, run_git
+
+# تنظیمات قابل پیکربندی: کلید git config → (متغیر محیطی، نوع مقدار)
+# کلیدها با حروف کوچک هستند چون `git config --get-regexp` نام متغیرها را با حروف کوچک برمی‌گرداند
+# (cmsg.defaultType و cmsg.defaulttype یکی هستند). ترتیب اولویت: پرچم خط فرمان، متغیر محیطی، git config.
+CONFIG_KEYS = {
+    'cmsg.lang': ('GIT_CMSG_LANG', 'lang'),  # زبان؛ اگر تنظیم شده باشد سوال زبان پرسیده نمی‌شود
+    'cmsg.defaulttype': ('GIT_CMSG_DEFAULT_TYPE', 'type'),  # گزینه پیش‌فرض در سوال نوع کامیت
+    'cmsg.filelistcap': ('GIT_CMSG_FILE_LIST_CAP', 'int'),  # تعداد مسیرها در نمای خلاصه لیست فایل‌ها
+    'cmsg.suggestiondeadline': ('GIT_CMSG_SUGGESTION_DEADLINE', 'int'),  # مهلت پیشنهاد اولیه (میلی‌ثانیه)
+    'cmsg.metrics': ('GIT_CMSG_METRICS', 'bool'),  # ثبت معیارهای اجرا (run_metrics.py)
+    'cmsg.metricsmaxbytes': ('GIT_CMSG_METRICS_MAX_BYTES', 'int'),  # اندازه فایل معیارها قبل از چرخش
+    'cmsg.symbolcachemaxentries': ('GIT_CMSG_SYMBOL_CACHE_MAX_ENTRIES', 'int'),  # حداکثر ردیف‌های کش نمادها
+    'cmsg.workers': ('GIT_CMSG_WORKERS', 'int'),  # تعداد worker ها (lint بازه‌ای، parse نمادها و submodule ها)
+    'cmsg.submodulesummary': ('GIT_CMSG_SUBMODULE_SUMMARY', 'bool'),  # خلاصه تاریخچه submodule های جابجا شده
+    'cmsg.submoduletimeout': ('GIT_CMSG_SUBMODULE_TIMEOUT', 'int'),  # سقف زمان هر submodule (میلی‌ثانیه)
+    'cmsg.fixupbudget': ('GIT_CMSG_FIXUP_BUDGET', 'int'),  # بودجه کل زمان blame برای --fixup auto (میلی‌ثانیه)
+    'cmsg.exclude': ('GIT_CMSG_EXCLUDE', 'str'),  # الگوهای glob فایل‌هایی که تحلیل نمی‌شوند (path_exclusions.py)
+    'cmsg.scopeindex': ('GIT_CMSG_SCOPE_INDEX', 'bool'),  # تکمیل محدوده از همه دایرکتوری‌های مخزن (path_index.py)
+    'cmsg.trailers': ('GIT_CMSG_TRAILERS', 'bool'),  # سوال trailer ها با تکمیل از تاریخچه (trailer_index.py)
+    'cmsg.draftmaxage': ('GIT_CMSG_DRAFT_MAX_AGE', 'int'),  # عمر پیش‌نویس --retry/--resume به ساعت (commit_draft.py)
+    'cmsg.issuepatterns': ('GIT_CMSG_ISSUE_PATTERNS', 'str'),  # الگوهای سفارشی ایشو: name=regex;... (issue_matcher.py)
+}
+
+_TRUE_VALUES = ('1', 'true', 'yes', 'on')
+_FALSE_VALUES = ('0', 'false', 'no', 'off', '')
+
+# مقادیر خوانده شده از git config برای هر دایرکتوری کاری (git_cwd)؛ فقط یک بار در هر اجرا خوانده می‌شوند.
+# کلید دایرکتوری است چون cmsg_api چند مخزن را در یک فرایند (و در thread های مختلف) باز می‌کند.
+_git_config_values = {}
+
+
+def read_git_config():
+    """
+    همه کلیدهای cmsg.* را با یک فراخوانی `git config -z --get-regexp` می‌خواند.
+
+    Returns:
+        dict: {کلید با حروف کوچک: مقدار}؛ برای کلیدهای تکراری آخرین مقدار (مثل خود گیت).
+    """
+    cwd = git_cwd()
+    cached = _git_config_values.get(cwd)
+    if cached is not None:
+        return cached
+
+    values = {}
+    try:
+        result = run_git(
+            ['git', 'config', '-z', '--get-regexp', r'^cmsg\.'],
+            check=False,
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='surrogateescape',
+            cwd=cwd
+        )
+        # کد خروج 1 یعنی هیچ کلیدی پیدا نشد
+        if result.returncode == 0:
+            for record in result.stdout.split('\0'):
+                if record:
+                    # key\nvalue (کلید بدون مقدار، مثل `[cmsg] metrics`، یعنی true)
+                    key, _, value = record.partition('\n')
+                    values[key.lower()] = value if '\n' in record else 'true'
+    except FileNotFoundError:
+        pass  # گیت نصب نیست؛ check_git_installed پیام مناسب را چاپ می‌کند
+    _git_config_values[cwd] = values
+    return values
+
+
+def clear_git_config_cache():
+    """مقادیر خوانده شده را دور می‌ریزد تا git config دوباره خوانده شود (مثلاً بعد از تغییر تنظیمات در cmsg_api)."""
+    _git_config_values.clear()
+
+
+def _convert(kind, raw):
+    """مقدار متنی را به نوع تنظیم تبدیل می‌کند؛ ValueError برای مقدار نامعتبر."""
+    value = raw.strip()
+    if kind == 'int':
+        number = int(value)
+        if number < 0:
+            raise ValueError(value)
+        return number
+    if kind == 'bool':
+        if value.lower() in _TRUE_VALUES:
+            return True
+        if value.lower() in _FALSE_VALUES:
+            return False
+        raise ValueError(value)
+    if kind == 'lang':
+        if value.lower() not in ('en', 'fa'):
+            raise ValueError(value)
+        return value.lower()
+    if kind == 'type':
+        from message_formatter import COMMIT_TYPES
+        if value.lower() not in COMMIT_TYPES:
+            raise ValueError(value)
+        return value.lower()
+    return value
+
+
+def get_setting(key, default=None):
+    """
+    مقدار یک تنظیم: متغیر محیطی (اگر تعریف شده باشد) بر git config اولویت دارد.
+    پرچم‌های خط فرمان توسط فراخوانی کننده بر هر دو اولویت داده می‌شوند.
+    مقدار نامعتبر با یک هشدار نادیده گرفته می‌شود و default برمی‌گردد.
+    """
+    env_var, kind = CONFIG_KEYS[key]
+    raw = os.environ.get(env_var) if env_var else None
+    source = env_var
+    if raw is None:
+        raw = read_git_config().get(key)
+        source = key
+    if raw is None:
+        return default
+    try:
+        return _convert(kind, raw)
+    except ValueError:
+        print(f"Warning: Ignoring invalid value '{raw}' for {source}.", file=sys.stderr)
+        return default
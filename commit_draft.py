@@ -0,0 +1,170 @@
+# commit_draft.py
+
+import json
+import os
+import time
+
+from git_executor import git_cwd, run_git
+
+# پیش‌نویس کامیت در حال انجام: پاسخ هر سوال و پیام نهایی بعد از هر مرحله در دایرکتوری گیت
+# ذخیره می‌شود تا اگر `git commit` شکست خورد (رد شدن توسط hook، تمام شدن زمان gpg، قفل index)
+# پیام از دست نرود. `git-cmsg --retry` و `git-cmsg --resume` از همین فایل ادامه می‌دهند.
+# قالب فایل (JSON):
+#   {"version": 1, "created": ..., "updated": ..., "lang": "en", "amend": false,
+#    "answers": {"type": ..., "subject": ..., ...}, "message": ..., "confirmed": false,
+#    "tree": <شناسه tree پیام>, "head": <HEAD هنگام ذخیره پیام>}
+DRAFT_FILENAME = 'cmsg-draft.json'
+# با تغییر قالب افزایش دهید؛ پیش‌نویس نسخه دیگر نادیده گرفته می‌شود
+DRAFT_VERSION = 1
+# پیش‌نویس قدیمی‌تر از این (ساعت، قابل تنظیم با cmsg.draftMaxAge) هنگام خواندن حذف می‌شود
+DRAFT_MAX_AGE_HOURS = 7 * 24
+# ترتیب سوال‌ها؛ پاسخ‌های ذخیره شده به همین نام‌ها در commit_data
+ANSWER_KEYS = ('type', 'subject', 'scope', 'body', 'issues', 'trailers')
+
+
+def _read_git_output(args):
+    """خروجی یک دستور git (بدون فاصله انتهایی)، یا None در صورت خطا."""
+    try:
+        result = run_git(args, check=False, capture_output=True, text=True, cwd=git_cwd())
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def read_index_tree():
+    """
+    شناسه tree فایل‌های stage شده با `git write-tree` (همان tree که کامیت خواهد داشت).
+    None اگر index تداخل حل نشده داشته باشد یا گیت خطا بدهد.
+    """
+    return _read_git_output(['git', 'write-tree'])
+
+
+def read_head_id():
+    """شناسه کامیت HEAD، یا None در مخزن بدون کامیت."""
+    return _read_git_output(['git', 'rev-parse', '--verify', '-q', 'HEAD'])
+
+
+def _draft_path(git_dir=None):
+    if git_dir is None:
+        from git_utils import get_git_dir
+        git_dir = get_git_dir()
+    return os.path.join(git_dir, DRAFT_FILENAME) if git_dir else None
+
+
+class CommitDraft:
+    """
+    پیش‌نویس یک اجرای git-cmsg. پاسخ‌ها با record و پیام با set_message ثبت و فوراً ذخیره می‌شوند؛
+    خطای نوشتن نادیده گرفته می‌شود (پیش‌نویس فقط کمکی است و نباید جلوی کامیت را بگیرد).
+    """
+
+    def __init__(self, path, lang=None, amend=False, answers=None, message=None, confirmed=False,
+                 tree=None, head=None, created=None, updated=None):
+        self.path = path
+        self.lang = lang
+        self.amend = amend
+        self.answers = dict(answers or {})
+        self.message = message
+        self.confirmed = confirmed
+        self.tree = tree
+        self.head = head
+        self.created = created if created is not None else time.time()
+        self.updated = updated if updated is not None else self.created
+
+    @classmethod
+    def start(cls, lang, amend=False, git_dir=None):
+        """پیش‌نویس تازه برای این اجرا (جایگزین پیش‌نویس قبلی در اولین ذخیره)."""
+        return cls(_draft_path(git_dir), lang=lang, amend=amend)
+
+    @classmethod
+    def load(cls, git_dir=None, max_age_hours=None):
+        """
+        پیش‌نویس ذخیره شده، یا None اگر وجود نداشته باشد، خوانا نباشد یا منقضی شده باشد
+        (پیش‌نویس خراب یا منقضی همین‌جا حذف می‌شود).
+        """
+        path = _draft_path(git_dir)
+        if not path:
+            return None
+        if max_age_hours is None:
+            from cmsg_config import get_setting
+            max_age_hours = get_setting('cmsg.draftmaxage', DRAFT_MAX_AGE_HOURS)
+        try:
+            with open(path, encoding='utf-8') as draft_file:
+                data = json.load(draft_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            data = None
+        if not isinstance(data, dict) or data.get('version') != DRAFT_VERSION:
+            _remove(path)
+            return None
+        draft = cls(path, lang=data.get('lang'), amend=bool(data.get('amend')),
+                    answers=data.get('answers'), message=data.get('message'),
+                    confirmed=bool(data.get('confirmed')), tree=data.get('tree'), head=data.get('head'),
+                    created=data.get('created'), updated=data.get('updated'))
+        if time.time() - draft.updated > max_age_hours * 3600:
+            _remove(path)
+            return None
+        return draft
+
+    def record(self, key, value):
+        """پاسخ یک سوال را ثبت و پیش‌نویس را ذخیره می‌کند."""
+        self.answers[key] = value
+        self.save()
+
+    def set_message(self, message, confirmed=False):
+        """
+        پیام نهایی را ثبت می‌کند. پیام تایید شده به tree فعلی index و HEAD گره می‌خورد تا --retry
+        فقط وقتی مستقیم کامیت کند که تغییرات stage شده همان باشند.
+        """
+        self.message = message
+        self.confirmed = confirmed
+        if confirmed:
+            self.tree = read_index_tree()
+            self.head = read_head_id()
+        self.save()
+
+    def has_answers(self):
+        return any(self.answers.get(key) for key in ANSWER_KEYS)
+
+    def matches_index(self):
+        """آیا index و HEAD هنوز همان هستند که پیام برایشان تایید شد؟"""
+        return bool(self.tree) and self.tree == read_index_tree() and self.head == read_head_id()
+
+    def save(self):
+        if not self.path:
+            return
+        self.updated = time.time()
+        data = {
+            'version': DRAFT_VERSION,
+            'created': self.created,
+            'updated': self.updated,
+            'lang': self.lang,
+            'amend': self.amend,
+            'answers': self.answers,
+            'message': self.message,
+            'confirmed': self.confirmed,
+            'tree': self.tree,
+            'head': self.head,
+        }
+        # نوشتن در فایل موقت و جایگزینی اتمی، تا قطع شدن برنامه پیش‌نویس نیمه‌کاره باقی نگذارد
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as draft_file:
+                json.dump(data, draft_file, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except OSError:
+            _remove(temp_path)
+
+    def discard(self):
+        """پیش‌نویس را حذف می‌کند (بعد از کامیت موفق)."""
+        if self.path:
+            _remove(self.path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,341 @@
+# commit_linter.py
+
+import argparse
+import os
+import re
+import stat
+import subprocess
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Only the type table is needed here; message_formatter does not import prompt_toolkit,
+# so worker processes start quickly.
+from message_formatter import COMMIT_TYPES
+from cmsg_config import get_setting
+from git_executor import git_cwd, popen_git, run_git
+
+# --- Default limits ---
+DEFAULT_MAX_HEADER_LENGTH = 72  # hint_subject: "max 50-72 chars"
+DEFAULT_MAX_LINE_LENGTH = 100
+
+# Number of commits sent to a worker process at once in range mode.
+# Ranges smaller than one batch are linted in-process (no pool startup cost).
+LINT_BATCH_SIZE = 2000
+
+# type(scope)!: subject — the header format message_formatter.format_message emits
+HEADER_PATTERN = re.compile(
+    r'^(?P<type>[a-z]+)(?:\((?P<scope>[^()\r\n]+)\))?(?P<breaking>!)?: (?P<subject>\S.*)$')
+# Footer lines: "Token: value", "Token #value" or "BREAKING CHANGE: value"
+FOOTER_PATTERN = re.compile(r'^(?:BREAKING CHANGE|BREAKING-CHANGE|[A-Za-z][\w-]*)(?:: | #)\S')
+# Messages git creates itself are not expected to follow the format
+SKIPPED_HEADER_PREFIXES = ('Merge ', 'Revert "', 'fixup! ', 'squash! ', 'amend! ')
+
+
+def default_lint_options():
+    """The default options dictionary used by lint_message."""
+    return {
+        'types': COMMIT_TYPES,
+        'max_header_length': DEFAULT_MAX_HEADER_LENGTH,
+        'max_line_length': DEFAULT_MAX_LINE_LENGTH,
+    }
+
+
+def strip_comment_lines(message):
+    """Removes '#' comment lines, like git's default message cleanup."""
+    return "\n".join(line for line in message.split("\n") if not line.startswith('#'))
+
+
+def lint_message(message, options=None):
+    """
+    Checks one commit message against the conventional format.
+
+    Args:
+        message (str): The full commit message.
+        options (dict): See default_lint_options().
+
+    Returns:
+        list: Human-readable problems; empty if the message is valid.
+    """
+    options = options or default_lint_options()
+    message = message.strip()
+    if not message:
+        return ["empty commit message"]
+
+    lines = message.split("\n")
+    header = lines[0].rstrip()
+    if header.startswith(SKIPPED_HEADER_PREFIXES):
+        return []
+
+    problems = []
+    match = HEADER_PATTERN.match(header)
+    if not match:
+        problems.append(f"header '{header}' does not match 'type(scope): subject'")
+    elif match.group('type') not in options['types']:
+        problems.append(f"type '{match.group('type')}' is not one of: {', '.join(options['types'])}")
+
+    if len(header) > options['max_header_length']:
+        problems.append(f"header is {len(header)} characters long (max {options['max_header_length']})")
+
+    if len(lines) > 1 and lines[1].strip():
+        problems.append("the header must be followed by a blank line")
+
+    for number, line in enumerate(lines[2:], start=3):
+        if len(line) > options['max_line_length']:
+            problems.append(f"line {number} is {len(line)} characters long (max {options['max_line_length']})")
+
+    # The last paragraph is a footer if it starts like one; then every line must be
+    # a footer line or an indented continuation of the previous one.
+    paragraphs = message.split("\n\n")
+    if len(paragraphs) > 1:
+        footer_lines = paragraphs[-1].strip("\n").split("\n")
+        if FOOTER_PATTERN.match(footer_lines[0]):
+            for line in footer_lines[1:]:
+                if line and not line[0].isspace() and not FOOTER_PATTERN.match(line):
+                    problems.append(f"invalid footer line '{line}' (expected 'Token: value' or 'Token #value')")
+
+    return problems
+
+
+def lint_batch(batch, options):
+    """Lints a batch of (commit_id, message) pairs; returns only the failing ones (runs in worker processes)."""
+    failures = []
+    for commit_id, message in batch:
+        problems = lint_message(message, options)
+        if problems:
+            failures.append((commit_id, problems))
+    return failures
+
+
+def iter_log_messages(revision_range, extra_args=(), stdin=None):
+    """
+    Streams (commit_id, message) pairs from
+    `git log -z --format=%H%x00%B <range>` without buffering the whole output.
+
+    Args:
+        revision_range (str): The range to walk, or None (e.g. with '--stdin').
+        extra_args (tuple): Additional `git log` options, e.g. ('--no-merges',).
+        stdin (file): Passed to git as stdin (e.g. a file of commit ids for '--stdin').
+    """
+    command = ['git', 'log', '-z', '--format=%H%x00%B', *extra_args]
+    if revision_range:
+        command.append(revision_range)
+    process = popen_git(
+        command,
+        stdin=stdin,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=git_cwd()
+    )
+    pending = b''
+    fields = []
+    try:
+        for chunk in iter(lambda: process.stdout.read(65536), b''):
+            parts = (pending + chunk).split(b'\0')
+            pending = parts.pop()  # incomplete field, continued in the next chunk
+            for part in parts:
+                fields.append(part)
+                if len(fields) == 2:
+                    yield fields[0].decode('ascii').strip(), fields[1].decode('utf-8', 'replace')
+                    fields = []
+        if pending:
+            fields.append(pending)
+        if len(fields) == 2:
+            yield fields[0].decode('ascii').strip(), fields[1].decode('utf-8', 'replace')
+    finally:
+        process.stdout.close()
+        error_output = process.stderr.read().decode('utf-8', 'replace').strip()
+        process.stderr.close()
+        if process.wait() != 0 and error_output:
+            raise RuntimeError(error_output)
+
+
+def iter_batches(items, size):
+    """Groups an iterator into lists of at most `size` items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bounded_map(pool, function, batches, max_pending, *args):
+    """
+    Like pool.map(), but never submits more than `max_pending` batches ahead of the
+    results being consumed, so memory stays bounded for arbitrarily long ranges.
+    Results are yielded in submission order.
+    """
+    pending = deque()
+    for batch in batches:
+        pending.append(pool.submit(function, batch, *args))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def lint_range(revision_range, options, workers=None, stream=None):
+    """
+    Lints every commit in a revision range (e.g. 'origin/main..HEAD').
+
+    Returns:
+        tuple: (number of commits checked, number of commits with problems)
+    """
+    stream = stream or sys.stdout
+    workers = workers or get_setting('cmsg.workers') or os.cpu_count() or 1
+    batches = iter_batches(iter_log_messages(revision_range), LINT_BATCH_SIZE)
+
+    first_batch = next(batches, [])
+    checked = len(first_batch)
+    failed = 0
+
+    def report(failures):
+        for commit_id, problems in failures:
+            for problem in problems:
+                stream.write(f"{commit_id[:12]}: {problem}\n")
+        return len(failures)
+
+    failed += report(lint_batch(first_batch, options))
+    if len(first_batch) < LINT_BATCH_SIZE:
+        return checked, failed  # the whole range fit in one batch
+
+    def counted(batch_iterator):
+        nonlocal checked
+        for batch in batch_iterator:
+            checked += len(batch)
+            yield batch
+
+    if workers <= 1:
+        results = (lint_batch(batch, options) for batch in counted(batches))
+        for failures in results:
+            failed += report(failures)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for failures in bounded_map(pool, lint_batch, counted(batches), workers * 2, options):
+                failed += report(failures)
+    stream.flush()
+    return checked, failed
+
+
+# The second line of every hook git-cmsg writes; a hook without it belongs to someone else
+HOOK_MARKER = '# Installed by git-cmsg'
+
+
+def resolve_commit_msg_hook_path():
+    """
+    Path of the commit-msg hook as git itself resolves it (`git rev-parse --git-path`), so
+    core.hooksPath and the common dir of linked worktrees are honoured. None outside a repository.
+    """
+    try:
+        result = run_git(['git', 'rev-parse', '--git-path', 'hooks/commit-msg'],
+                                check=False, capture_output=True, text=True, cwd=git_cwd())
+    except FileNotFoundError:
+        return None
+    hook_path = result.stdout.strip()
+    if result.returncode != 0 or not hook_path:
+        return None
+    return os.path.join(git_cwd(), hook_path)
+
+
+def install_commit_msg_hook(hook_path, force=False):
+    """
+    Writes a commit-msg hook that runs `git-cmsg lint --file`. Returns the hook path.
+
+    Raises FileExistsError if a hook git-cmsg did not install is already there, unless force is set.
+    """
+    if not force:
+        try:
+            with open(hook_path, 'r', encoding='utf-8', errors='replace') as hook_file:
+                existing = hook_file.read()
+        except FileNotFoundError:
+            existing = None
+        if existing is not None and HOOK_MARKER not in existing:
+            raise FileExistsError(hook_path)
+    os.makedirs(os.path.dirname(hook_path), exist_ok=True)
+    with open(hook_path, 'w', encoding='utf-8') as hook_file:
+        hook_file.write('#!/bin/sh\n'
+                        f'{HOOK_MARKER}: checks the message against the conventional format\n'
+                        'exec git-cmsg lint --file "$1"\n')
+    mode = os.stat(hook_path).st_mode
+    os.chmod(hook_path, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return os.path.normpath(hook_path)
+
+
+def run_lint_command(argv):
+    """
+    Entry point of `git-cmsg lint`.
+
+      git-cmsg lint --file .git/COMMIT_EDITMSG   (commit-msg hook mode; '-' reads stdin)
+      git-cmsg lint origin/main..HEAD            (range mode)
+      git-cmsg lint --install-hook [--force]     (install the commit-msg hook)
+
+    Returns:
+        int: The process exit code (0 valid, 1 problems found, 2 usage or git error).
+    """
+    parser = argparse.ArgumentParser(
+        prog='git-cmsg lint',
+        description="Check commit messages against the conventional format git-cmsg writes.")
+    parser.add_argument('range', nargs='?', help="Revision range to check, e.g. origin/main..HEAD.")
+    parser.add_argument('--file', help="Check the message in this file (commit-msg hook mode); '-' reads stdin.")
+    parser.add_argument('--install-hook', action='store_true', help="Install a commit-msg hook in this repository.")
+    parser.add_argument('--force', action='store_true',
+                        help="With --install-hook, replace a commit-msg hook git-cmsg did not install.")
+    parser.add_argument('--max-header', type=int, default=DEFAULT_MAX_HEADER_LENGTH,
+                        help=f"Maximum header length (default: {DEFAULT_MAX_HEADER_LENGTH}).")
+    parser.add_argument('--max-line', type=int, default=DEFAULT_MAX_LINE_LENGTH,
+                        help=f"Maximum body/footer line length (default: {DEFAULT_MAX_LINE_LENGTH}).")
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help="Worker processes for range mode (default: cmsg.workers or the number of CPUs).")
+    args = parser.parse_args(argv)
+
+    options = default_lint_options()
+    options['max_header_length'] = args.max_header
+    options['max_line_length'] = args.max_line
+
+    if args.install_hook:
+        hook_path = resolve_commit_msg_hook_path()
+        if not hook_path:
+            print("Error: Not a git repository.", file=sys.stderr)
+            return 2
+        try:
+            hook_path = install_commit_msg_hook(hook_path, force=args.force)
+        except FileExistsError:
+            print(f"Error: {os.path.normpath(hook_path)} was not installed by git-cmsg; "
+                  "use --force to replace it.", file=sys.stderr)
+            return 2
+        except OSError as e:
+            print(f"Error: Could not write the commit-msg hook: {e}", file=sys.stderr)
+            return 2
+        print(f"Installed commit-msg hook: {hook_path}")
+        return 0
+
+    if args.file:
+        try:
+            if args.file == '-':
+                message = sys.stdin.read()
+            else:
+                with open(args.file, 'r', encoding='utf-8') as message_file:
+                    message = message_file.read()
+        except OSError as e:
+            print(f"Error: Could not read '{args.file}': {e}", file=sys.stderr)
+            return 2
+        problems = lint_message(strip_comment_lines(message), options)
+        for problem in problems:
+            print(f"git-cmsg lint: {problem}", file=sys.stderr)
+        return 1 if problems else 0
+
+    if not args.range:
+        parser.print_usage(sys.stderr)
+        print("Error: Give a revision range or --file.", file=sys.stderr)
+        return 2
+
+    try:
+        checked, failed = lint_range(args.range, options, workers=args.jobs)
+    except RuntimeError as e:
+        print(f"Error running git log:\n{e}", file=sys.stderr)
+        return 2
+    print(f"Checked {checked} commits, {failed} with problems.", file=sys.stderr)
+    return 1 if failed else 0
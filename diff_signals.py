@@ -0,0 +1,236 @@
+# diff_signals.py
+
+import os
+import subprocess
+import sys
+
+from path_exclusions import exclude_pathspecs
+from git_executor import git_cwd, popen_git, run_git
+
+# --- پرچم‌های هر فایل ---
+WHITESPACE_ONLY = 1  # فقط فاصله، تورفتگی یا خط خالی تغییر کرده است
+COMMENT_ONLY = 2  # فقط توضیحات (comment) یا docstring تغییر کرده است
+
+# پیشوند خطوط توضیح برای هر زبان (بر اساس پسوند فایل)؛ توضیحات چند خطی '/* ... */' با
+# BLOCK_DELIMITERS دنبال می‌شوند، پس خطی مثل '*ptr = x;' بیرون از بلوک توضیح کد حساب می‌شود
+_HASH_COMMENTS = ('#',)
+_C_COMMENTS = ('//',)
+COMMENT_PREFIXES = {
+    '.py': _HASH_COMMENTS, '.sh': _HASH_COMMENTS, '.bash': _HASH_COMMENTS, '.rb': _HASH_COMMENTS,
+    '.yml': _HASH_COMMENTS, '.yaml': _HASH_COMMENTS, '.toml': _HASH_COMMENTS, '.ini': ('#', ';'),
+    '.conf': _HASH_COMMENTS, '.pl': _HASH_COMMENTS, '.r': _HASH_COMMENTS,
+    '.js': _C_COMMENTS, '.ts': _C_COMMENTS, '.jsx': _C_COMMENTS, '.tsx': _C_COMMENTS,
+    '.java': _C_COMMENTS, '.kt': _C_COMMENTS, '.c': _C_COMMENTS, '.h': _C_COMMENTS,
+    '.cc': _C_COMMENTS, '.cpp': _C_COMMENTS, '.hpp': _C_COMMENTS, '.cs': _C_COMMENTS,
+    '.go': _C_COMMENTS, '.rs': _C_COMMENTS, '.swift': _C_COMMENTS, '.php': _C_COMMENTS + _HASH_COMMENTS,
+    '.css': (), '.scss': _C_COMMENTS, '.less': _C_COMMENTS,
+    '.sql': ('--',), '.lua': ('--',), '.hs': ('--',),
+}
+# جداکننده‌های (شروع، پایان) بلوک‌های توضیح و docstring ها؛ خطی که با شروع بلوک آغاز شود و خطوط
+# داخل بلوک توضیح حساب می‌شوند (رشته‌ای مثل 'Q = """SELECT 1"""' با جداکننده شروع نمی‌شود و کد است)
+_C_BLOCKS = (('/*', '*/'),)
+BLOCK_DELIMITERS = {'.py': (('"""', '"""'), ("'''", "'''"))}
+BLOCK_DELIMITERS.update((extension, _C_BLOCKS) for extension, prefixes in COMMENT_PREFIXES.items()
+                        if prefixes in (_C_COMMENTS, _C_COMMENTS + _HASH_COMMENTS, ()))
+# تا این تعداد مسیر کنار گذاشته شده (فایل‌های generated و vendored) با ':(exclude)' به گیت داده می‌شوند؛
+# بیشتر از آن، گیت همه را diff می‌کند و نتیجه آن‌ها بعداً دور ریخته می‌شود
+EXCLUDE_PATHSPEC_LIMIT = 1000
+
+
+def _run_git(args):
+    """یک دستور diff گیت را اجرا کرده و خروجی را برمی‌گرداند (None در صورت خطا)."""
+    result = run_git(
+        ['git'] + args,
+        check=False,
+        capture_output=True,
+        text=True,
+        encoding='utf-8',
+        errors='surrogateescape',
+        cwd=git_cwd()
+    )
+    if result.returncode != 0:
+        print(f"Error running 'git {' '.join(args[:3])}':\n{result.stderr}", file=sys.stderr)
+        return None
+    return result.stdout
+
+
+def parse_numstat(output):
+    """خروجی `git diff --numstat -z` را به {مسیر: (اضافه، حذف)} تبدیل می‌کند (فایل‌های باینری حذف می‌شوند)."""
+    stats = {}
+    fields = iter(output.split('\0'))
+    for token in fields:
+        if not token:
+            continue
+        additions, deletions, path = token.split('\t', 2)
+        if path == '':
+            # rename/copy: مسیر قبلی و مسیر جدید در دو فیلد بعدی می‌آیند
+            next(fields, None)
+            path = next(fields, '')
+        if additions != '-':
+            stats[path] = (int(additions), int(deletions))
+    return stats
+
+
+def _base_args(base):
+    """آرگومان کامیت مبنا برای `git diff --cached` (خالی یعنی HEAD)."""
+    return [base] if base else []
+
+
+def find_whitespace_only(pathspec=(), base=None):
+    """
+    فایل‌هایی که فقط فاصله‌گذاری آن‌ها تغییر کرده را با دو فراخوانی numstat (بدون توجه به تعداد فایل‌ها) پیدا می‌کند:
+    یکی معمولی و یکی با `-w --ignore-blank-lines`. فایلی که در دومی تغییری ندارد فقط فاصله‌گذاری دارد.
+    """
+    normal = _run_git(['diff', '--cached', '--numstat', '-z'] + _base_args(base) + ['--'] + list(pathspec))
+    ignoring = _run_git(['diff', '--cached', '-w', '--ignore-blank-lines', '--numstat', '-z']
+                        + _base_args(base) + ['--'] + list(pathspec))
+    if normal is None or ignoring is None:
+        return set()
+    ignoring_stats = parse_numstat(ignoring)
+    return {path for path, counts in parse_numstat(normal).items()
+            if counts != (0, 0) and ignoring_stats.get(path, (0, 0)) == (0, 0)}
+
+
+def is_comment_line(line, comment_prefixes):
+    """یک خط تغییر یافته (بدون +/-) توضیح یا خط خالی است؟"""
+    stripped = line.strip()
+    return not stripped or stripped.startswith(comment_prefixes)
+
+
+def classify_block_line(stripped, block_end, blocks, comment_prefixes):
+    """
+    یک خط تغییر یافته را با توجه به بلوک‌های توضیح و docstring دسته‌بندی می‌کند.
+
+    Args:
+        stripped (str): خط بدون +/- و فاصله‌های دو طرف.
+        block_end (str | None): جداکننده پایان بلوکی که خط داخل آن است (None بیرون از بلوک).
+        blocks (tuple): جفت‌های (شروع، پایان) زبان فایل.
+
+    Returns:
+        tuple: (توضیح است؟، block_end بعد از این خط)
+    """
+    if block_end is None:
+        for start, end in blocks:
+            if stripped.startswith(start):
+                block_end, stripped = end, stripped[len(start):]
+                break
+        else:
+            return is_comment_line(stripped, comment_prefixes), None
+    if block_end not in stripped:
+        return True, block_end
+    # بعد از پایان بلوک فقط یک توضیح دیگر یا هیچ چیز می‌تواند بیاید ('*/ x = 1;' کد است)
+    rest = stripped.split(block_end, 1)[1]
+    if rest.strip() and not is_comment_line(rest, comment_prefixes):
+        return False, None
+    return True, None
+
+
+def _diff_path(line):
+    """مسیر فایل را از خط '--- a/path' یا '+++ b/path' برمی‌گرداند (None برای /dev/null یا مسیرهای quote شده)."""
+    path = line[4:].rstrip('\n')
+    if path == '/dev/null' or path.startswith('"'):
+        return None
+    return path[2:]
+
+
+def find_comment_only(pathspec=(), base=None):
+    """
+    فایل‌هایی که فقط توضیحات یا docstring آن‌ها تغییر کرده را از یک diff جریانی
+    (`git diff --cached -U0`) پیدا می‌کند. خطوط تغییر یافته بر اساس زبان فایل دسته‌بندی می‌شوند.
+
+    تشخیص محافظه‌کارانه است: خطی از وسط یک docstring یا بلوک '/* */' که جداکننده شروع آن در
+    همان بخش diff نیامده کد حساب می‌شود، پس فایل به اشتباه «فقط توضیح» علامت نمی‌خورد.
+    """
+    process = popen_git(
+        ['git', 'diff', '--cached', '-U0', '--no-color', '--no-ext-diff',
+         '--src-prefix=a/', '--dst-prefix=b/'] + _base_args(base) + ['--'] + list(pathspec),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        encoding='utf-8',
+        errors='surrogateescape',
+        cwd=git_cwd()
+    )
+
+    comment_only = set()
+    path = None
+    prefixes = None  # None یعنی زبان فایل پشتیبانی نمی‌شود یا خطی از کد دیده شده
+    blocks = ()
+    block_end = None  # جداکننده پایان بلوک توضیحی که خط فعلی داخل آن است
+    sign = None
+    saw_comment = False
+
+    def finish():
+        if path and prefixes is not None and saw_comment:
+            comment_only.add(path)
+
+    for line in process.stdout:
+        if line.startswith('diff --git '):
+            finish()
+            path, prefixes, saw_comment = None, None, False
+            continue
+        if line.startswith('--- '):
+            path = _diff_path(line)
+            continue
+        if line.startswith('+++ '):
+            path = _diff_path(line) or path
+            extension = os.path.splitext(path or '')[1].lower()
+            prefixes = COMMENT_PREFIXES.get(extension)
+            blocks = BLOCK_DELIMITERS.get(extension, ())
+            block_end = None
+            continue
+        if line.startswith('@@'):
+            block_end = None  # هر hunk مستقل بررسی می‌شود
+            continue
+        if prefixes is None or line[:1] not in ('+', '-'):
+            continue
+        if line[0] != sign:
+            # خطوط حذف شده و اضافه شده دو متن جدا هستند؛ وضعیت بلوک بینشان منتقل نمی‌شود
+            sign, block_end = line[0], None
+
+        stripped = line[1:].strip()
+        is_comment, block_end = classify_block_line(stripped, block_end, blocks, prefixes)
+        if is_comment:
+            saw_comment = saw_comment or bool(stripped)
+        else:
+            prefixes = None  # این فایل تغییر کد دارد
+    finish()
+    process.stdout.close()
+    process.wait()
+    return comment_only
+
+
+def read_diff_signals(paths=None, base=None, exclude=()):
+    """
+    پرچم‌های WHITESPACE_ONLY و COMMENT_ONLY را برای فایل‌های stage شده برمی‌گرداند.
+    تعداد فراخوانی‌های گیت ثابت است (سه فراخوانی) و به تعداد فایل‌ها بستگی ندارد.
+
+    Args:
+        paths (list): محدود کردن به این مسیرها (اختیاری، مثلاً فایل‌های تغییر یافته بعد از refresh).
+        base (str): مقایسه index با این کامیت به جای HEAD (برای --amend).
+        exclude (list): مسیرهایی که diff آن‌ها خوانده نمی‌شود (FileAttributes.content_excluded).
+
+    Returns:
+        dict: {مسیر: پرچم‌ها} فقط برای فایل‌هایی که پرچم دارند.
+    """
+    exclude = set(exclude)
+    if paths is not None and exclude:
+        paths = [path for path in paths if path not in exclude]
+        if not paths:
+            return {}
+    # ':(literal)' تا کاراکترهایی مثل '*' در نام فایل‌ها الگو تفسیر نشوند و 'top' چون مسیرها نسبت به
+    # ریشه مخزن هستند (نه دایرکتوری جاری)
+    pathspec = [f":(top,literal){path}" for path in paths or ()]
+    if exclude and paths is None and len(exclude) <= EXCLUDE_PATHSPEC_LIMIT:
+        # فقط الگوهای exclude: گیت بقیه فایل‌ها را مثل ':' در نظر می‌گیرد
+        pathspec = [f":(top,exclude,literal){path}" for path in sorted(exclude)]
+    # فایل‌های منطبق با cmsg.exclude هم در خود دستورهای diff کنار گذاشته می‌شوند
+    pathspec += exclude_pathspecs()
+    signals = dict.fromkeys(find_whitespace_only(pathspec, base), WHITESPACE_ONLY)
+    for path in find_comment_only(pathspec, base):
+        # فایلی که فقط فاصله‌گذاری آن تغییر کرده، style حساب می‌شود نه docs
+        if path not in signals:
+            signals[path] = COMMENT_ONLY
+    for path in exclude.intersection(signals):
+        del signals[path]
+    return signals
@@ -0,0 +1,134 @@
+# file_attributes.py
+
+import os
+import sys
+
+from git_executor import run_git
+
+# --- پرچم‌های هر فایل از .gitattributes ---
+GENERATED = 1  # linguist-generated
+VENDORED = 2  # linguist-vendored
+BINARY = 4  # binary یا -diff (diff متنی ندارد)
+
+# فایل‌هایی با این پرچم‌ها در وزن‌دهی نوع و محدوده شمرده نمی‌شوند
+WEIGHT_EXCLUDED = GENERATED | VENDORED
+# فایل‌هایی با این پرچم‌ها در مراحل وابسته به محتوا (سیگنال‌های diff، نمادهای پایتون) خوانده نمی‌شوند
+CONTENT_EXCLUDED = GENERATED | VENDORED | BINARY
+
+# ویژگی‌هایی که با یک فراخوانی `git check-attr` خوانده می‌شوند
+ATTRIBUTE_NAMES = ('linguist-generated', 'linguist-vendored', 'linguist-language', 'binary', 'diff')
+
+# linguist-language (با حروف کوچک) ← پسوندی که classify_file_type برای آن زبان استفاده می‌کند
+LANGUAGE_EXTENSIONS = {
+    'python': '.py',
+    'markdown': '.md', 'text': '.txt', 'restructuredtext': '.rst', 'asciidoc': '.adoc',
+    'json': '.json', 'yaml': '.yml', 'ini': '.ini', 'toml': '.toml',
+    'css': '.css', 'scss': '.scss', 'less': '.less', 'sass': '.sass',
+    'shell': '.sh', 'javascript': '.js', 'typescript': '.ts',
+    'csv': '.csv', 'xml': '.xml', 'sql': '.sql',
+}
+
+# linguist مقدار 'false' را هم مثل unset در نظر می‌گیرد (مثلاً `*.pb.go linguist-generated=false`)
+_FALSE_VALUES = ('unset', 'unspecified', 'false')
+
+
+class FileAttributes:
+    """
+    ویژگی‌های .gitattributes فایل‌های stage شده، فقط برای فایل‌هایی که ویژگی مرتبطی دارند:
+      flags      {مسیر: پرچم‌ها} (GENERATED، VENDORED، BINARY)
+      languages  {مسیر: پسوند زبان} از linguist-language
+    """
+
+    __slots__ = ('flags', 'languages')
+
+    def __init__(self):
+        self.flags = {}
+        self.languages = {}
+
+    def __bool__(self):
+        return bool(self.flags or self.languages)
+
+    def is_weighted(self, path):
+        """آیا فایل در وزن‌دهی نوع و محدوده شمرده می‌شود؟ (فایل‌های generated و vendored نه)"""
+        return not self.flags.get(path, 0) & WEIGHT_EXCLUDED
+
+    def language_extension(self, path):
+        """پسوند زبان تعیین شده با linguist-language، یا None."""
+        return self.languages.get(path)
+
+    def content_excluded(self):
+        """مسیرهایی که مراحل وابسته به محتوا نباید بخوانند."""
+        return [path for path, flags in self.flags.items() if flags & CONTENT_EXCLUDED]
+
+    def update(self, other, paths=()):
+        """ویژگی‌های paths را با other جایگزین می‌کند (بعد از refresh فایل‌های تغییر یافته)."""
+        for path in paths:
+            self.flags.pop(path, None)
+            self.languages.pop(path, None)
+        self.flags.update(other.flags)
+        self.languages.update(other.languages)
+
+
+def parse_check_attr_output(output):
+    """
+    خروجی `git check-attr -z` (path NUL attribute NUL info NUL ...) را به FileAttributes تبدیل می‌کند.
+    """
+    attributes = FileAttributes()
+    fields = output.split('\0')
+    for index in range(0, len(fields) - 2, 3):
+        path, name, value = fields[index], fields[index + 1], fields[index + 2]
+        if name == 'linguist-language':
+            extension = LANGUAGE_EXTENSIONS.get(value.lower()) if value not in _FALSE_VALUES else None
+            if extension:
+                attributes.languages[path] = extension
+            continue
+        if name == 'diff':
+            flag = BINARY if value == 'unset' else 0  # -diff
+        elif value in _FALSE_VALUES:
+            flag = 0
+        else:
+            flag = {'linguist-generated': GENERATED, 'linguist-vendored': VENDORED, 'binary': BINARY}.get(name, 0)
+        if flag:
+            attributes.flags[path] = attributes.flags.get(path, 0) | flag
+    return attributes
+
+
+def read_file_attributes(paths):
+    """
+    ویژگی‌های ATTRIBUTE_NAMES را برای همه paths با یک فرآیند `git check-attr --stdin -z` می‌خواند.
+    --cached: ویژگی‌ها از .gitattributes موجود در index خوانده می‌شوند (همان چیزی که کامیت می‌شود).
+    paths نسبت به ریشه مخزن هستند و check-attr آن‌ها را نسبت به cwd می‌خواند، پس دستور از ریشه اجرا می‌شود.
+
+    Returns:
+        FileAttributes: خالی اگر paths خالی باشد یا دستور گیت ناموفق باشد.
+    """
+    paths = list(paths)
+    if not paths:
+        return FileAttributes()
+    from git_utils import GitNotFoundError, NotARepositoryError, find_repository
+    try:
+        top_level = find_repository()[0]
+    except (GitNotFoundError, NotARepositoryError):
+        return FileAttributes()
+    try:
+        result = run_git(
+            ['git', 'check-attr', '--cached', '--stdin', '-z'] + list(ATTRIBUTE_NAMES),
+            input='\0'.join(paths) + '\0',
+            check=False,
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='surrogateescape',
+            cwd=top_level
+        )
+    except FileNotFoundError:
+        return FileAttributes()
+    if result.returncode != 0:
+        print(f"Warning: Could not read .gitattributes (git check-attr):\n{result.stderr}", file=sys.stderr)
+        return FileAttributes()
+    return parse_check_attr_output(result.stdout)
+
+
+def touches_gitattributes(paths):
+    """آیا یکی از paths یک فایل .gitattributes است؟ (در این صورت ویژگی همه فایل‌ها ممکن است عوض شده باشد)"""
+    return any(os.path.basename(path) == '.gitattributes' for path in paths)
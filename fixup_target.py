@@ -0,0 +1,148 @@
+# fixup_target.py
+
+import re
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from path_exclusions import exclude_pathspecs
+from git_executor import git_cwd, popen_git, run_git, submit_in_context
+
+# بودجه کل زمان blame برای پیدا کردن کامیت هدف (میلی‌ثانیه)؛ قابل تغییر با cmsg.fixupBudget
+FIXUP_BUDGET_MS = 3000
+# حداکثر تعداد فایل‌هایی که همزمان blame می‌شوند
+FIXUP_MAX_WORKERS = 8
+
+# @@ -start[,count] +start[,count] @@
+HUNK_HEADER_PATTERN = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@')
+# سرخط هر بخش در خروجی `git blame --incremental`: sha خط_اصلی خط_نهایی تعداد_خطوط
+BLAME_HEADER_PATTERN = re.compile(r'^([0-9a-f]{40,64}) \d+ \d+ (\d+)$')
+
+
+def read_touched_ranges():
+    """
+    بازه خطوطی از نسخه HEAD هر فایل که hunk های stage شده تغییر می‌دهند را از یک diff جریانی
+    (`git diff --cached -U0`) برمی‌گرداند. برای hunk هایی که فقط خط اضافه می‌کنند، خط قبل از
+    محل اضافه شدن (که کد جدید کنار آن نوشته شده) در نظر گرفته می‌شود. فایل‌های جدید حذف می‌شوند.
+
+    Returns:
+        dict: {مسیر: [(شروع، پایان), ...]}
+    """
+    process = popen_git(
+        ['git', 'diff', '--cached', '-U0', '--no-color', '--no-ext-diff', '--no-renames',
+         '--src-prefix=a/', '--dst-prefix=b/', '--'] + exclude_pathspecs(),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        encoding='utf-8',
+        errors='surrogateescape',
+        cwd=git_cwd()
+    )
+    ranges = {}
+    path = None
+    for line in process.stdout:
+        if line.startswith('--- '):
+            old_path = line[4:].rstrip('\n')
+            # فایل جدید (/dev/null) یا مسیر quote شده تاریخچه قابل blame ندارد
+            path = None if old_path == '/dev/null' or old_path.startswith('"') else old_path[2:]
+            continue
+        if path is None or not line.startswith('@@'):
+            continue
+        match = HUNK_HEADER_PATTERN.match(line)
+        if not match:
+            continue
+        start = int(match.group(1))
+        count = int(match.group(2)) if match.group(2) is not None else 1
+        if count == 0:
+            # فقط اضافه شدن خط بعد از خط start (start صفر یعنی ابتدای فایل)
+            start, count = max(start, 1), 1
+        ranges.setdefault(path, []).append((start, start + count - 1))
+    process.stdout.close()
+    process.wait()
+    return ranges
+
+
+def blame_ranges(path, line_ranges, timeout):
+    """
+    خطوط line_ranges از فایل path را با یک `git blame --incremental` (با چند -L) روی HEAD بررسی می‌کند.
+
+    Returns:
+        dict: {sha کامیت: تعداد خطوط}؛ خالی در صورت خطا یا تمام شدن زمان.
+    """
+    command = ['git', 'blame', '--incremental']
+    for start, end in line_ranges:
+        command += ['-L', f"{start},{end}"]
+    command += ['HEAD', '--', path]
+    try:
+        result = run_git(
+            command,
+            check=False,
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='surrogateescape',
+            timeout=timeout,
+            cwd=git_cwd()
+        )
+    except subprocess.TimeoutExpired:
+        return {}
+    if result.returncode != 0:
+        return {}
+
+    counts = {}
+    boundary = set()  # کامیت‌های مرزی (مثلاً کامیت ریشه) هدف fixup نیستند
+    current = None
+    for line in result.stdout.split('\n'):
+        match = BLAME_HEADER_PATTERN.match(line)
+        if match:
+            current = match.group(1)
+            counts[current] = counts.get(current, 0) + int(match.group(2))
+        elif line == 'boundary' and current:
+            boundary.add(current)
+    for sha in boundary:
+        counts.pop(sha, None)
+    return counts
+
+
+def find_fixup_target(budget_ms=None, workers=None):
+    """
+    کامیتی که بیشترین خطوط تغییر یافته stage شده را نوشته است (هدف `git commit --fixup`).
+    فایل‌ها به صورت همزمان blame می‌شوند و کل کار بودجه زمانی مشترک دارد؛ فایل‌هایی که در
+    بودجه تمام نشوند نادیده گرفته می‌شوند و نتیجه از بقیه فایل‌ها محاسبه می‌شود.
+
+    Returns:
+        tuple: (sha، سهم خطوط بین 0 و 1)، یا None اگر هدفی پیدا نشد.
+    """
+    from cmsg_config import get_setting
+    if budget_ms is None:
+        budget_ms = get_setting('cmsg.fixupbudget', FIXUP_BUDGET_MS)
+    workers = workers or get_setting('cmsg.workers') or FIXUP_MAX_WORKERS
+
+    touched = read_touched_ranges()
+    if not touched:
+        return None
+
+    deadline = time.monotonic() + budget_ms / 1000
+    totals = {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(touched))) as pool:
+        # هر blame با زمان باقی‌مانده بودجه در لحظه شروع محدود می‌شود
+        def run(path, line_ranges):
+            remaining = deadline - time.monotonic()
+            return blame_ranges(path, line_ranges, remaining) if remaining > 0 else {}
+
+        pending = {submit_in_context(pool, run, path, line_ranges) for path, line_ranges in touched.items()}
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break  # بودجه تمام شد
+            for future in done:
+                for sha, lines in future.result().items():
+                    totals[sha] = totals.get(sha, 0) + lines
+        for future in pending:
+            future.cancel()
+
+    if not totals:
+        return None
+    sha, lines = max(totals.items(), key=lambda item: item[1])
+    return sha, lines / sum(totals.values())
@@ -3,49 +3,257 @@
 #!/usr/bin/env python3
 
 import sys
+import multiprocessing
 
 # Define the application version
 # شماره نسخه برنامه را در اینجا تعریف می کنیم
 __version__ = "0.2.1"
 
 # Import necessary modules and functions
-from git_utils import check_git_installed, is_in_git_repository, get_staged_files, perform_commit
+from git_executor import install_from_environment
+from git_utils import check_git_installed, is_in_git_repository, perform_commit
 # MESSAGES برای انتخاب زبان اولیه و پاس دادن به help_handler نیاز است
 from messages import get_localized_message, MESSAGES
 # Import the new general argument handler function
 # ایمپورت کردن تابع جدید handle_arguments از فایل help_handler.py
 from help_handler import handle_arguments
-from ui import get_commit_type, get_commit_subject, get_commit_scope, get_commit_body, get_commit_issues, confirm_commit
+# ui.py (و prompt_toolkit) فقط در جریان تعاملی import می‌شود؛ زیردستورهایی مثل `suggest` بدون TTY اجرا می‌شوند
 
-# Import prompt-toolkit specific things needed in main (for language selection)
-from prompt_toolkit import prompt
-from prompt_toolkit.validation import Validator, ValidationError
+# تحلیل تغییرات در چند سطح (مسیرها، تعداد خطوط، محتوا) در پس‌زمینه
+from progressive_analysis import ProgressiveAnalysis
+# معیارهای اجرا (opt-in با GIT_CMSG_METRICS=1)
+from run_metrics import RunMetrics
+# تنظیمات git config (cmsg.*) که با متغیرهای محیطی و پرچم‌ها قابل تغییر هستند
+from cmsg_config import get_setting
+from staged_files import read_staged_files
+from git_utils import get_index_path, get_index_signature, get_commit_info, get_amend_base, get_staged_files
+from split_planner import cluster_staged_files, SPLIT_HINT_MIN_FILES
+# فهرست دایرکتوری‌ها و پکیج‌های کل مخزن برای تکمیل محدوده (با کش در دایرکتوری گیت)
+from path_index import start_loading_path_index
+# نمایه افراد و trailer های تاریخچه برای تکمیل Co-authored-by، Reviewed-by و Refs
+from trailer_index import start_loading_trailer_index
+# پیش‌نویس پاسخ‌ها و پیام در دایرکتوری گیت برای --retry و --resume بعد از شکست کامیت
+from commit_draft import CommitDraft
 
-# اضافه کردن import جدید برای تحلیلگر تغییرات
-from change_analyzer import analyze_staged_changes
+# Buffered output helpers for the staged file list
+from output_writer import write_lines, page_text, summarize_paths, DEFAULT_SUMMARY_PATHS
 
 # --- Import message_formatter module ---
 import message_formatter
 
 
-# --- Language Validator ---
-class LanguageValidator(Validator):
-    def validate(self, document):
-        text = document.text.strip().lower()
-        if text in ['en', 'fa']:
-            return  # Valid input
-        else:
-            raise ValidationError(
-                message=get_localized_message(
-                    'invalid_lang', 'en') + " / " + get_localized_message('invalid_lang', 'fa'),
-                cursor_position=len(document.text))
+def ask_language():
+    """
+    زبان را به صورت تعاملی می‌پرسد (فقط وقتی زبان با --lang، GIT_CMSG_LANG یا cmsg.lang تعیین نشده باشد).
+    Validator فقط در همین حالت ساخته می‌شود.
+    """
+    from prompt_toolkit.validation import Validator, ValidationError
+    from ui import ask
+
+    # --- Language Validator ---
+    class LanguageValidator(Validator):
+        def validate(self, document):
+            text = document.text.strip().lower()
+            if text in ['en', 'fa']:
+                return  # Valid input
+            else:
+                raise ValidationError(
+                    message=get_localized_message(
+                        'invalid_lang', 'en') + " / " + get_localized_message('invalid_lang', 'fa'),
+                    cursor_position=len(document.text))
+
+    while True:
+        try:
+            lang_input = ask(
+                f"{MESSAGES['en']['select_lang']}/{MESSAGES['fa']['select_lang']}",
+                validator=LanguageValidator(),
+                step='lang'
+            ).strip().lower()
+
+            if lang_input in ['en', 'fa']:
+                return lang_input  # زبان انتخاب شده
+        except EOFError:  # کاربر Ctrl+D را حین prompt زد
+            print("\nعملیات کامیت توسط کاربر لغو شد.", file=sys.stderr)
+            sys.exit(1)
+        except Exception as e:  # گرفتن خطاهای غیرمنتظره دیگر حین انتخاب زبان
+            print(f"خطایی هنگام انتخاب زبان رخ داد: {e}", file=sys.stderr)
+            sys.exit(1)
 
 # تابع display_help حذف شده و به help_handler.py منتقل شده است
 
 
+def make_refresh_handler(analysis, chosen_lang, accepted=None):
+    """
+    تابعی برای اکشن 'r' در مرحله تایید می‌سازد.
+    تحلیلگر عمیق‌ترین سطح تحلیل (analysis.final()) فقط هنگام اولین refresh گرفته می‌شود.
+    فایل index را stat می‌کند و فقط اگر از زمان خواندن snapshot اولیه (analysis.index_signature، نه زمان
+    پیش‌نمایش) تغییر کرده باشد snapshot جدید را می‌خواند؛
+    سپس فقط ورودی‌های اضافه، حذف یا تغییر یافته دوباره تحلیل می‌شوند و لیست فایل‌های پیام بروز می‌شود.
+    accepted: {'type'/'scope': مقدار} بخش‌هایی از سرخط که کاربر همان پیشنهاد را پذیرفته؛ این بخش‌ها با
+    پیشنهاد جدید جایگزین می‌شوند (مگر اینکه کاربر سرخط را در ویرایشگر تغییر داده باشد)، بقیه فقط چاپ می‌شوند.
+    """
+    index_path = get_index_path()
+    state = {'signature': analysis.index_signature, 'accepted': dict(accepted or {})}
+
+    def refresh(current_message):
+        signature = get_index_signature(index_path)
+        if signature == state['signature']:
+            print(get_localized_message('index_unchanged', chosen_lang), file=sys.stderr)
+            return None
+
+        # با --amend، snapshot جدید هم با والد HEAD مقایسه می‌شود (analysis.base)
+        new_staged = read_staged_files(base=analysis.base)
+        if new_staged is None:
+            return None
+        if not new_staged:
+            # همه فایل‌ها از stage خارج شده‌اند؛ snapshot قبلی حفظ می‌شود
+            print(get_localized_message('no_staged_files', chosen_lang), file=sys.stderr)
+            return None
+
+        final = analysis.final()
+        if final is None or final['analyzer'] is None:
+            return None
+        analyzer = final['analyzer']
+        state['signature'] = signature
+        delta = analyzer.apply_snapshot(new_staged)
+        print(get_localized_message('index_refreshed', chosen_lang,
+                                    added=len(delta['added']), removed=len(delta['removed']),
+                                    changed=len(delta['changed'])))
+        new_suggestions = analyzer.suggestions()
+        message = message_formatter.replace_file_list(current_message, new_staged, chosen_lang)
+
+        accepted = state['accepted']
+        updates = {key: new_suggestions[key] for key in accepted
+                   if new_suggestions[key] != accepted[key] and (new_suggestions[key] or key == 'scope')}
+        updated = message_formatter.replace_header_parts(message, accepted, updates) if updates else message
+        print(get_localized_message('refreshed_suggestion', chosen_lang,
+                                    type=new_suggestions['type'], scope=new_suggestions['scope']))
+        if updated != message:
+            accepted.update(updates)
+            print(get_localized_message('refreshed_header', chosen_lang, header=updated.split("\n", 1)[0]))
+        return updated
+
+    return refresh
+
+
+def run_fixup(args, chosen_lang):
+    """
+    جریان --fixup: کامیت هدف را پیدا می‌کند ('auto' با blame بازه خطوط تغییر یافته در
+    fixup_target.py، یا هر revision دیگر) و تغییرات stage شده را با پیام `fixup! <موضوع هدف>`
+    کامیت می‌کند تا `git rebase --autosquash` آن را در هدف ادغام کند. بدون سوال‌های نوع/موضوع.
+
+    Returns:
+        int: کد خروج.
+    """
+    from ui import confirm_commit
+    get_staged_files()  # اگر چیزی stage نشده باشد پیام مناسب را چاپ کرده و خارج می‌شود
+
+    if args.fixup == 'auto':
+        # import تنبل: فقط برای --fixup auto لازم است
+        from fixup_target import find_fixup_target
+        found = find_fixup_target()
+        if found is None:
+            print(get_localized_message('fixup_target_not_found', chosen_lang), file=sys.stderr)
+            return 1
+        target, share = found
+    else:
+        target, share = args.fixup, None
+
+    info = get_commit_info(target)
+    if info is None:
+        print(get_localized_message('fixup_invalid_target', chosen_lang, revision=target), file=sys.stderr)
+        return 1
+    commit_id, _, message = info
+    subject = message.split('\n', 1)[0]
+    if share is not None:
+        print(get_localized_message('fixup_target_found', chosen_lang, sha=commit_id[:7], subject=subject,
+                                    share=round(share * 100)))
+
+    confirmed_message = confirm_commit(f"fixup! {subject}", chosen_lang, full_view=args.full_list)
+    if confirmed_message is None:
+        return 1
+    committed = perform_commit(confirmed_message, mode=args.commit_mode,
+                               no_verify=args.no_verify, report_timings=args.timings)
+    return 0 if committed else 1
+
+
+def finish_commit(draft, committed, chosen_lang):
+    """بعد از کامیت موفق پیش‌نویس حذف می‌شود؛ بعد از شکست، راه ادامه (--retry) چاپ می‌شود."""
+    if committed:
+        draft.discard()
+    elif draft.path:
+        print(get_localized_message('draft_saved_retry', chosen_lang), file=sys.stderr)
+
+
+def run_resume(args, draft, chosen_lang, metrics):
+    """
+    ادامه از پیش‌نویسی که پیامش برای همین index و HEAD ساخته شده: بدون تحلیل و سوال‌ها.
+    --retry پیام تایید شده را مستقیم کامیت می‌کند؛ --resume (یا پیام تایید نشده) ابتدا تایید را نشان می‌دهد.
+
+    Returns:
+        int: کد خروج.
+    """
+    from ui import confirm_commit
+    message = draft.message
+    if not (args.retry and draft.confirmed):
+        message = confirm_commit(message, chosen_lang, full_view=args.full_list,
+                                 preview_paths=get_setting('cmsg.filelistcap', DEFAULT_SUMMARY_PATHS))
+        if message is None:
+            metrics.save('aborted')
+            return 1
+        draft.set_message(message, confirmed=True)
+    else:
+        print(get_localized_message('draft_retrying', chosen_lang, subject=message.split('\n', 1)[0]))
+
+    metrics.record('backend', args.commit_mode)
+    with metrics.phase('commit'):
+        committed = perform_commit(message, mode=args.commit_mode, no_verify=args.no_verify,
+                                   report_timings=args.timings, amend=draft.amend)
+    metrics.save('committed' if committed else 'failed')
+    finish_commit(draft, committed, chosen_lang)
+    return 0 if committed else 1
+
+
+def run_subcommand(argv):
+    """
+    زیردستورهای غیرتعاملی (مثل `git-cmsg lint`) را اجرا می‌کند.
+    ماژول هر زیردستور فقط هنگام نیاز import می‌شود تا شروع برنامه سریع بماند.
+
+    Returns:
+        int | None: کد خروج زیردستور، یا None اگر argv با یک زیردستور شروع نشود.
+    """
+    if not argv:
+        return None
+    command, command_args = argv[0], argv[1:]
+    if command == 'lint':
+        from commit_linter import run_lint_command
+        return run_lint_command(command_args)
+    if command == 'changelog':
+        from changelog_generator import run_changelog_command
+        return run_changelog_command(command_args)
+    if command == 'stats':
+        from run_metrics import run_stats_command
+        return run_stats_command(command_args)
+    if command == 'split':
+        from split_planner import run_split_command
+        return run_split_command(command_args)
+    if command == 'suggest':
+        from suggest_command import run_suggest_command
+        return run_suggest_command(command_args)
+    return None
+
+
 def main():
     """تابع اصلی برای اجرای برنامه git-cmsg."""
 
+    # ضبط یا پخش فراخوانی‌های git برای تست‌ها و بنچمارک‌ها (GIT_CMSG_GIT_RECORD / GIT_CMSG_GIT_REPLAY)
+    install_from_environment()
+
+    # --- مرحله 0-الف: زیردستورها (lint, ...) بدون prompt تعاملی اجرا می‌شوند ---
+    exit_code = run_subcommand(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
     # --- مرحله 0: تحلیل آرگومان های خط فرمان و مدیریت راهنما و نسخه ---
     # فراخوانی تابع handle_arguments از help_handler.py
     # این تابع آرگومان های خط فرمان را بررسی می‌کند (--help, --version).
@@ -53,7 +261,10 @@ def main():
     # اگر --help یا -h داده شده باشد، راهنما را نمایش داده و برنامه خارج می‌شود.
     # در غیر این صورت، اجرای برنامه در اینجا ادامه پیدا می‌کند.
     # دیکشنری پیام ها (MESSAGES) و شماره نسخه (از متغیر __version__) را به تابع می فرستیم.
-    handle_arguments(MESSAGES, __version__)
+    args = handle_arguments(MESSAGES, __version__)
+    metrics = RunMetrics()
+    from ui import (get_commit_type, get_commit_subject, get_commit_scope, get_commit_body, get_commit_issues,
+                    get_commit_trailers, confirm_commit)
 
     # --- ادامه اجرای عادی برنامه اگر پرچم خاصی وجود نداشت ---
 
@@ -68,50 +279,132 @@ def main():
 
     print("گیت نصب است و شما در یک مخزن گیت قرار دارید.")
 
-    # --- مرحله 4: انتخاب زبان (با استفاده از prompt_toolkit) ---
-    # این بخش همچنان پس از بررسی پرچم راهنما و نسخه در handle_arguments اجرا می‌شود
-    # و از prompt_toolkit برای ورودی تعاملی استفاده می‌کند.
-    chosen_lang = 'en'  # زبان پیش‌فرض قبل از انتخاب
-    while True:
-        try:
-            lang_input = prompt(
-                f"{MESSAGES['en']['select_lang']}/{MESSAGES['fa']['select_lang']}",
-                validator=LanguageValidator()
-            ).strip().lower()
+    # --fixup جریان جدای خودش را دارد (بدون تحلیل و سوال‌های پیام)
+    if args.fixup:
+        sys.exit(run_fixup(args, args.lang or ask_language()))
 
-            if lang_input in ['en', 'fa']:
-                chosen_lang = lang_input  # تنظیم زبان انتخاب شده
-                break  # خروج از حلقه
-        except EOFError:  # کاربر Ctrl+D را حین prompt زد
-            print("\nعملیات کامیت توسط کاربر لغو شد.", file=sys.stderr)
+    # --retry / --resume: ادامه از پیش‌نویس اجرای قبلی. اگر index و HEAD همان باشند مستقیم به تایید
+    # یا کامیت می‌رویم؛ در غیر این صورت جریان عادی با پاسخ‌های پیش‌نویس به عنوان مقدار پیش‌فرض اجرا می‌شود.
+    resumed = None
+    if args.retry or args.resume:
+        resumed = CommitDraft.load()
+        if resumed is None:
+            print(get_localized_message('draft_not_found', args.lang or 'en'), file=sys.stderr)
             sys.exit(1)
-        except Exception as e:  # گرفتن خطاهای غیرمنتظره دیگر حین انتخاب زبان
-            print(f"خطایی هنگام انتخاب زبان رخ داد: {e}", file=sys.stderr)
+        args.lang = args.lang or resumed.lang
+        args.amend = resumed.amend
+        if resumed.message and resumed.matches_index():
+            sys.exit(run_resume(args, resumed, args.lang or ask_language(), metrics))
+
+    # --amend: تغییرات HEAD به همراه تغییرات stage شده تحلیل می‌شوند (index در برابر والد HEAD)
+    # و سوال‌ها با پیام فعلی HEAD پر می‌شوند
+    amend_base = None
+    previous = {}
+    if args.amend:
+        head = get_commit_info('HEAD')
+        amend_base = get_amend_base(head[1]) if head else None
+        if amend_base is None:
+            print(get_localized_message('amend_no_commit', args.lang or 'en'), file=sys.stderr)
             sys.exit(1)
+        previous = message_formatter.parse_message(head[2])
+    if resumed is not None:
+        previous = resumed.answers
+
+    # تحلیل تغییرات از همین حالا در پس‌زمینه شروع می‌شود (همزمان با انتخاب زبان)
+    analysis = ProgressiveAnalysis(stats=metrics.values, base=amend_base)
+    # فهرست محدوده‌های کل مخزن هم در پس‌زمینه بارگذاری می‌شود؛ تا آماده نشده، Tab فقط دایرکتوری‌های stage شده را پیشنهاد می‌دهد
+    scope_index = start_loading_path_index() if get_setting('cmsg.scopeindex', True) else None
+
+    # --- مرحله 4: انتخاب زبان (با استفاده از prompt_toolkit) ---
+    # اگر زبان با --lang، GIT_CMSG_LANG یا `git config cmsg.lang` تعیین شده باشد (handle_arguments)
+    # سوال زبان کاملاً حذف می‌شود؛ در غیر این صورت به صورت تعاملی پرسیده می‌شود.
+    chosen_lang = args.lang or ask_language()
 
     print(get_localized_message("proceeding", chosen_lang, lang=chosen_lang))
+    if resumed is not None:
+        # پیام پیش‌نویس برای index یا HEAD دیگری ساخته شده (یا سوال‌ها تمام نشده بودند)
+        print(get_localized_message('draft_changed' if resumed.confirmed else 'draft_prefilled', chosen_lang))
+    elif args.amend:
+        print(get_localized_message('amend_prefilled', chosen_lang, sha=head[0][:7]))
+    # پاسخ‌ها بعد از هر سوال ذخیره می‌شوند تا با شکست کامیت یا قطع برنامه از دست نروند
+    draft = CommitDraft.start(chosen_lang, amend=args.amend)
 
     # --- مرحله 3: دریافت فایل های stage شده و نمایش آنها ---
-    staged_files = get_staged_files()
+    # لیست فایل‌ها از سطح سریع 'paths' می‌آید (بدون مقایسه محتوا)
+    with metrics.phase('read_staged'):
+        staged_files = analysis.staged_paths()
+    if staged_files is None:
+        sys.exit(1)  # پیام خطا توسط read_staged_files چاپ شده
+    if not staged_files:
+        print("No changes are staged. Please stage changes (`git add .`) before committing.", file=sys.stderr)
+        sys.exit(0)
+    metrics.record('files', len(staged_files))
+    # نمایه trailer ها در پس‌زمینه بروز می‌شود؛ افراد بر اساس فعالیت اخیر زیر مسیرهای همین فایل‌ها رتبه می‌گیرند
+    trailer_index = start_loading_trailer_index(staged_files.paths) if get_setting('cmsg.trailers', True) else None
 
-    print(f"\n{get_localized_message('staged_files_header', chosen_lang)}")
-    for f in staged_files:
-        print(f"- {f}")
-    print("-" * 30)
+    # نمایش لیست با یک write بافر شده؛ برای لیست‌های بزرگ فقط خلاصه (یا pager با --full-list)
+    # تعداد مسیرهای نمای خلاصه با cmsg.fileListCap قابل تنظیم است
+    file_list_cap = get_setting('cmsg.filelistcap', DEFAULT_SUMMARY_PATHS)
+    header = f"\n{get_localized_message('staged_files_header', chosen_lang)}"
+    if args.full_list:
+        page_text("\n".join([header] + message_formatter.file_list_lines(staged_files, chosen_lang) + ["-" * 30]))
+    else:
+        summary = summarize_paths(staged_files, chosen_lang, max_paths=file_list_cap)
+        if staged_files.excluded:
+            # فایل‌های cmsg.exclude فقط به صورت یک خط شمارش می‌آیند
+            summary.append(message_formatter.excluded_files_line(len(staged_files.excluded), chosen_lang))
+        write_lines([header] + summary + ["-" * 30])
+
+    # برای مجموعه‌های بزرگ و مختلط، تقسیم به چند کامیت پیشنهاد می‌شود (git-cmsg split)
+    # (فقط به مسیرها نیاز دارد و قبل از prompt ها چاپ می‌شود)
+    if len(staged_files) >= SPLIT_HINT_MIN_FILES:
+        split_clusters = cluster_staged_files(staged_files)
+        if len(split_clusters) > 1:
+            print(get_localized_message('split_suggested', chosen_lang, count=len(split_clusters)))
 
     # --- اضافه کردن تحلیل تغییرات و ایجاد پیشنهادات ---
-    suggestions = analyze_staged_changes(staged_files)
+    # حداکثر تا مهلت تعیین شده منتظر می‌مانیم؛ پیشنهاد اولیه از عمیق‌ترین سطح کامل شده می‌آید
+    # و سطوح بعدی (تعداد خطوط، سیگنال‌های فاصله‌گذاری/توضیح، نمادهای پایتون) در پس‌زمینه
+    # ادامه پیدا کرده و پیشنهاد نمایش داده شده در prompt باز را بروز می‌کنند.
+    # نتیجه سطحی که بعد از پاسخ کاربر برسد، روی آن پاسخ اثری ندارد.
+    with metrics.phase('analysis'):
+        metrics.record('suggestion_tier', analysis.wait_initial(max(0, args.suggestion_deadline)))
 
     # --- مرحله 5: شروع prompt های تعاملی - جمع آوری تمام داده های پیام کامیت ---
-    commit_type = get_commit_type(chosen_lang, suggestions.get('type', ''))
+    # زمان prompt ها (فکر کردن کاربر) جدا از زمان خود ابزار ثبت می‌شود
+    metrics.start_phase('interactive')
+    # با --amend هر سوال با بخش متناظر پیام HEAD پر می‌شود (previous خالی است در غیر این صورت)
+    commit_type = get_commit_type(chosen_lang, lambda: analysis.suggestion('type'), analysis.pending(),
+                                  default_type=previous.get('type') or get_setting('cmsg.defaulttype'))
+    draft.record('type', commit_type)
+    # بخش‌هایی از سرخط که همان پیشنهاد هستند؛ refresh در مرحله تایید آن‌ها را بروز می‌کند
+    accepted = {'type': commit_type} if commit_type == analysis.suggestion('type') else {}
     commit_subject = get_commit_subject(
-        chosen_lang, commit_type, suggestions.get('subject', ''))
+        chosen_lang, commit_type, lambda: analysis.suggestion('subject'), analysis.pending(),
+        default=previous.get('subject', ''))
+    draft.record('subject', commit_subject)
     commit_scope = get_commit_scope(
-        chosen_lang, commit_type, commit_subject, staged_files, suggestions.get('scope', ''))
+        chosen_lang, commit_type, commit_subject, staged_files,
+        lambda: analysis.suggestion('scope'), analysis.pending(), default=previous.get('scope', ''),
+        scope_index=lambda: scope_index.result() if scope_index and scope_index.done() else None)
+    draft.record('scope', commit_scope)
+    if commit_scope == analysis.suggestion('scope'):
+        accepted['scope'] = commit_scope
     commit_body = get_commit_body(
-        chosen_lang, commit_type, commit_subject, commit_scope)
+        chosen_lang, commit_type, commit_subject, commit_scope, default=previous.get('body', ''))
+    draft.record('body', commit_body)
     commit_issues = get_commit_issues(
-        chosen_lang, commit_type, commit_subject, commit_scope, commit_body)
+        chosen_lang, commit_type, commit_subject, commit_scope, commit_body,
+        candidates=analysis.issue_candidates(), default=previous.get('issues', ''))
+    draft.record('issues', commit_issues)
+    # trailer ها (Co-authored-by، Reviewed-by، Refs، ...)؛ با cmsg.trailers=false پرسیده نمی‌شوند
+    commit_trailers = ''
+    if trailer_index is not None:
+        commit_trailers = get_commit_trailers(
+            chosen_lang, commit_type, commit_subject, commit_scope, commit_body,
+            trailer_index=lambda: trailer_index.result() if trailer_index.done() else None,
+            issue_candidates=analysis.issue_candidates(), default=previous.get('trailers', ''))
+        draft.record('trailers', commit_trailers)
 
     # --- مرحله 6: فرمت کردن داده های جمع آوری شده به رشته نهایی پیام کامیت ---
     commit_data = {
@@ -119,23 +412,41 @@ def main():
         'subject': commit_subject,
         'scope': commit_scope,
         'body': commit_body,
-        'issues': commit_issues
+        'issues': commit_issues,
+        'trailers': commit_trailers
     }
     final_commit_message = message_formatter.format_message(
         commit_data, staged_files, chosen_lang)
+    draft.set_message(final_commit_message)
 
     # --- مرحله 7: نمایش پیش نمایش پیام فرمت شده و درخواست تایید نهایی ---
-    confirmed_message = confirm_commit(final_commit_message, chosen_lang)
+    confirmed_message = confirm_commit(final_commit_message, chosen_lang, full_view=args.full_list,
+                                       preview_paths=file_list_cap,
+                                       on_refresh=make_refresh_handler(analysis, chosen_lang, accepted))
+
+    metrics.end_phase('interactive')
+    metrics.record('tier_ms', dict(analysis.tier_ms))
 
     if confirmed_message is None:
+        # پیش‌نویس باقی می‌ماند؛ `git-cmsg --resume` سوال‌ها را با همین پاسخ‌ها دوباره می‌پرسد
+        metrics.save('aborted')
         sys.exit(1)
+    draft.set_message(confirmed_message, confirmed=True)
 
     # --- مرحله 8: اجرای دستور git commit با پیام نهایی ---
-    if perform_commit(confirmed_message):
+    metrics.record('backend', args.commit_mode)
+    with metrics.phase('commit'):
+        committed = perform_commit(confirmed_message, mode=args.commit_mode,
+                                   no_verify=args.no_verify, report_timings=args.timings, amend=args.amend)
+    metrics.save('committed' if committed else 'failed')
+    finish_commit(draft, committed, chosen_lang)
+    if committed:
         sys.exit(0)  # خروج موفقیت آمیز
     else:
         sys.exit(1)  # خروج با وضعیت خطا
 
 
 if __name__ == "__main__":
+    # لازم برای ProcessPoolExecutor در نسخه‌های ساخته شده با PyInstaller
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,65 @@
+# -*- mode: python ; coding: utf-8 -*-
+
+# Fast-start build of git-cmsg (onedir, no UPX).
+# Unlike git_cmsg.spec (onefile + UPX), this build does not unpack itself into a
+# temporary directory or decompress anything on every run: the interpreter and
+# bytecode are loaded straight from dist/git_cmsg_fast/.
+# Compare the two builds with build-scripts/startup_bench.py.
+
+# prompt_toolkit submodules that git-cmsg never imports on Linux/macOS
+# (Windows console backends, telnet/ssh servers, grammar-based completers, pyperclip).
+PROMPT_TOOLKIT_EXCLUDES = [
+    'prompt_toolkit.contrib',
+    'prompt_toolkit.clipboard.pyperclip',
+    'prompt_toolkit.eventloop.win32',
+    'prompt_toolkit.input.win32',
+    'prompt_toolkit.input.win32_pipe',
+    'prompt_toolkit.output.win32',
+    'prompt_toolkit.output.windows10',
+    'prompt_toolkit.output.conemu',
+    'prompt_toolkit.win32_types',
+]
+
+a = Analysis(
+    ['git_cmsg.py'],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=PROMPT_TOOLKIT_EXCLUDES + ['tkinter', 'pyperclip'],
+    noarchive=False,
+    # Precompile bytecode with -OO (asserts and docstrings stripped)
+    optimize=2,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='git_cmsg',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='git_cmsg_fast',
+)
@@ -0,0 +1,346 @@
+# git_executor.py
+
+import contextvars
+import io
+import json
+import os
+import random
+import subprocess
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# لایه قابل تعویض اجرای git: همه ماژول‌ها git را با run_git (مثل subprocess.run) یا popen_git
+# (مثل subprocess.Popen) اجرا می‌کنند، پس هر فراخوانی git شمرده می‌شود (برای run_metrics) و از
+# executor فعال عبور می‌کند. خود subprocess تغییر داده نمی‌شود، پس فرایندهای برنامه‌ای که cmsg_api را
+# درون خودش اجرا می‌کند (و فرایندهای غیر git مثل pager و ویرایشگر) دست نخورده می‌مانند:
+#   RecordingExecutor  git واقعی اجرا می‌شود و argv → stdout/stderr/returncode در فایل fixture ضبط می‌شود
+#   ReplayExecutor     خروجی‌های ضبط شده درون فرایند برگردانده می‌شوند (بدون git و بدون مخزن)
+#
+# فایل fixture به صورت JSON Lines است، یک خط برای هر فراخوانی:
+#   {"args": [...], "input": ..., "stdout": ..., "stderr": ..., "returncode": 0, "binary": false}
+# برای فرایندهای باینری (مثلاً `git cat-file --batch`) داده‌ها با latin-1 به متن تبدیل شده‌اند.
+#
+# فعال کردن برای یک اجرای خط فرمان (install_from_environment در git_cmsg.main):
+#   GIT_CMSG_GIT_RECORD=fixture.jsonl git-cmsg suggest --json
+#   GIT_CMSG_GIT_REPLAY=fixture.jsonl git-cmsg suggest --json
+RECORD_ENV_VAR = 'GIT_CMSG_GIT_RECORD'
+REPLAY_ENV_VAR = 'GIT_CMSG_GIT_REPLAY'
+# کد خروج فراخوانی‌ای که در fixture نیست (مثل خطای گیت رفتار می‌کند)
+REPLAY_MISS_RETURNCODE = 128
+
+_executor = None
+# تعداد فراخوانی‌های git این فرایند؛ thread های fixup، submodule و تحلیل همزمان آن را افزایش می‌دهند
+_git_calls = 0
+_git_calls_lock = threading.Lock()
+
+# دایرکتوری کاری فراخوانی‌های git در context جاری (thread یا task)؛ None یعنی دایرکتوری جاری فرایند.
+# cmsg_api.Repository به جای os.chdir (که برای کل فرایند است) این مقدار را تنظیم می‌کند، پس چند
+# Repository در thread های مختلف همزمان و بدون قفل کار می‌کنند.
+_working_directory = contextvars.ContextVar('cmsg_working_directory', default=None)
+
+
+def git_cwd():
+    """دایرکتوری‌ای که فراخوانی‌های git باید در آن اجرا شوند (مقدار cwd همه subprocess های git)."""
+    return _working_directory.get() or os.getcwd()
+
+
+@contextmanager
+def working_directory(path):
+    """فراخوانی‌های git این بلوک (فقط در همین context) در path اجرا می‌شوند."""
+    token = _working_directory.set(path)
+    try:
+        yield path
+    finally:
+        _working_directory.reset(token)
+
+
+def submit_in_context(pool, function, *args):
+    """
+    مثل pool.submit، ولی function در یک کپی از context جاری اجرا می‌شود (thread های pool
+    context را به ارث نمی‌برند، پس دایرکتوری کاری working_directory در آن‌ها گم می‌شد).
+    """
+    return pool.submit(contextvars.copy_context().run, function, *args)
+
+
+def git_call_count():
+    """تعداد فراخوانی‌های git (popen_git و run_git) از شروع فرایند."""
+    return _git_calls
+
+
+def popen_git(args, **kwargs):
+    """
+    مثل subprocess.Popen برای یک دستور git: فراخوانی را می‌شمارد و اگر executor فعال باشد،
+    ساختن فرایند را به آن می‌سپارد (شیء برگردانده شده در این حالت نمونه Popen نیست).
+    """
+    global _git_calls
+    with _git_calls_lock:
+        _git_calls += 1
+    if _executor is not None:
+        return _executor.popen(args, **kwargs)
+    return subprocess.Popen(args, **kwargs)
+
+
+def run_git(args, input=None, capture_output=False, timeout=None, check=False, **kwargs):
+    """مثل subprocess.run برای یک دستور git، از طریق popen_git. CompletedProcess برمی‌گرداند."""
+    if input is not None:
+        kwargs['stdin'] = subprocess.PIPE
+    if capture_output:
+        kwargs['stdout'] = kwargs['stderr'] = subprocess.PIPE
+    with popen_git(args, **kwargs) as process:
+        try:
+            stdout, stderr = process.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise
+        except BaseException:
+            process.kill()
+            raise
+        returncode = process.poll()
+    if check and returncode:
+        raise subprocess.CalledProcessError(returncode, args, output=stdout, stderr=stderr)
+    return subprocess.CompletedProcess(args, returncode, stdout, stderr)
+
+
+def set_executor(executor):
+    """executor فعال را تعیین می‌کند (None: git واقعی) و executor قبلی را برمی‌گرداند."""
+    global _executor
+    previous, _executor = _executor, executor
+    return previous
+
+
+@contextmanager
+def use_executor(executor):
+    """executor را فقط در این بلوک فعال می‌کند (مثلاً در تست‌ها و بنچمارک‌ها)."""
+    previous = set_executor(executor)
+    try:
+        yield executor
+    finally:
+        set_executor(previous)
+
+
+def install_from_environment():
+    """اگر GIT_CMSG_GIT_RECORD یا GIT_CMSG_GIT_REPLAY تنظیم شده باشد، executor متناظر را فعال می‌کند."""
+    if os.environ.get(REPLAY_ENV_VAR):
+        set_executor(ReplayExecutor(os.environ[REPLAY_ENV_VAR]))
+        # قالب موضوع (determine_commit_subject) تصادفی انتخاب می‌شود؛ با seed ثابت خروجی پخش تکرارپذیر است
+        random.seed(0)
+    elif os.environ.get(RECORD_ENV_VAR):
+        set_executor(RecordingExecutor(os.environ[RECORD_ENV_VAR]))
+
+
+def _is_text_mode(kwargs):
+    return bool(kwargs.get('text') or kwargs.get('universal_newlines')
+                or kwargs.get('encoding') or kwargs.get('errors'))
+
+
+def _to_fixture(data):
+    """(متن، باینری؟) برای ذخیره در JSON."""
+    if data is None:
+        return None, False
+    if isinstance(data, bytes):
+        return data.decode('latin-1'), True
+    return data, False
+
+
+def _from_fixture(text, binary, text_mode):
+    """داده ذخیره شده را به نوعی که فراخوانی کننده انتظار دارد (str یا bytes) برمی‌گرداند."""
+    if text is None:
+        return None
+    data = text.encode('latin-1') if binary else text
+    if text_mode and isinstance(data, bytes):
+        return data.decode('utf-8', 'surrogateescape')
+    if not text_mode and isinstance(data, str):
+        return data.encode('utf-8', 'surrogateescape')
+    return data
+
+
+# --- ضبط ---
+class _TeeStream:
+    """pipe یک فرایند که هر چه از آن خوانده یا در آن نوشته می‌شود را نگه می‌دارد."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.chunks = []
+
+    def read(self, *args):
+        data = self._stream.read(*args)
+        self.chunks.append(data)
+        return data
+
+    def readline(self, *args):
+        data = self._stream.readline(*args)
+        self.chunks.append(data)
+        return data
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        data = self._stream.readline()
+        if not data:
+            raise StopIteration
+        self.chunks.append(data)
+        return data
+
+    def write(self, data):
+        self.chunks.append(data)
+        return self._stream.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class _RecordingPopen(subprocess.Popen):
+    """فرایند واقعی git که خروجی‌اش (از communicate یا خواندن جریانی pipe ها) ضبط می‌شود."""
+
+    def __init__(self, recorder, args, *posargs, **kwargs):
+        super().__init__(args, *posargs, **kwargs)
+        self._recorder = recorder
+        self._recorded = False
+        self._communicating = False
+        self._raw_streams = (self.stdin, self.stdout, self.stderr)
+        self.stdin, self.stdout, self.stderr = (_TeeStream(stream) if stream else None
+                                                for stream in self._raw_streams)
+
+    def communicate(self, input=None, timeout=None):
+        # communicate مستقیماً با file descriptor ها کار می‌کند؛ pipe های اصلی برگردانده می‌شوند
+        self.stdin, self.stdout, self.stderr = self._raw_streams
+        self._communicating = True
+        try:
+            stdout, stderr = super().communicate(input, timeout)
+        finally:
+            self._communicating = False
+        self._record(input, stdout, stderr)
+        return stdout, stderr
+
+    def wait(self, timeout=None):
+        returncode = super().wait(timeout)
+        if not self._communicating:
+            # خواندن جریانی: هر چه فراخوانی کننده خوانده همان چیزی است که در پخش برمی‌گردد
+            streams = [stream if isinstance(stream, _TeeStream) else None
+                       for stream in (self.stdin, self.stdout, self.stderr)]
+            empty = '' if self.text_mode else b''
+            joined = [empty.join(stream.chunks) if stream else None for stream in streams]
+            self._record(*joined)
+        return returncode
+
+    def _record(self, input, stdout, stderr):
+        if self._recorded or self.returncode is None:
+            return
+        self._recorded = True
+        input_text, _ = _to_fixture(input)
+        stdout_text, stdout_binary = _to_fixture(stdout)
+        stderr_text, stderr_binary = _to_fixture(stderr)
+        self._recorder.record({
+            'args': [str(arg) for arg in self.args],
+            'input': input_text,
+            'stdout': stdout_text,
+            'stderr': stderr_text,
+            'returncode': self.returncode,
+            'binary': stdout_binary or stderr_binary,
+        })
+
+
+class RecordingExecutor:
+    """git واقعی را اجرا کرده و هر فراخوانی را به فایل fixture (که از نو ساخته می‌شود) اضافه می‌کند."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        with open(path, 'w', encoding='utf-8'):
+            pass
+
+    def popen(self, args, *posargs, **kwargs):
+        return _RecordingPopen(self, args, *posargs, **kwargs)
+
+    def record(self, entry):
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as fixture:
+                fixture.write(line)
+
+
+# --- پخش ---
+class _ReplayProcess:
+    """فرایند ساختگی با همان رابط Popen که خروجی ضبط شده را برمی‌گرداند."""
+
+    def __init__(self, args, entry, kwargs):
+        self.args = args
+        self.pid = 0
+        self.returncode = None
+        self._entry = entry
+        text_mode = _is_text_mode(kwargs)
+        self.text_mode = text_mode
+        binary = entry.get('binary', False)
+        self._stdout = _from_fixture(entry.get('stdout') or '', binary, text_mode)
+        self._stderr = _from_fixture(entry.get('stderr') or '', binary, text_mode)
+        stream = io.StringIO if text_mode else io.BytesIO
+        self.stdin = stream() if kwargs.get('stdin') == subprocess.PIPE else None
+        self.stdout = stream(self._stdout) if kwargs.get('stdout') == subprocess.PIPE else None
+        self.stderr = stream(self._stderr) if kwargs.get('stderr') == subprocess.PIPE else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for stream in (self.stdin, self.stdout, self.stderr):
+            if stream:
+                stream.close()
+        self.wait()
+
+    def communicate(self, input=None, timeout=None):
+        self.wait()
+        return (self._stdout if self.stdout is not None else None,
+                self._stderr if self.stderr is not None else None)
+
+    def poll(self):
+        return self.wait()
+
+    def wait(self, timeout=None):
+        self.returncode = self._entry['returncode']
+        return self.returncode
+
+    def send_signal(self, signal):
+        pass
+
+    def terminate(self):
+        pass
+
+    def kill(self):
+        pass
+
+
+class ReplayExecutor:
+    """
+    خروجی‌های ضبط شده را بر اساس argv برمی‌گرداند. چند ضبط با argv یکسان به همان ترتیب ضبط
+    برگردانده می‌شوند و آخرین آن‌ها برای فراخوانی‌های بعدی تکرار می‌شود.
+    فراخوانی‌ای که ضبط نشده کد خروج REPLAY_MISS_RETURNCODE می‌گیرد و argv آن در misses می‌آید.
+    """
+
+    def __init__(self, path=None, entries=()):
+        self._lock = threading.Lock()
+        self._queues = {}
+        self.misses = []
+        if path:
+            with open(path, encoding='utf-8') as fixture:
+                entries = [json.loads(line) for line in fixture if line.strip()] + list(entries)
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry):
+        """یک ضبط را اضافه می‌کند (مثلاً خروجی ساختگی در بنچمارک‌ها)."""
+        self._queues.setdefault(tuple(entry['args']), deque()).append(entry)
+
+    def popen(self, args, *posargs, **kwargs):
+        key = tuple(str(arg) for arg in args) if isinstance(args, (list, tuple)) else (args,)
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                entry = queue.popleft() if len(queue) > 1 else queue[0]
+            else:
+                self.misses.append(list(key))
+                entry = {'stdout': '', 'returncode': REPLAY_MISS_RETURNCODE,
+                         'stderr': f"git-cmsg replay: no recording for: {' '.join(key)}\n"}
+        return _ReplayProcess(args, entry, kwargs)
@@ -5,6 +5,10 @@ import sys
 import os
 import re
 import tempfile # Import tempfile for creating temporary files
+import time # Used to report the timing of each commit path
+
+from staged_files import read_staged_files
+from git_executor import git_cwd, run_git
 
 # Note: subprocess is already imported by one of the functions.
 
@@ -12,7 +16,7 @@ def check_git_installed():
     """Checks if Git is installed and available in the PATH."""
     try:
         # Try to run a simple git command to check availability
-        subprocess.run(['git', '--version'], check=True, capture_output=True)
+        run_git(['git', '--version'], check=True, capture_output=True)
         # check=True will raise CalledProcessError if git command fails
         # capture_output=True prevents output from showing up directly
         return True
@@ -25,178 +29,659 @@ def check_git_installed():
         print(f"An unexpected error occurred while checking Git: {e}", file=sys.stderr)
         return False
 
-def is_in_git_repository():
-    """Checks if the current directory is inside a Git repository."""
-    try:
-        # git rev-parse --is-inside-work-tree returns 0 if inside a repo, 1 otherwise
-        result = subprocess.run(
-            ['git', 'rev-parse', '--is-inside-work-tree'],
-            check=False, # We handle the return code manually (expect 1 if not in repo)
-            capture_output=True, # Capture stdout/stderr
-            text=True # Decode output as text
-        )
-        return result.returncode == 0 # Return True if return code is 0 (is in repo)
-    except FileNotFoundError:
-         # This error should ideally be caught by check_git_installed earlier,
-         # but added here as a defensive check.
-        print("Error: 'git' command not found while checking repository status.", file=sys.stderr)
-        sys.exit(1) # Exit the whole program if git isn't found here either
-    except Exception as e:
-        print(f"An unexpected error occurred while checking repository status: {e}", file=sys.stderr)
-        sys.exit(1) # Exit the whole program on other errors
+# --- Typed errors (raised by the non-printing functions below and by the library API in cmsg_api.py) ---
+class CmsgError(Exception):
+    """Base class of the errors raised by the library API."""
 
 
-def get_staged_files():
-    """Runs git status --porcelain and returns a list of staged files."""
-    staged_files = []
+class GitNotFoundError(CmsgError):
+    """The git executable is not installed or not on PATH."""
+
+
+class NotARepositoryError(CmsgError):
+    """The path is not inside a git work tree."""
+
+
+class GitCommandError(CmsgError):
+    """A git command failed; command, returncode and stderr describe the failure."""
+
+    def __init__(self, message, command=None, returncode=None, stderr=''):
+        super().__init__(message)
+        self.command = command
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+class NothingStagedError(CmsgError):
+    """There are no staged changes to commit."""
+
+
+class CommitError(GitCommandError):
+    """git did not create the commit (a hook failed, nothing to commit, the branch moved, ...)."""
+
+
+def find_repository(path=None):
+    """
+    Resolves the work tree containing path (default: the current directory) with one git call.
+
+    Returns:
+        tuple: (top-level directory, absolute git directory).
+
+    Raises:
+        GitNotFoundError, NotARepositoryError
+    """
     try:
-        # استفاده از git diff --cached --name-only به جای git status --porcelain
-        # این دستور مستقیماً فایل‌های stage شده رو برمی‌گردونه
-        result = subprocess.run(
-            ['git', 'diff', '--cached', '--name-only'],
+        result = run_git(
+            ['git', 'rev-parse', '--show-toplevel', '--absolute-git-dir'],
             check=False,
             capture_output=True,
             text=True,
-            cwd=os.getcwd() # اجرا در دایرکتوری فعلی
+            cwd=path or git_cwd()
         )
+    except FileNotFoundError:
+        raise GitNotFoundError("'git' command not found.") from None
+    except OSError as e:
+        # e.g. path does not exist
+        raise NotARepositoryError(str(e)) from None
+    if result.returncode != 0:
+        raise NotARepositoryError(result.stderr.strip() or "Not a git repository.")
+    top_level, git_dir = result.stdout.strip().split('\n')
+    return top_level, git_dir
 
-        # بررسی خطاهای احتمالی
-        if result.returncode != 0:
-             # این نباید اتفاق بیفته اگر is_in_git_repository موفق بوده، اما به عنوان یک تدبیر ایمنی
-             print(f"Error running 'git diff --cached --name-only':\n{result.stderr}", file=sys.stderr)
-             sys.exit(1) # خروج کامل از برنامه
 
-        # پارس کردن خروجی - هر خط یک فایل stage شده است
-        staged_files = [line.strip() for line in result.stdout.split('\n') if line.strip()]
+def is_in_git_repository():
+    """Checks if the current directory is inside a Git repository (CLI wrapper of find_repository)."""
+    try:
+        find_repository()
+        return True
+    except NotARepositoryError:
+        return False
+    except GitNotFoundError:
+         # This error should ideally be caught by check_git_installed earlier,
+         # but added here as a defensive check.
+        print("Error: 'git' command not found while checking repository status.", file=sys.stderr)
+        sys.exit(1) # Exit the whole program if git isn't found here either
 
-        # اگر هیچ فایلی stage نشده، به کاربر اطلاع بده و خارج شو
-        if not staged_files:
-             # استفاده از sys.stderr برای اطلاعات کاربر که بخشی از خروجی استاندارد نیست
-             print("No changes are staged. Please stage changes (`git add .`) before committing.", file=sys.stderr)
-             sys.exit(0) # خروج با وضعیت 0 (موفقیت)
 
-        return staged_files
+def read_staged_snapshot(base=None):
+    """
+    Reads the staged snapshot without printing or exiting (library API).
+
+    Returns:
+        StagedFiles: columnar per-file records of the staged changes.
 
+    Raises:
+        GitNotFoundError, GitCommandError, NothingStagedError
+    """
+    try:
+        staged_files = read_staged_files(base=base, raise_errors=True)
     except FileNotFoundError:
+        raise GitNotFoundError("'git' command not found.") from None
+    except subprocess.CalledProcessError as e:
+        raise GitCommandError(f"Error running 'git diff --cached --raw --numstat':\n{e.stderr}",
+                              e.cmd, e.returncode, e.stderr) from None
+    if not staged_files:
+        raise NothingStagedError("No changes are staged. Please stage changes (`git add .`) before committing.")
+    return staged_files
+
+
+def get_staged_files():
+    """
+    Reads the staged snapshot with a single `git diff --cached --raw --numstat -z` call.
+    CLI wrapper of read_staged_snapshot: prints the problem and exits instead of raising.
+
+    Returns:
+        StagedFiles: columnar per-file records (paths, line counts, status, operation).
+            It behaves like a list of staged paths, so callers can iterate it directly.
+    """
+    try:
+        # یک فراخوانی گیت هم مسیرها و وضعیت‌ها و هم آمار خطوط را برمی‌گرداند
+        # این ساختار بین تحلیلگر، تعیین محدوده و قالب‌بندی پیام مشترک است
+        return read_staged_snapshot()
+    except NothingStagedError as e:
+        # اگر هیچ فایلی stage نشده، به کاربر اطلاع بده و خارج شو (با وضعیت 0)
+        print(e, file=sys.stderr)
+        sys.exit(0)
+    except GitNotFoundError:
         # باید توسط check_git_installed قبلاً گرفته شده باشه
         print("Error: 'git' command not found during status check.", file=sys.stderr)
         sys.exit(1) # خروج کامل از برنامه
-    except Exception as e:
-        print(f"An unexpected error occurred while getting git status: {e}", file=sys.stderr)
+    except GitCommandError as e:
+        print(e, file=sys.stderr)
         sys.exit(1) # خروج کامل از برنامه
 
 # --- Function to get current branch name ---
-def get_current_branch_name():
-    """Gets the current Git branch name."""
+def read_branch_name():
+    """
+    Returns the current branch name, or None in detached HEAD state (library API).
+
+    Raises:
+        GitNotFoundError, GitCommandError
+    """
     try:
         # git rev-parse --abbrev-ref HEAD returns the current branch name
-        # HEAD is used to refer to the current commit
         # --abbrev-ref gets the branch name instead of the full hash
-        result = subprocess.run(
+        result = run_git(
             ['git', 'rev-parse', '--abbrev-ref', 'HEAD'],
-            check=True, # Check=True will raise error if not in repo or detached HEAD (though we handle not in repo earlier)
+            check=True,
             capture_output=True,
             text=True,
-            cwd=os.getcwd()
+            cwd=git_cwd()
         )
-        branch_name = result.stdout.strip()
-
-        # Handle detached HEAD state (git rev-parse returns HEAD)
-        if branch_name == 'HEAD':
-             # Return None or a specific string if in detached HEAD state
-             return None # Or maybe "(detached HEAD)"
-
+    except FileNotFoundError:
+        raise GitNotFoundError("'git' command not found.") from None
+    except subprocess.CalledProcessError as e:
+        # e.g. a fresh repository without commits, or not a repository
+        raise GitCommandError(f"Error getting branch name: {e.stderr.strip()}",
+                              e.cmd, e.returncode, e.stderr) from None
+    branch_name = result.stdout.strip()
+    # Handle detached HEAD state (git rev-parse returns HEAD)
+    return None if branch_name == 'HEAD' else branch_name
 
-        return branch_name
 
-    except FileNotFoundError:
+def get_current_branch_name():
+    """Gets the current Git branch name (CLI wrapper of read_branch_name; None on errors)."""
+    try:
+        return read_branch_name()
+    except GitNotFoundError:
         # Should have been caught by check_git_installed
         print("Error: 'git' command not found during branch check.", file=sys.stderr)
         sys.exit(1)
-    except subprocess.CalledProcessError as e:
-         # This could happen if not in a git repo (already checked) or other git errors
-         # For detached HEAD, rev-parse --abbrev-ref HEAD might return 'HEAD' and exit 0.
-         # Other errors (like not a repo) would exit non-zero.
-         if not is_in_git_repository(): # Defensive check
-              # Error already handled by is_in_git_repository
-              sys.exit(1)
-         else:
-              # Handle other git errors during branch check
-              print(f"Error getting branch name: {e.stderr.strip()}", file=sys.stderr)
-              return None # Return None on error
+    except GitCommandError as e:
+        if not is_in_git_repository(): # Defensive check
+            sys.exit(1)
+        print(e, file=sys.stderr)
+        return None
 
 
-    except Exception as e:
-        print(f"An unexpected error occurred while getting branch name: {e}", file=sys.stderr)
+# --- Functions to read recent history (used for issue suggestions) ---
+def get_reflog_messages(limit=20):
+    """
+    Returns the messages of the last `limit` reflog entries of HEAD, newest first.
+    Returns an empty list if the reflog is empty or unavailable.
+    """
+    try:
+        result = run_git(
+            ['git', 'reflog', '-n', str(limit), '--format=%gs'],
+            check=False,
+            capture_output=True,
+            text=True,
+            cwd=git_cwd()
+        )
+        if result.returncode != 0:
+            return []
+        return [line.strip() for line in result.stdout.split('\n') if line.strip()]
+    except Exception:
+        return []
+
+
+def get_recent_commit_footers(limit=20):
+    """
+    Returns the footer (last paragraph) of the last `limit` commits on the current branch,
+    newest first. All messages are read with a single `git log` call.
+    """
+    try:
+        # -z separates commits with NUL so multi-line messages are split reliably
+        result = run_git(
+            ['git', 'log', '-z', '-n', str(limit), '--format=%B'],
+            check=False,
+            capture_output=True,
+            text=True,
+            cwd=git_cwd()
+        )
+        if result.returncode != 0:
+            return []  # e.g. a fresh repository without any commits yet
+
+        footers = []
+        for message in result.stdout.split('\0'):
+            message = message.strip()
+            if not message:
+                continue
+            paragraphs = message.split('\n\n')
+            if len(paragraphs) > 1:  # a message with only a header has no footer
+                footers.append(paragraphs[-1].strip())
+        return footers
+    except Exception:
+        return []
+
+# --- Functions for --amend and --fixup ---
+def get_commit_info(revision='HEAD'):
+    """
+    Resolves a revision to a commit and reads its message with a single `git log` call.
+
+    Returns:
+        tuple: (full commit id, parent ids, full message), or None if the revision
+            does not name a commit (e.g. HEAD in a fresh repository).
+    """
+    try:
+        result = run_git(
+            ['git', 'log', '-1', '--format=%H%x00%P%x00%B', revision, '--'],
+            check=False,
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            cwd=git_cwd()
+        )
+        if result.returncode != 0 or not result.stdout:
+            return None
+        commit_id, parents, message = result.stdout.split('\0', 2)
+        return commit_id, parents.split(), message.strip()
+    except Exception:
+        return None
+
+
+def get_amend_base(head_parents):
+    """
+    The tree the amended commit is compared to: HEAD's first parent, or the empty tree
+    when HEAD is a root commit. Diffing the index against it gives HEAD's changes
+    merged with the staged ones.
+    """
+    if head_parents:
+        return head_parents[0]
+    try:
+        return _run_plumbing(['hash-object', '-t', 'tree', os.devnull])
+    except Exception:
+        return None
+
+
+# --- Commit paths ---
+# 'file':     git commit -F <temporary file>  (default, original behaviour)
+# 'stdin':    git commit -F -                 (message piped through stdin, no temp file)
+# 'plumbing': write-tree + commit-tree + update-ref (no porcelain, no hooks; requires --no-verify)
+COMMIT_MODES = ('file', 'stdin', 'plumbing')
+
+
+def get_git_dir():
+    """Returns the absolute path of the repository's git directory, or None."""
+    try:
+        result = run_git(
+            ['git', 'rev-parse', '--absolute-git-dir'],
+            check=False,
+            capture_output=True,
+            text=True,
+            cwd=git_cwd()
+        )
+        if result.returncode != 0:
+            return None
+        return result.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def get_index_path(git_dir=None):
+    """Returns the path of the index file (honours GIT_INDEX_FILE), or None outside a repository."""
+    index_file = os.environ.get('GIT_INDEX_FILE')
+    if index_file:
+        return os.path.abspath(index_file)
+    git_dir = git_dir or get_git_dir()
+    return os.path.join(git_dir, 'index') if git_dir else None
+
+
+def get_index_signature(index_path):
+    """
+    Returns a cheap signature (mtime, size, inode) of the index file.
+    A different signature means the staged snapshot may have changed (e.g. `git add` in another terminal).
+    """
+    if not index_path:
         return None
+    try:
+        stat_result = os.stat(index_path)
+    except OSError:
+        return None
+    return (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+
 
 # --- Function to perform the Git commit ---
-def perform_commit(commit_message_string):
+# شناسه (کوتاه) کامیت جدید در خلاصه‌ای که `git commit` چاپ می‌کند: "[main (root-commit) 1a2b3c4] subject"
+COMMIT_SUMMARY_ID_PATTERN = re.compile(r'^\[[^\]]*?\b([0-9a-f]{4,})\]', re.MULTILINE)
+
+
+def create_commit(commit_message_string, mode='file', no_verify=False, amend=False, git_dir=None):
+    """
+    Creates the commit using the selected commit path, without printing (library API).
+
+    Args:
+        commit_message_string (str): The formatted commit message string.
+        mode (str): One of COMMIT_MODES ('file', 'stdin' or 'plumbing').
+        no_verify (bool): Skip the pre-commit and commit-msg hooks.
+            The 'plumbing' mode never runs hooks, so it is only allowed when this is True.
+        amend (bool): Replace HEAD instead of creating a new commit on top of it.
+        git_dir (str): The repository's git directory. When given, the porcelain modes resolve
+            the full id of the new commit from the HEAD reflog (plumbing always knows it);
+            otherwise they return the abbreviated id git printed, without extra git calls.
+
+    Returns:
+        tuple: (id of the new commit, git's summary, e.g. "[main 1a2b3c4] feat: ...").
+
+    Raises:
+        ValueError: Unknown mode, or 'plumbing' without no_verify.
+        GitNotFoundError, CommitError
     """
-    Executes the git commit command with the given message.
-    Uses a temporary file for the message to handle multi-line and special characters.
+    if mode not in COMMIT_MODES:
+        raise ValueError(f"Unknown commit mode '{mode}'. Use one of: {', '.join(COMMIT_MODES)}.")
+    if mode == 'plumbing':
+        if not no_verify:
+            # Plumbing silently bypasses hooks, so it must be requested explicitly
+            raise ValueError("The 'plumbing' commit mode skips git hooks and requires --no-verify.")
+        return commit_with_plumbing(commit_message_string, amend=amend)
+    summary = commit_with_porcelain(commit_message_string, use_stdin=(mode == 'stdin'),
+                                    no_verify=no_verify, amend=amend)
+    return resolve_commit_id(summary, git_dir), summary
+
+
+def resolve_commit_id(summary, git_dir=None):
+    """
+    Returns the id of the commit `git commit` just created, from its summary output.
+    With git_dir, the full id is read from the last line of the HEAD reflog (no git process;
+    `git rev-parse HEAD` only if there is no reflog or it does not match). Without git_dir,
+    the abbreviated id from the summary is returned.
+    """
+    match = COMMIT_SUMMARY_ID_PATTERN.search(summary or '')
+    short_id = match.group(1) if match else None
+    if not git_dir:
+        return short_id
+    try:
+        with open(os.path.join(git_dir, 'logs', 'HEAD'), 'rb') as reflog:
+            reflog.seek(0, os.SEEK_END)
+            reflog.seek(max(0, reflog.tell() - 4096))
+            # "<شناسه قبلی> <شناسه جدید> <هویت>\t<پیام>"
+            new_id = reflog.read().rstrip(b'\n').rsplit(b'\n', 1)[-1].split(b' ', 2)[1].decode('ascii')
+        if short_id and new_id.startswith(short_id):
+            return new_id
+    except (OSError, IndexError, UnicodeDecodeError):
+        pass
+    result = run_git(['git', 'rev-parse', 'HEAD'], check=False, capture_output=True, text=True,
+                            cwd=git_cwd())
+    return result.stdout.strip() if result.returncode == 0 else short_id
+
+
+def perform_commit(commit_message_string, mode='file', no_verify=False, report_timings=False, amend=False):
+    """
+    Executes the git commit with the given message using the selected commit path.
+    CLI wrapper of create_commit: prints git's output or the error instead of raising.
 
     Args:
         commit_message_string (str): The formatted commit message string.
+        mode (str): One of COMMIT_MODES ('file', 'stdin' or 'plumbing').
+        no_verify (bool): Skip the pre-commit and commit-msg hooks.
+        report_timings (bool): Print the wall time of the commit path to stderr.
+        amend (bool): Replace HEAD instead of creating a new commit on top of it.
 
     Returns:
         bool: True if the commit was successful, False otherwise.
-        Exits the program on failure.
     """
-    # Create a temporary file to write the commit message to
-    # delete=False means the file is not automatically deleted when closed
-    with tempfile.NamedTemporaryFile(mode='w+', suffix=".gitmessage", delete=False, encoding='utf-8') as tmp_file:
-        tmp_file_path = tmp_file.name
-        tmp_file.write(commit_message_string)
-        tmp_file.flush() # Ensure content is written to disk
+    start = time.perf_counter()
+    try:
+        _, summary = create_commit(commit_message_string, mode=mode, no_verify=no_verify, amend=amend)
+        print(summary, file=sys.stdout)
+        success = True
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return False
+    except GitNotFoundError:
+        # This should not happen if check_git_installed passed
+        print("Error: 'git' command not found during commit execution.", file=sys.stderr)
+        success = False
+    except CommitError as e:
+        print(e, file=sys.stderr)
+        if e.command:
+            # چاپ دستور دقیق گیت برای اشکال‌زدایی بهتر
+            print(f"Git command attempted: {' '.join(e.command)}", file=sys.stderr)
+        success = False
+    except Exception as e:
+        print(f"An unexpected error occurred during commit execution: {e}", file=sys.stderr)
+        success = False
+
+    if report_timings:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"Commit path '{mode}': {elapsed_ms:.1f} ms", file=sys.stderr)
+    return success
+
+
+def commit_with_porcelain(commit_message_string, use_stdin=False, no_verify=False, amend=False):
+    """
+    Runs `git commit` with the message either piped through stdin (`-F -`)
+    or written to a temporary file (`-F <file>`), which handles multi-line and special characters.
+
+    Returns:
+        str: git's output (the summary of the new commit).
+
+    Raises:
+        GitNotFoundError, CommitError
+    """
+    tmp_file_path = None
+    if use_stdin:
+        message_source = '-'
+    else:
+        # Create a temporary file to write the commit message to
+        # delete=False means the file is not automatically deleted when closed
+        with tempfile.NamedTemporaryFile(mode='w+', suffix=".gitmessage", delete=False, encoding='utf-8') as tmp_file:
+            tmp_file_path = tmp_file.name
+            tmp_file.write(commit_message_string)
+            tmp_file.flush() # Ensure content is written to disk
+        message_source = tmp_file_path
+
+    command = ['git', 'commit', '-F', message_source]
+    if no_verify:
+        command.append('--no-verify')
+    if amend:
+        command.append('--amend')
 
     try:
-        # Execute the git commit command, reading the message from the temporary file
-        # -F reads the message from the specified file
+        # Execute the git commit command, reading the message from stdin or the temporary file
         # We don't use shell=True here as it's generally safer with subprocess.run
         # check=True will raise CalledProcessError if the git commit command fails
-        result = subprocess.run(
-            ['git', 'commit', '-F', tmp_file_path],
+        result = run_git(
+            command,
+            input=commit_message_string if use_stdin else None,
             check=True,
             capture_output=True,
             text=True,
-            cwd=os.getcwd() # Run command in current directory
+            encoding='utf-8',
+            cwd=git_cwd() # Run command in current directory
         )
-
-        # If check=True, we only reach here on success
-        # Print git's output (usually confirmation of commit)
-        print(result.stdout, file=sys.stdout) # Print successful commit message
-        # print(result.stderr, file=sys.stderr) # Print any stderr output (less common on success)
-        return True # Commit successful
+        # If check=True, we only reach here on success (git's output confirms the commit)
+        return result.stdout
 
     except FileNotFoundError:
-        # This should not happen if check_git_installed passed
-        print("Error: 'git' command not found during commit execution.", file=sys.stderr)
-        return False # Indicate failure
+        raise GitNotFoundError("'git' command not found.") from None
     except subprocess.CalledProcessError as e:
          # This happens if git commit fails (e.g., no changes added, conflicts, hooks failed)
-         print(f"Error executing git commit:\n{e.stderr.strip()}", file=sys.stderr)
-         # مشکل اینجاست: e.stderr خالی یا None ممکنه باشه در بعضی موارد
-         # اضافه کردن چک بیشتر برای نمایش بهتر خطا:
+         # e.stderr ممکنه خالی یا None باشه، پس خروجی مناسب رو انتخاب می‌کنیم
          if e.stderr and e.stderr.strip():
-             print(f"Error details:\n{e.stderr.strip()}", file=sys.stderr)
+             details = f"Error executing git commit:\n{e.stderr.strip()}"
          elif e.stdout and e.stdout.strip():
-             print(f"Command output:\n{e.stdout.strip()}", file=sys.stderr)
+             details = f"Error executing git commit:\n{e.stdout.strip()}"
          else:
-             print(f"Git command failed with return code: {e.returncode}", file=sys.stderr)
-         
-         # چاپ دستور دقیق گیت برای اشکال‌زدایی بهتر
-         print(f"Git command attempted: git commit -F {tmp_file_path}", file=sys.stderr)
-         return False # Indicate failure
-    except Exception as e:
-        print(f"An unexpected error occurred during commit execution: {e}", file=sys.stderr)
-        return False # Indicate failure
+             details = f"Git command failed with return code: {e.returncode}"
+         raise CommitError(details, command, e.returncode, e.stderr) from None
 
     finally:
         # Ensure the temporary file is deleted regardless of success or failure
         # Use os.unlink for reliability across OSes
-        if os.path.exists(tmp_file_path):
+        if tmp_file_path and os.path.exists(tmp_file_path):
             os.unlink(tmp_file_path) # Delete the temporary file
 
+
+def _run_plumbing(args, input_text=None, env=None):
+    """Runs a git plumbing command and returns its stripped stdout. Raises CalledProcessError on failure."""
+    result = run_git(
+        ['git'] + args,
+        input=input_text,
+        check=True,
+        capture_output=True,
+        text=True,
+        encoding='utf-8',
+        env=env,
+        cwd=git_cwd()
+    )
+    return result.stdout.strip()
+
+
+def commit_with_plumbing(commit_message_string, amend=False):
+    """
+    Creates the commit with plumbing commands only, skipping porcelain overhead and hooks:
+    write-tree -> commit-tree (message through stdin) -> update-ref with the old-value check.
+
+    The old-value check makes update-ref fail instead of overwriting the branch
+    if another process moved it in the meantime.
+    With amend=True the new commit gets HEAD's parents and replaces HEAD on the branch.
+
+    Returns:
+        tuple: (id of the new commit, the same summary line `git commit` prints,
+            e.g. "[main 1a2b3c4] feat: ...").
+
+    Raises:
+        GitNotFoundError, CommitError
+    """
+    try:
+        tree_id = _run_plumbing(['write-tree'])
+
+        # Resolve the parent commit and its tree; a fresh repository has no HEAD yet
+        head_id = None
+        try:
+            head_id, head_tree_id = _run_plumbing(
+                ['rev-parse', 'HEAD^{commit}', 'HEAD^{tree}']).split('\n')
+        except subprocess.CalledProcessError:
+            head_tree_id = None
+
+        if amend:
+            if not head_id:
+                raise CommitError("Error executing git commit:\nthere is no commit to amend")
+            # The amended commit keeps HEAD's parents (none for a root commit); unlike a new
+            # commit, it may have the same tree as HEAD (a message-only amend)
+            parent_ids = _run_plumbing(['log', '-1', '--format=%P', 'HEAD']).split()
+        else:
+            if tree_id == head_tree_id:
+                # Same check as `git commit` would do: nothing staged, nothing to commit
+                raise CommitError("Error executing git commit:\nnothing to commit, the staged tree matches HEAD")
+            parent_ids = [head_id] if head_id else []
+
+        # The ref HEAD points to (e.g. refs/heads/main), or HEAD itself when detached
+        try:
+            ref_name = _run_plumbing(['symbolic-ref', '-q', 'HEAD'])
+        except subprocess.CalledProcessError:
+            ref_name = 'HEAD'
+
+        commit_tree_args = ['commit-tree', tree_id]
+        for parent_id in parent_ids:
+            commit_tree_args += ['-p', parent_id]
+        commit_id = _run_plumbing(commit_tree_args, input_text=commit_message_string)
+
+        subject = commit_message_string.split('\n', 1)[0]
+        if amend:
+            reflog_message = f"commit (amend): {subject}"
+        else:
+            reflog_message = f"commit: {subject}" if parent_ids else f"commit (initial): {subject}"
+        # An all-zero old value asserts that the ref does not exist yet
+        old_value = head_id or '0' * len(tree_id)
+        _run_plumbing(['update-ref', '-m', reflog_message, ref_name, commit_id, old_value])
+
+        branch_label = ref_name[len('refs/heads/'):] if ref_name.startswith('refs/heads/') else 'detached HEAD'
+        initial_label = " (root-commit)" if not parent_ids else ""
+        return commit_id, f"[{branch_label}{initial_label} {commit_id[:7]}] {subject}"
+
+    except FileNotFoundError:
+        raise GitNotFoundError("'git' command not found.") from None
+    except subprocess.CalledProcessError as e:
+        details = (e.stderr or e.stdout or '').strip() or f"return code {e.returncode}"
+        raise CommitError(f"Error executing git plumbing commit:\n{details}",
+                          e.cmd, e.returncode, e.stderr) from None
+
+
+def get_staged_index_entries():
+    """
+    Returns {path: 'mode sha'} for every staged change, as `git update-index --index-info`
+    expects it; deleted paths get mode 0, which removes them from an index.
+    Renames are reported as a deletion plus an addition. One git call for all files.
+
+    Returns:
+        dict: The entries, or None if the git command failed.
+    """
+    result = run_git(
+        ['git', 'diff', '--cached', '--raw', '-z', '--no-abbrev', '--no-renames'],
+        check=False,
+        capture_output=True,
+        text=True,
+        encoding='utf-8',
+        errors='surrogateescape',
+        cwd=git_cwd()
+    )
+    if result.returncode != 0:
+        print(f"Error running 'git diff --cached --raw':\n{result.stderr}", file=sys.stderr)
+        return None
+
+    entries = {}
+    fields = result.stdout.split('\0')
+    for i in range(0, len(fields) - 1, 2):
+        # :old_mode new_mode old_sha new_sha STATUS
+        _, new_mode, _, new_sha, _ = fields[i][1:].split(' ')
+        entries[fields[i + 1]] = f"{new_mode} {new_sha}"
+    return entries
+
+
+def commit_batch_with_plumbing(commits):
+    """
+    Creates a chain of commits on the current branch without touching the working tree
+    or the real index: each commit's entries are applied to a temporary index
+    (GIT_INDEX_FILE) that starts from HEAD, then write-tree -> commit-tree.
+    The branch is moved once, at the end, with the old-value check.
+
+    Args:
+        commits (list): (message, index_info) pairs; index_info is the
+            `git update-index --index-info` input for the files of that commit.
+
+    Returns:
+        list: The new commit ids, or None on failure (the branch is then left unchanged).
+    """
+    git_dir = get_git_dir()
+    if not git_dir:
+        print("Error: Not a git repository.", file=sys.stderr)
+        return None
+    index_path = os.path.join(git_dir, 'cmsg-split-index')
+    env = dict(os.environ, GIT_INDEX_FILE=index_path)
+
+    try:
+        try:
+            parent_id = _run_plumbing(['rev-parse', '--verify', '-q', 'HEAD^{commit}'])
+        except subprocess.CalledProcessError:
+            parent_id = None
+        try:
+            ref_name = _run_plumbing(['symbolic-ref', '-q', 'HEAD'])
+        except subprocess.CalledProcessError:
+            ref_name = 'HEAD'
+
+        _run_plumbing(['read-tree', parent_id] if parent_id else ['read-tree', '--empty'], env=env)
+        first_parent = parent_id
+        commit_ids = []
+        for message, index_info in commits:
+            _run_plumbing(['update-index', '-z', '--index-info'], input_text=index_info, env=env)
+            tree_id = _run_plumbing(['write-tree'], env=env)
+            commit_tree_args = ['commit-tree', tree_id]
+            if parent_id:
+                commit_tree_args += ['-p', parent_id]
+            parent_id = _run_plumbing(commit_tree_args, input_text=message)
+            commit_ids.append(parent_id)
+
+        if commit_ids:
+            subject = commits[-1][0].split('\n', 1)[0]
+            reflog_message = f"commit: {subject}" if first_parent else f"commit (initial): {subject}"
+            old_value = first_parent or '0' * len(parent_id)
+            _run_plumbing(['update-ref', '-m', reflog_message, ref_name, parent_id, old_value])
+        return commit_ids
+
+    except FileNotFoundError:
+        print("Error: 'git' command not found during commit execution.", file=sys.stderr)
+        return None
+    except subprocess.CalledProcessError as e:
+        details = (e.stderr or e.stdout or '').strip() or f"return code {e.returncode}"
+        print(f"Error executing git plumbing commit:\n{details}", file=sys.stderr)
+        print(f"Git command attempted: {' '.join(e.cmd)}", file=sys.stderr)
+        return None
+    finally:
+        if os.path.exists(index_path):
+            os.unlink(index_path)
+
 # Note: We don't need the if __name__ == "__main__": block in utility files
 # because they are meant to be imported and used by other scripts.
\ No newline at end of file
@@ -5,6 +5,10 @@ import argparse
 
 # Import necessary components from other modules
 from messages import get_localized_message, MESSAGES
+from git_utils import COMMIT_MODES
+from progressive_analysis import SUGGESTION_DEADLINE_MS
+# تنظیمات git config (cmsg.*) و متغیرهای محیطی؛ پرچم‌ها بر آن‌ها اولویت دارند
+from cmsg_config import get_setting
 
 # بررسی نسخه پایتون برای مدیریت سازنده ArgumentParser
 python_version = sys.version_info
@@ -19,13 +23,17 @@ def display_help(language_code):
 
 def handle_arguments(messages, app_version):
     """
-    آرگومان های خط فرمان (--help, --version) را تحلیل می‌کند.
+    آرگومان های خط فرمان (--help, --version و گزینه های کامیت) را تحلیل می‌کند.
     مدیریت نمایش راهنما یا نسخه و خروج از برنامه را انجام می‌دهد.
     سازگار با نسخه های مختلف پایتون.
 
     Args:
         messages (dict): دیکشنری حاوی تمام پیام های محلی شده برنامه (MESSAGES).
         app_version (str): رشته حاوی شماره نسخه برنامه (مثال: "0.2.0").
+
+    Returns:
+        argparse.Namespace: آرگومان های تحلیل شده (commit_mode, no_verify, timings, full_list,
+            lang, suggestion_deadline, amend, fixup, retry, resume). مقادیری که با پرچم داده نشده‌اند از get_setting پر می‌شوند.
     """
     # دریافت رشته قالب‌بندی شده نسخه (با استفاده از زبان انگلیسی برای parser)
     # از پیام محلی شده با placeholder کلیدواژه‌ای استفاده می‌کنیم و شماره نسخه را پاس می‌دهیم.
@@ -56,19 +64,94 @@ def handle_arguments(messages, app_version):
         help=get_localized_message("help_argument_description", "en")
     )
 
+    # --- آرگومان های مسیر کامیت ---
+    # روش ثبت کامیت: فایل موقت (پیش‌فرض)، stdin یا دستورات plumbing
+    parser.add_argument(
+        '--commit-mode',
+        choices=COMMIT_MODES,
+        default='file',
+        help=get_localized_message("commit_mode_argument_description", "en")
+    )
+    # اجرا نکردن hook های pre-commit و commit-msg (برای حالت plumbing الزامی است)
+    parser.add_argument(
+        '--no-verify',
+        action='store_true',
+        help=get_localized_message("no_verify_argument_description", "en")
+    )
+    # گزارش زمان اجرای مسیر کامیت در stderr
+    parser.add_argument(
+        '--timings',
+        action='store_true',
+        help=get_localized_message("timings_argument_description", "en")
+    )
+
+    # نمایش لیست کامل فایل ها و پیش‌نمایش کامل به جای خلاصه
+    parser.add_argument(
+        '--full-list',
+        action='store_true',
+        help=get_localized_message("full_list_argument_description", "en")
+    )
+    # مهلت (میلی‌ثانیه) برای پیشنهاد اولیه؛ تحلیل عمیق‌تر در پس‌زمینه ادامه پیدا می‌کند
+    parser.add_argument(
+        '--suggestion-deadline',
+        type=int,
+        default=None,
+        metavar='MS',
+        help=get_localized_message("suggestion_deadline_argument_description", "en")
+    )
+
+    # زبان برنامه؛ اگر با پرچم، GIT_CMSG_LANG یا cmsg.lang تعیین شود، سوال زبان پرسیده نمی‌شود
+    parser.add_argument(
+        '--lang',
+        choices=('en', 'fa'),
+        default=None,
+        help=get_localized_message("lang_argument_description", "en")
+    )
+
+    # بازنویسی HEAD، ساخت کامیت fixup! یا ادامه از پیش‌نویس (که خودش amend بودن را می‌داند)؛ فقط یکی در هر اجرا
+    rewrite_group = parser.add_mutually_exclusive_group()
+    rewrite_group.add_argument(
+        '--amend',
+        action='store_true',
+        help=get_localized_message("amend_argument_description", "en")
+    )
+    rewrite_group.add_argument(
+        '--fixup',
+        default=None,
+        metavar='{COMMIT,auto}',
+        help=get_localized_message("fixup_argument_description", "en")
+    )
+    rewrite_group.add_argument(
+        '--retry',
+        action='store_true',
+        help=get_localized_message("retry_argument_description", "en")
+    )
+    rewrite_group.add_argument(
+        '--resume',
+        action='store_true',
+        help=get_localized_message("resume_argument_description", "en")
+    )
+
     # تحلیل آرگومان ها
     # parse_args() پرچم نسخه را مدیریت کرده و اگر وجود داشته باشد، نسخه را چاپ و خارج می شود.
     # اگر پرچم راهنما (-h یا --help) وجود داشته باشد، parse_args برمی‌گردد و args.help برابر True خواهد بود.
     # اگر هیچ آرگومان شناخته شده‌ای نباشد، parse_args برمی‌گردد و args.help برابر False خواهد بود.
     args = parser.parse_args()
 
+    # اولویت: پرچم خط فرمان، سپس متغیر محیطی و git config (cmsg.*)، سپس مقدار پیش‌فرض
+    if args.lang is None:
+        args.lang = get_setting('cmsg.lang')
+    if args.suggestion_deadline is None:
+        args.suggestion_deadline = get_setting('cmsg.suggestiondeadline', SUGGESTION_DEADLINE_MS)
+
     # اگر پرچم راهنما درخواست شده باشد (و پرچم نسخه باعث خروج نشده باشد)
     if args.help:
-        # ابتدا زبان نمایش راهنما را از کاربر بپرس (با ورودی استاندارد)
-        chosen_lang = 'en'  # زبان پیش‌فرض
-        print(
-            f"{messages['en']['select_lang']}/{messages['fa']['select_lang']}", file=sys.stderr)
-        while True:
+        # ابتدا زبان نمایش راهنما را از کاربر بپرس (با ورودی استاندارد)، مگر اینکه تنظیم شده باشد
+        chosen_lang = args.lang or 'en'  # زبان پیش‌فرض
+        if not args.lang:
+            print(
+                f"{messages['en']['select_lang']}/{messages['fa']['select_lang']}", file=sys.stderr)
+        while not args.lang:
             try:
                 lang_input = input().strip().lower()
                 if lang_input in ['en', 'fa']:
@@ -90,7 +173,7 @@ def handle_arguments(messages, app_version):
         display_help(chosen_lang)
         sys.exit(0)  # خروج موفق
 
-    # اگر نه راهنما و نه نسخه درخواست شده باشد، تابع برمی‌گردد و اجرای عادی ادامه پیدا می کند.
-    return
+    # اگر نه راهنما و نه نسخه درخواست شده باشد، آرگومان ها برگردانده می‌شوند و اجرای عادی ادامه پیدا می کند.
+    return args
 
 # توجه: بلوک if __name__ == "__main__": در این فایل وجود ندارد.
@@ -0,0 +1,159 @@
+# issue_matcher.py
+
+import re
+import sys
+
+from cmsg_config import get_setting
+
+# --- الگوهای پیش‌فرض ردیاب‌های ایشو ---
+# هر الگو یک نام (که به عنوان نام گروه در regex استفاده می‌شود) و یک قالب خروجی دارد.
+# قالب خروجی با متن match شده ({match}) و عدد داخل آن ({number}) پر می‌شود.
+# ترتیب مهم است: در alternation، الگوهای اول زودتر امتحان می‌شوند
+# (مثلاً JIRA باید قبل از عدد خالی باشد تا 'PAY-1234' به '#1234' تبدیل نشود).
+DEFAULT_ISSUE_PATTERNS = [
+    ('jira', r'\b[A-Z][A-Z0-9]+-\d+\b', '{match}'),   # PAY-1234
+    ('gitlab_mr', r'(?<![\w!])!\d+\b', '{match}'),     # !42 (GitLab merge request)
+    ('github', r'(?<![\w#])#\d+\b', '{match}'),        # #123 (GitHub/GitLab issue)
+    ('number', r'(?<!\d)\d+(?!\d)', '#{number}'),      # عدد خالی در نام شاخه: feature/123-login
+]
+
+# الگوهایی که فقط در نام شاخه معنا دارند (در reflog و پیام‌ها عدد خالی معمولاً نویز است)
+BRANCH_ONLY_PATTERNS = {'number'}
+
+# الگوهای سفارشی از cmsg.issuePatterns (یا متغیر محیطی GIT_CMSG_ISSUE_PATTERNS)، به شکل: name=regex;name2=regex2
+
+_NUMBER_RE = re.compile(r'\d+')
+
+# matcher کامپایل شده برای هر مقدار cmsg.issuePatterns فقط یک بار ساخته می‌شود (lazy)؛
+# کلید همان رشته تنظیم است چون cmsg_api چند مخزن با تنظیمات متفاوت را در یک فرایند باز می‌کند
+_compiled_matchers = {}
+
+
+def parse_issue_patterns(spec):
+    """
+    رشته تنظیمات الگوها را به لیست (name, regex, template) تبدیل می‌کند.
+    فرمت: 'name=regex;name2=regex2'. خروجی match شده همان‌طور که هست پیشنهاد می‌شود.
+    """
+    patterns = []
+    if not spec:
+        return patterns
+    for item in spec.split(';'):
+        name, sep, regex = item.partition('=')
+        name = name.strip()
+        if not sep or not name.isidentifier() or not regex.strip():
+            continue
+        patterns.append((name, regex.strip(), '{match}'))
+    return patterns
+
+
+def compile_issue_matcher(patterns):
+    """
+    همه الگوها را در یک regex واحد با گروه‌های نام‌دار (alternation) کامپایل می‌کند.
+
+    Args:
+        patterns (list): لیست تاپل‌های (name, regex, template).
+
+    Returns:
+        tuple: (compiled_regex, templates) که templates نام گروه را به قالب خروجی نگاشت می‌کند.
+    """
+    parts = []
+    templates = {}
+    compiled = re.compile('')
+    for name, regex, template in patterns:
+        if name in templates:
+            continue  # نام تکراری در یک regex مجاز نیست؛ اولین تعریف برنده است
+        part = f"(?P<{name}>{regex})"
+        # الگوهای پیش‌فرضی که هنوز اضافه نشده‌اند هم در آزمون می‌آیند تا الگوی کاربر با گروهی هم‌نام
+        # یکی از آن‌ها، الگوی پیش‌فرض را بیرون نکند
+        reserved = [f"(?P<{default_name}>{default_regex})" for default_name, default_regex, _ in DEFAULT_ISSUE_PATTERNS
+                    if default_name != name and default_name not in templates]
+        try:
+            # هر الگو همراه با الگوهای پذیرفته شده قبلی کامپایل می‌شود: الگویی که به تنهایی معتبر است
+            # ممکن است در alternation خطا بدهد (مثلاً '(?i)' وسط regex یا گروهی هم‌نام با یک الگوی دیگر)
+            re.compile('|'.join(parts + [part] + reserved))
+            compiled = re.compile('|'.join(parts + [part]))
+        except re.error as e:
+            # الگوی نامعتبر کاربر نباید کل matcher را خراب کند
+            print(f"Warning: Ignoring invalid issue pattern '{name}' ({e}).", file=sys.stderr)
+            continue
+        parts.append(part)
+        templates[name] = template
+    return compiled, templates
+
+
+def get_issue_matcher():
+    """matcher مخزن جاری (با الگوهای cmsg.issuePatterns) را برمی‌گرداند و در اولین فراخوانی آن را کامپایل می‌کند."""
+    spec = get_setting('cmsg.issuepatterns', '')
+    matcher = _compiled_matchers.get(spec)
+    if matcher is None:
+        # الگوهای سفارشی کاربر قبل از پیش‌فرض‌ها قرار می‌گیرند تا اولویت داشته باشند
+        matcher = compile_issue_matcher(parse_issue_patterns(spec) + DEFAULT_ISSUE_PATTERNS)
+        _compiled_matchers[spec] = matcher
+    return matcher
+
+
+def find_issue_keys(text, allow_bare_numbers=False):
+    """
+    همه کلیدهای ایشو را در متن پیدا کرده و به شکل قابل استفاده در footer برمی‌گرداند.
+
+    Args:
+        text (str): متنی که باید جستجو شود (نام شاخه، پیام reflog یا footer).
+        allow_bare_numbers (bool): آیا اعداد خالی هم به عنوان ایشو در نظر گرفته شوند.
+
+    Returns:
+        list: کلیدهای پیدا شده به ترتیب ظاهر شدن در متن.
+    """
+    if not text:
+        return []
+    matcher, templates = get_issue_matcher()
+    keys = []
+    for match in matcher.finditer(text):
+        name = match.lastgroup
+        if name in BRANCH_ONLY_PATTERNS and not allow_bare_numbers:
+            continue
+        matched_text = match.group(name)
+        number = _NUMBER_RE.search(matched_text)
+        keys.append(templates[name].format(
+            match=matched_text, number=number.group(0) if number else matched_text))
+    return keys
+
+
+# تعداد ورودی‌های reflog و کامیت‌های اخیر که برای کلید ایشو بررسی می‌شوند
+ISSUE_HISTORY_DEPTH = 20
+
+
+def rank_issue_candidates(branch_name, reflog_entries=(), commit_footers=()):
+    """
+    کلیدهای ایشو را از نام شاخه، reflog و footer کامیت‌های اخیر جمع‌آوری کرده
+    و بر اساس تازگی مرتب می‌کند.
+
+    نام شاخه تازه‌ترین منبع است، سپس ورودی‌های reflog (جدید به قدیم) و بعد footer ها.
+    هر کلید در اولین (تازه‌ترین) جایگاهی که دیده شده رتبه می‌گیرد.
+    """
+    ranked = {}  # dict ترتیب درج را حفظ می‌کند، پس ترتیب کلیدها همان ترتیب تازگی است
+    sources = []
+    if branch_name and branch_name != 'HEAD':
+        sources.append((branch_name, True))
+    sources.extend((entry, False) for entry in reflog_entries)
+    sources.extend((footer, False) for footer in commit_footers)
+
+    for text, is_branch in sources:
+        for key in find_issue_keys(text, allow_bare_numbers=is_branch):
+            ranked.setdefault(key, None)
+
+    return list(ranked)
+
+
+def read_issue_candidates(depth=ISSUE_HISTORY_DEPTH):
+    """
+    نام شاخه و تاریخچه اخیر را می‌خواند و کلیدهای ایشوی رتبه‌بندی شده را برمی‌گرداند.
+    به prompt_toolkit وابسته نیست (هم جریان تعاملی و هم `git-cmsg suggest` از آن استفاده می‌کنند).
+    """
+    from git_utils import CmsgError, read_branch_name, get_reflog_messages, get_recent_commit_footers
+    try:
+        branch_name = read_branch_name()
+    except CmsgError:
+        # مخزن بدون کامیت یا خطای گیت: فقط تاریخچه استفاده می‌شود (برنامه نباید خارج شود، مثلاً در --watch)
+        branch_name = None
+    return rank_issue_candidates(branch_name, get_reflog_messages(depth),
+                                 get_recent_commit_footers(depth))
@@ -3,6 +3,24 @@
 # Import messages for localization to get the file list header
 from messages import get_localized_message
 
+# --- Commit types offered by ui.get_commit_type ---
+# Ensure this list matches the order and keys in messages.py
+# (built once at import time; TypeValidator runs on every keystroke)
+ORDERED_TYPE_KEYS = (
+    'type_feat', 'type_fix', 'type_chore', 'type_refactor',
+    'type_docs', 'type_style', 'type_test'
+)
+# Map the message key to the actual conventional commit string
+TYPE_KEY_TO_STRING = {
+    'type_feat': 'feat', 'type_fix': 'fix', 'type_chore': 'chore',
+    'type_refactor': 'refactor', 'type_docs': 'docs',
+    'type_style': 'style', 'type_test': 'test'
+}
+# معکوس نگاشت بالا برای پیدا کردن کلید از نوع کامیت
+TYPE_STRING_TO_KEY = {v: k for k, v in TYPE_KEY_TO_STRING.items()}
+# The conventional type strings, in menu order (used by the linter and changelog)
+COMMIT_TYPES = tuple(TYPE_KEY_TO_STRING[key] for key in ORDERED_TYPE_KEYS)
+
 def format_message(commit_data, staged_files, language_code): # Added staged_files and language_code
     """
     Formats the collected commit data into a conventional commit message string,
@@ -15,7 +33,10 @@ def format_message(commit_data, staged_files, language_code): # Added staged_fil
             'scope' (str): The commit scope (optional, can be empty string).
             'body' (str): The commit body (optional, can be empty string).
             'issues' (str): Related issues/footer info (optional, can be empty string).
+            'trailers' (str): Trailer lines such as "Co-authored-by: Name <email>" (optional),
+                added to the same footer paragraph after the issues.
         staged_files (list): A list of files that are staged for commit.
+            Files excluded by cmsg.exclude (StagedFiles.excluded) are collapsed into one count line.
         language_code (str): The chosen language code ('en' or 'fa').
 
     Returns:
@@ -27,6 +48,7 @@ def format_message(commit_data, staged_files, language_code): # Added staged_fil
     scope = commit_data.get('scope', '').strip()
     body = commit_data.get('body', '').strip()
     issues = commit_data.get('issues', '').strip() # This assumes issues are entered in a format suitable for the footer
+    trailers = commit_data.get('trailers', '').strip()
 
     # --- Build the Header (Type(Scope): Subject) ---
     header_parts = [commit_type] # Start with the type
@@ -49,8 +71,8 @@ def format_message(commit_data, staged_files, language_code): # Added staged_fil
         # Add the header for the file list, separated by a blank line from user body if body exists
         file_list_section = f"\n\n{file_list_header}:\n"
         # Add each file in the list, indented perhaps with '-' or '*'
-        for f in staged_files:
-            file_list_section += f"- {f}\n" # Example: "- path/to/file.js\n"
+        for line in file_list_lines(staged_files, language_code):
+            file_list_section += f"{line}\n" # Example: "- path/to/file.js\n"
 
         # Append the file list section to the user-provided body
         # Ensure there's a blank line *before* the file list if there was a user body
@@ -68,11 +90,12 @@ def format_message(commit_data, staged_files, language_code): # Added staged_fil
 
     # --- Build the Footer section (if issues or other footers are present) ---
     footer_section = ""
-    # For MVP, just add the issues string as a footer if it exists
-    if issues:
+    # Issues and trailers form one footer paragraph (parse_message, the linter and the changelog read the last one)
+    footer = "\n".join(part for part in (issues, trailers) if part)
+    if footer:
         # The footer is separated from the body (or header if no body) by *at least* one blank line.
         # Adding "\n\n" ensures a blank line before the footer if it exists.
-        footer_section = "\n\n" + issues
+        footer_section = "\n\n" + footer
 
 
     # --- Combine all parts ---
@@ -94,6 +117,149 @@ def format_message(commit_data, staged_files, language_code): # Added staged_fil
     return final_message.strip()
 
 
+def excluded_files_line(count, language_code):
+    """The collapsed "... and N files excluded by cmsg.exclude" line (singular for one file)."""
+    if count == 1:
+        return get_localized_message('file_list_excluded_one', language_code)
+    return get_localized_message('file_list_excluded', language_code, count=count)
+
+
+def is_excluded_files_line(line):
+    """Is line the collapsed excluded-files line of the file list (in either language)?"""
+    for code in ('en', 'fa'):
+        if line == get_localized_message('file_list_excluded_one', code):
+            return True
+        # The plural form with the count split out ("... and ", " files excluded by cmsg.exclude")
+        prefix, _, suffix = get_localized_message('file_list_excluded', code, count='\0').partition('\0')
+        count = line[len(prefix):len(line) - len(suffix)]
+        if line.startswith(prefix) and line.endswith(suffix) and count.isdigit():
+            return True
+    return False
+
+
+def file_list_lines(staged_files, language_code):
+    """
+    The "- path" lines of the file list, plus one collapsed line (without a bullet, so it is
+    not read back as a path) for the files excluded by cmsg.exclude.
+    """
+    lines = [f"- {f}" for f in staged_files]
+    excluded = getattr(staged_files, 'excluded', None)
+    if excluded:
+        lines.append(excluded_files_line(len(excluded), language_code))
+    return lines
+
+
+def find_file_list(lines, language_code):
+    """
+    Locates the automated file list in the lines of a formatted message.
+
+    Returns:
+        tuple: (start, paths_end, end) where lines[start:paths_end] are the "- path" lines and
+            lines[paths_end:end] the excluded-files line, if any; None if there is no file list.
+    """
+    file_list_header = f"{get_localized_message('file_list_header', language_code)}:"
+    try:
+        start = lines.index(file_list_header) + 1
+    except ValueError:
+        return None
+    paths_end = start
+    while paths_end < len(lines) and lines[paths_end].startswith("- "):
+        paths_end += 1
+    end = paths_end + 1 if paths_end < len(lines) and is_excluded_files_line(lines[paths_end]) else paths_end
+    return start, paths_end, end
+
+
+def replace_file_list(commit_message_string, staged_files, language_code):
+    """
+    Replaces the automated file list inside an already formatted (and possibly edited)
+    commit message with a new list of staged files. Everything else is kept as is.
+
+    Returns:
+        str: The updated message, or the original one if it has no file list section.
+    """
+    lines = commit_message_string.split("\n")
+    span = find_file_list(lines, language_code)
+    if span is None:
+        return commit_message_string # The file list was removed (e.g. in the editor)
+
+    start, _, end = span
+    return "\n".join(lines[:start] + file_list_lines(staged_files, language_code) + lines[end:])
+
+
+def replace_header_parts(commit_message_string, expected, updates):
+    """
+    Replaces the type and/or scope in the header of an already formatted message, keeping the
+    subject, the "!" marker and everything after the header.
+
+    Args:
+        expected (dict): The 'type'/'scope' values the header must still have; a header the user
+            changed in the editor (or that is not a conventional header) is left alone.
+        updates (dict): The new 'type' and/or 'scope' ('' removes the scope).
+
+    Returns:
+        str: The updated message, or the original one if the header did not match expected.
+    """
+    from commit_linter import HEADER_PATTERN
+
+    header, separator, rest = commit_message_string.partition("\n")
+    match = HEADER_PATTERN.match(header)
+    if not match:
+        return commit_message_string
+    parts = {'type': match.group('type'), 'scope': match.group('scope') or ''}
+    if any(parts[key] != value for key, value in expected.items() if key in updates):
+        return commit_message_string
+    parts.update(updates)
+    scope = f"({parts['scope']})" if parts['scope'] else ""
+    header = f"{parts['type']}{scope}{match.group('breaking') or ''}: {match.group('subject')}"
+    return header + separator + rest
+
+
+def parse_message(commit_message_string):
+    """
+    Splits an existing commit message (e.g. HEAD's, for --amend) back into the parts
+    format_message builds it from, so the prompts can be pre-filled with them.
+    The automated file list section (in either language) is dropped; format_message
+    adds a fresh one for the new staged snapshot.
+
+    Returns:
+        dict: 'type', 'subject', 'scope', 'body' and 'issues' (empty strings when missing).
+            A header that is not a conventional header becomes the subject with an empty type.
+    """
+    # import تنبل: الگوهای linter فقط برای --amend لازم هستند
+    from commit_linter import HEADER_PATTERN, FOOTER_PATTERN
+
+    lines = commit_message_string.strip().split("\n")
+    commit_data = {'type': '', 'subject': lines[0].strip(), 'scope': '', 'body': '', 'issues': ''}
+    match = HEADER_PATTERN.match(lines[0].strip())
+    if match and match.group('type') in COMMIT_TYPES:
+        commit_data['type'] = match.group('type')
+        commit_data['scope'] = match.group('scope') or ''
+        commit_data['subject'] = match.group('subject').strip()
+
+    # The file list section (header line, "- path" lines and the excluded-files line, in either language)
+    # is removed
+    file_list_headers = {f"{get_localized_message('file_list_header', code)}:" for code in ('en', 'fa')}
+    rest = []
+    index = 1
+    while index < len(lines):
+        if lines[index] in file_list_headers:
+            index += 1
+            while index < len(lines) and lines[index].startswith("- "):
+                index += 1
+            if index < len(lines) and is_excluded_files_line(lines[index]):
+                index += 1
+            continue
+        rest.append(lines[index])
+        index += 1
+    paragraphs = [paragraph for paragraph in "\n".join(rest).strip().split("\n\n") if paragraph.strip()]
+
+    # The last paragraph is the footer if every line of it is a footer ("Closes #12", "Refs: PAY-1")
+    if paragraphs and all(FOOTER_PATTERN.match(line) for line in paragraphs[-1].strip().split("\n")):
+        commit_data['issues'] = paragraphs.pop().strip()
+    commit_data['body'] = "\n\n".join(paragraph.strip() for paragraph in paragraphs)
+    return commit_data
+
+
 # Example usage (for testing this module independently) - This block is commented out but useful for development
 # if __name__ == "__main__":
 #     print("--- Testing message_formatter.py ---")
@@ -21,13 +21,30 @@ MESSAGES = {
         "app_description": "Intelligent command-line tool for creating structured Git commit messages.",
         # Description for the -h/--help argument itself
         "help_argument_description": "Show this help message and exit.",
-        # The full help message content
+        "commit_mode_argument_description": "How the commit is written: file (default), stdin or plumbing.",
+        "no_verify_argument_description": "Skip the pre-commit and commit-msg hooks.",
+        "timings_argument_description": "Print the time spent in the commit path to stderr.",
+        "full_list_argument_description": "Show the full staged file list and preview (through a pager) instead of a summary.",
+        "suggestion_deadline_argument_description": "Milliseconds to wait for the first suggestion; deeper analysis keeps updating it in the background.",
+        "lang_argument_description": "Language of the interactive flow; skips the language question.",
+        "amend_argument_description": "Rewrite HEAD: analyze HEAD's changes together with the staged ones and pre-fill the prompts from its message.",
+        "fixup_argument_description": "Create a fixup! commit for COMMIT; 'auto' finds the commit that wrote most of the touched lines.",
+        "retry_argument_description": "Commit the confirmed message of the last failed run again, without prompts, if the staged changes are unchanged.",
+        "resume_argument_description": "Continue the last unfinished or failed run: confirm its message, or re-ask the prompts pre-filled with its answers.",
+        # The full help message content (braces are doubled because messages go through str.format)
         "help_message": """Git-CMSG: Intelligent Git Commit Message Tool
 
-Usage: git-cmsg [-h | --help] [-v | --version]
+Usage: git-cmsg [-h | --help] [-v | --version] [--commit-mode {{file,stdin,plumbing}}] [--no-verify] [--timings] [--full-list]
+                [--suggestion-deadline MS] [--lang {{en,fa}}]
+                [--amend | --fixup {{COMMIT,auto}} | --retry | --resume]
+       git-cmsg lint [--file FILE | RANGE | --install-hook]
+       git-cmsg changelog FROM..TO [--format {{markdown,json}}] [--lang {{en,fa}}] [--no-cache]
+       git-cmsg split [--max-commits N] [--apply --no-verify]
+       git-cmsg stats [--clear | --path]
+       git-cmsg suggest [--json] [--watch [--debounce MS]] [--lang {{en,fa}}]
 
 Git-CMSG helps you create structured and conventional Git commit messages interactively.
-It guides you through selecting the commit type, scope, subject, body, and related issues.
+It guides you through selecting the commit type, scope, subject, body, related issues and trailers.
 Supports English and Persian. Analyzes staged changes to provide suggestions.
 
 To use:
@@ -37,6 +54,66 @@ To use:
 Arguments:
   -h, --help     Show this help message and exit.
   -v, --version  Show application version and exit.
+  --commit-mode {{file,stdin,plumbing}}
+                 How the commit is written (default: file):
+                   file      git commit -F <temporary file>
+                   stdin     git commit -F - (message piped, no temporary file)
+                   plumbing  write-tree + commit-tree + update-ref (fastest, requires --no-verify)
+  --no-verify    Skip the pre-commit and commit-msg hooks.
+  --timings      Print the time spent in the commit path to stderr.
+  --full-list    Show the full staged file list and preview (through a pager)
+                 instead of a summary. Press 'f' at the confirmation to see it anyway.
+  --suggestion-deadline MS
+                 Wait at most MS milliseconds (default: 150) for the first suggestion.
+                 Deeper analysis (line counts, content, Python symbols) keeps running
+                 in the background and updates the suggestion shown in the open prompt.
+  --lang {{en,fa}} Language of the interactive flow; the language question is skipped.
+  --amend        Rewrite HEAD. Suggestions come from HEAD's changes merged with the
+                 staged ones, and the prompts are pre-filled from HEAD's message.
+  --fixup {{COMMIT,auto}}
+                 Commit the staged changes as `fixup! <subject>` of COMMIT, for
+                 `git rebase --autosquash`. 'auto' blames only the touched line ranges
+                 (several files in parallel, within cmsg.fixupBudget) and picks the
+                 commit that wrote most of them.
+  --retry        Commit the message confirmed in the last failed run (rejected by a hook,
+                 gpg timeout, index.lock) without prompts or analysis, if the staged tree
+                 and HEAD are unchanged. Otherwise the prompts are pre-filled from it.
+  --resume       Like --retry, but show the confirmation first. Also continues a run
+                 that was aborted before the commit. Drafts expire after cmsg.draftMaxAge.
+
+Commands:
+  lint --file FILE   Check a commit message file (commit-msg hook mode, '-' reads stdin).
+  lint A..B          Check every commit message in a revision range.
+  lint --install-hook [--force]
+                     Install a commit-msg hook that runs `git-cmsg lint --file`;
+                     an existing hook git-cmsg did not install is kept unless --force is given.
+  changelog FROM..TO Generate a Markdown or JSON changelog grouped by type and scope.
+  split              Propose splitting a large, mixed staged set into several commits;
+                     --apply --no-verify creates them without touching the working tree.
+  stats              Show p50/p95/p99 latencies of runs recorded with GIT_CMSG_METRICS=1
+                     (stored locally, never sent anywhere).
+  suggest --json     Print the suggestions, ranked scopes, issue keys and the formatted
+                     preview as one JSON record (versioned schema), without any prompt.
+                     --watch prints a new NDJSON record whenever the index changes.
+
+Configuration (git config; environment variables and flags take precedence):
+  cmsg.lang                   GIT_CMSG_LANG                     en or fa (skips the language question)
+  cmsg.defaultType            GIT_CMSG_DEFAULT_TYPE             Pre-selected commit type, e.g. feat
+  cmsg.fileListCap            GIT_CMSG_FILE_LIST_CAP            Paths shown in the file list summary
+  cmsg.suggestionDeadline     GIT_CMSG_SUGGESTION_DEADLINE      See --suggestion-deadline
+  cmsg.metrics                GIT_CMSG_METRICS                  Record run metrics (see stats)
+  cmsg.metricsMaxBytes        GIT_CMSG_METRICS_MAX_BYTES        Metrics file size before rotation
+  cmsg.symbolCacheMaxEntries  GIT_CMSG_SYMBOL_CACHE_MAX_ENTRIES Rows kept in the symbol cache
+  cmsg.workers                GIT_CMSG_WORKERS                  Workers (lint ranges, symbol parsing, submodules)
+  cmsg.submoduleSummary       GIT_CMSG_SUBMODULE_SUMMARY        Summarize the commits a submodule bump covers
+  cmsg.submoduleTimeout       GIT_CMSG_SUBMODULE_TIMEOUT        Time cap per submodule in ms (default: 2000)
+  cmsg.fixupBudget            GIT_CMSG_FIXUP_BUDGET             Total blame time for --fixup auto in ms (default: 3000)
+  cmsg.exclude                GIT_CMSG_EXCLUDE                  Globs of files left out of the analysis (e.g. "package-lock.json vendor/")
+  cmsg.scopeIndex             GIT_CMSG_SCOPE_INDEX              Complete the scope from every directory in the repository
+  cmsg.trailers               GIT_CMSG_TRAILERS                 Ask for trailers (Co-authored-by, Reviewed-by, ...) after the issues
+  cmsg.draftMaxAge            GIT_CMSG_DRAFT_MAX_AGE            Hours a saved draft is kept for --retry/--resume (default: 168)
+  cmsg.issuePatterns          GIT_CMSG_ISSUE_PATTERNS           Extra issue key patterns: name=regex;name2=regex2
+  Example: git config --global cmsg.lang en
 
 For more information, visit the project repository.
 """,
@@ -47,6 +124,12 @@ For more information, visit the project repository.
 
         # --- Display Staged Files ---
         "staged_files_header": "Changes to be committed:",
+        # --- Summary view for large file lists (Used by output_writer.py) ---
+        "more_files": "... and {count} more files",
+        "file_list_excluded": "... and {count} files excluded by cmsg.exclude",
+        "file_list_excluded_one": "... and 1 file excluded by cmsg.exclude",
+        "files_by_directory": "{count} files by top-level directory:",
+        "other_directories": "  ... and {count} other directories",
 
         # --- Interactive Prompts (Used by ui.py) ---
         "prompt_type": "What is the type of change? (Type)",
@@ -54,6 +137,7 @@ For more information, visit the project repository.
         "prompt_subject": "Commit summary? (Subject)",
         "prompt_body": "Full description? (Body - Optional)",
         "prompt_issues": "Related Issues? (Optional)",
+        "prompt_trailers": "Trailers? (Optional, one per line)",
 
         # --- Type Suggestions (Descriptions used in ui.py) ---
         "type_feat": "feat (New feature)",
@@ -75,6 +159,8 @@ For more information, visit the project repository.
         # UPDATED HINT for multi-line Body finalization
         "hint_body": "Guideline: Explain *why* the change, important technical details, contrast with previous behavior.\n(Press Alt+Enter or Esc then Enter to finish)",
         "hint_issues": "Guideline: Example: Closes #123, Fixes #456",
+        "hint_trailers": "Guideline: Tab completes keys (Co-authored-by, Reviewed-by, Refs) and people from the history.\n(Press Enter on an empty line to finish)",
+        "invalid_trailer": "Invalid trailer '{line}'. Use 'Key: value', e.g. 'Co-authored-by: Name <email>'.",
         "hint_skip": "(Leave empty and press Enter to skip)", # Used for optional fields
 
         # --- Validator Messages (Used by ui.py validators) ---
@@ -87,9 +173,37 @@ For more information, visit the project repository.
 
         # --- Confirmation (Used by ui.py confirm_commit) ---
         "preview_header": "Commit message preview:",
-        "confirm_prompt": "Confirm? (y/n/e - edit): ", # y=yes, n=no, e=edit
+        "confirm_prompt": "Confirm? (y/n/e - edit, f - full view, r - refresh staged files): ", # y=yes, n=no, e=edit, f=full message in pager, r=re-read the index
         "commit_aborted": "Commit aborted.",
         "commit_executed": "Commit successful!", # This might be printed by main or ui after git_utils confirms success
+        # --- Refresh of the staged snapshot (Used by git_cmsg.py) ---
+        "index_unchanged": "The staged files have not changed.",
+        "index_refreshed": "Staged files updated: {added} added, {removed} removed, {changed} changed.",
+        "refreshed_suggestion": "Updated suggestion: type '{type}', scope '{scope}'",
+        "refreshed_header": "Header updated (only the parts taken from the suggestion): {header}",
+        "split_suggested": "These changes look like {count} separate commits. Run `git-cmsg split` to see the plan.",
+        # --- --amend and --fixup (Used by git_cmsg.py) ---
+        "amend_no_commit": "There is no commit to amend yet.",
+        "amend_prefilled": "Amending {sha}; the prompts are pre-filled from its message.",
+        "fixup_invalid_target": "'{revision}' does not name a commit.",
+        "fixup_target_not_found": "No commit to fix up was found for the staged lines (only new files, or the time budget ran out). Use --fixup COMMIT.",
+        "fixup_target_found": "Fixup target: {sha} {subject} (wrote {share}% of the touched lines)",
+        # --- --retry and --resume (Used by git_cmsg.py) ---
+        "draft_saved_retry": "Your answers and message were saved. Fix the problem and run `git-cmsg --retry` (or `--resume` to review the message first).",
+        "draft_not_found": "There is no saved draft to resume (it was committed, or it expired).",
+        "draft_retrying": "Retrying the commit: {subject}",
+        "draft_changed": "The staged changes or HEAD changed since the draft was saved; the prompts are pre-filled from it.",
+        "draft_prefilled": "Resuming the saved draft; the prompts are pre-filled from it.",
+        # --- Changelog (Used by changelog_generator.py) ---
+        "changelog_title": "Changelog ({range})",
+        "changelog_breaking_changes": "BREAKING CHANGES",
+        "changelog_type_feat": "Features",
+        "changelog_type_fix": "Bug Fixes",
+        "changelog_type_chore": "Chores",
+        "changelog_type_refactor": "Refactoring",
+        "changelog_type_docs": "Documentation",
+        "changelog_type_style": "Styles",
+        "changelog_type_test": "Tests",
 
         # --- General Error Messages (Could be used by ui.py or main, some used by git_utils) ---
         "git_command_error": "Error running Git command: {error}", # Generic git command error
@@ -123,13 +237,30 @@ For more information, visit the project repository.
         "app_description": "ابزار خط فرمان هوشمند برای ایجاد پیام های کامیت ساختاریافته گیت.",
         # توضیحات برای آرگومان -h یا --help
         "help_argument_description": "نمایش این پیام راهنما و خروج.",
-        # محتوای کامل پیام راهنما
+        "commit_mode_argument_description": "روش ثبت کامیت: file (پیش‌فرض)، stdin یا plumbing.",
+        "no_verify_argument_description": "اجرا نکردن hook های pre-commit و commit-msg.",
+        "timings_argument_description": "نمایش زمان صرف شده در مسیر کامیت در stderr.",
+        "full_list_argument_description": "نمایش لیست کامل فایل‌ها و پیش‌نمایش کامل (با pager) به جای خلاصه.",
+        "suggestion_deadline_argument_description": "مهلت (میلی‌ثانیه) برای پیشنهاد اولیه؛ تحلیل عمیق‌تر در پس‌زمینه آن را بروز می‌کند.",
+        "lang_argument_description": "زبان جریان تعاملی؛ سوال انتخاب زبان پرسیده نمی‌شود.",
+        "amend_argument_description": "بازنویسی HEAD: تحلیل تغییرات HEAD به همراه تغییرات stage شده و پر کردن سوال‌ها از پیام آن.",
+        "fixup_argument_description": "ساخت کامیت fixup! برای COMMIT؛ با 'auto' کامیتی که بیشتر خطوط تغییر یافته را نوشته پیدا می‌شود.",
+        "retry_argument_description": "کامیت دوباره پیام تایید شده آخرین اجرای ناموفق، بدون سوال، اگر تغییرات stage شده عوض نشده باشند.",
+        "resume_argument_description": "ادامه آخرین اجرای ناتمام یا ناموفق: تایید پیام آن، یا پرسیدن دوباره سوال‌ها با پاسخ‌های آن.",
+        # محتوای کامل پیام راهنما (آکولادها دوتایی هستند چون پیام‌ها از str.format عبور می‌کنند)
         "help_message": """Git-CMSG: ابزار هوشمند پیام‌های کامیت گیت
 
-نحوه استفاده: git-cmsg [-h | --help] [-v | --version]
+نحوه استفاده: git-cmsg [-h | --help] [-v | --version] [--commit-mode {{file,stdin,plumbing}}] [--no-verify] [--timings] [--full-list]
+                       [--suggestion-deadline MS] [--lang {{en,fa}}]
+                [--amend | --fixup {{COMMIT,auto}} | --retry | --resume]
+              git-cmsg lint [--file FILE | RANGE | --install-hook]
+              git-cmsg changelog FROM..TO [--format {{markdown,json}}] [--lang {{en,fa}}] [--no-cache]
+              git-cmsg split [--max-commits N] [--apply --no-verify]
+              git-cmsg stats [--clear | --path]
+              git-cmsg suggest [--json] [--watch [--debounce MS]] [--lang {{en,fa}}]
 
 Git-CMSG به شما کمک می‌کند پیام‌های کامیت گیت را به صورت تعاملی و ساختاریافته ایجاد کنید.
-این ابزار شما را در انتخاب نوع کامیت، محدوده، موضوع، بدنه و ایشوهای مرتبط راهنمایی می‌کند.
+این ابزار شما را در انتخاب نوع کامیت، محدوده، موضوع، بدنه، ایشوهای مرتبط و trailer ها راهنمایی می‌کند.
 از زبان‌های فارسی و انگلیسی پشتیبانی می‌کند و تغییرات stage شده را برای ارائه پیشنهاد تحلیل می‌کند.
 
 برای استفاده:
@@ -139,6 +270,66 @@ Git-CMSG به شما کمک می‌کند پیام‌های کامیت گیت ر
 آرگومان‌ها:
   -h, --help     نمایش این پیام راهنما و خروج.
   -v, --version  نمایش نسخه برنامه و خروج.
+  --commit-mode {{file,stdin,plumbing}}
+                 روش ثبت کامیت (پیش‌فرض: file):
+                   file      git commit -F <فایل موقت>
+                   stdin     git commit -F - (ارسال پیام از طریق stdin، بدون فایل موقت)
+                   plumbing  write-tree + commit-tree + update-ref (سریع‌ترین، نیازمند --no-verify)
+  --no-verify    اجرا نکردن hook های pre-commit و commit-msg.
+  --timings      نمایش زمان صرف شده در مسیر کامیت در stderr.
+  --full-list    نمایش لیست کامل فایل‌ها و پیش‌نمایش کامل (با pager) به جای خلاصه.
+                 در مرحله تایید هم می‌توانید با 'f' پیام کامل را ببینید.
+  --suggestion-deadline MS
+                 حداکثر MS میلی‌ثانیه (پیش‌فرض: 150) برای پیشنهاد اولیه صبر می‌شود.
+                 تحلیل عمیق‌تر (تعداد خطوط، محتوا و نمادهای پایتون) در پس‌زمینه ادامه
+                 پیدا می‌کند و پیشنهاد نمایش داده شده در prompt باز را بروز می‌کند.
+  --lang {{en,fa}} زبان جریان تعاملی؛ سوال انتخاب زبان پرسیده نمی‌شود.
+  --amend        بازنویسی HEAD. پیشنهادها از تغییرات HEAD به همراه تغییرات stage شده
+                 می‌آیند و سوال‌ها با پیام فعلی HEAD پر می‌شوند.
+  --fixup {{COMMIT,auto}}
+                 کامیت تغییرات stage شده به صورت `fixup! <موضوع>` برای COMMIT، برای
+                 `git rebase --autosquash`. با 'auto' فقط بازه خطوط تغییر یافته blame می‌شوند
+                 (چند فایل همزمان و در بودجه cmsg.fixupBudget) و کامیتی که بیشتر آن‌ها را
+                 نوشته انتخاب می‌شود.
+  --retry        کامیت دوباره پیامی که در آخرین اجرای ناموفق تایید شده بود (رد شدن توسط hook،
+                 تمام شدن زمان gpg، index.lock) بدون سوال و تحلیل، اگر tree فایل‌های stage شده
+                 و HEAD عوض نشده باشند. در غیر این صورت سوال‌ها با آن پر می‌شوند.
+  --resume       مانند --retry، ولی ابتدا تایید نمایش داده می‌شود. اجرایی که قبل از کامیت لغو
+                 شده هم ادامه پیدا می‌کند. پیش‌نویس‌ها بعد از cmsg.draftMaxAge منقضی می‌شوند.
+
+دستورها:
+  lint --file FILE   بررسی فایل پیام کامیت (حالت hook برای commit-msg، '-' از stdin می‌خواند).
+  lint A..B          بررسی پیام همه کامیت‌های یک بازه.
+  lint --install-hook [--force]
+                     نصب hook برای commit-msg که `git-cmsg lint --file` را اجرا می‌کند؛
+                     hook موجودی که git-cmsg نصب نکرده فقط با --force جایگزین می‌شود.
+  changelog FROM..TO تولید changelog به صورت Markdown یا JSON، دسته‌بندی شده بر اساس نوع و محدوده.
+  split              پیشنهاد تقسیم تغییرات بزرگ و مختلط به چند کامیت؛
+                     با --apply --no-verify کامیت‌ها بدون تغییر working tree ساخته می‌شوند.
+  stats              نمایش صدک‌های p50/p95/p99 زمان اجراهایی که با GIT_CMSG_METRICS=1 ثبت شده‌اند
+                     (فقط به صورت محلی ذخیره می‌شوند و به جایی ارسال نمی‌شوند).
+  suggest --json     چاپ پیشنهادها، محدوده‌های ممکن، کلیدهای ایشو و پیش‌نمایش پیام به صورت
+                     یک رکورد JSON (با طرح نسخه‌دار) و بدون هیچ سوالی.
+                     با --watch بعد از هر تغییر index یک رکورد NDJSON جدید چاپ می‌شود.
+
+تنظیمات (git config؛ متغیرهای محیطی و پرچم‌ها اولویت دارند):
+  cmsg.lang                   GIT_CMSG_LANG                     en یا fa (سوال زبان پرسیده نمی‌شود)
+  cmsg.defaultType            GIT_CMSG_DEFAULT_TYPE             نوع کامیت پیش‌فرض، مثلاً feat
+  cmsg.fileListCap            GIT_CMSG_FILE_LIST_CAP            تعداد مسیرها در خلاصه لیست فایل‌ها
+  cmsg.suggestionDeadline     GIT_CMSG_SUGGESTION_DEADLINE      مانند --suggestion-deadline
+  cmsg.metrics                GIT_CMSG_METRICS                  ثبت معیارهای اجرا (دستور stats)
+  cmsg.metricsMaxBytes        GIT_CMSG_METRICS_MAX_BYTES        اندازه فایل معیارها قبل از چرخش
+  cmsg.symbolCacheMaxEntries  GIT_CMSG_SYMBOL_CACHE_MAX_ENTRIES حداکثر ردیف‌های کش نمادها
+  cmsg.workers                GIT_CMSG_WORKERS                  تعداد worker ها (lint بازه‌ای، parse نمادها و submodule ها)
+  cmsg.submoduleSummary       GIT_CMSG_SUBMODULE_SUMMARY        خلاصه کامیت‌های بازه جابجایی هر submodule
+  cmsg.submoduleTimeout       GIT_CMSG_SUBMODULE_TIMEOUT        سقف زمان هر submodule به میلی‌ثانیه (پیش‌فرض: 2000)
+  cmsg.fixupBudget            GIT_CMSG_FIXUP_BUDGET             بودجه کل زمان blame برای --fixup auto به میلی‌ثانیه (پیش‌فرض: 3000)
+  cmsg.exclude                GIT_CMSG_EXCLUDE                  الگوهای glob فایل‌هایی که تحلیل نمی‌شوند (مثلاً "package-lock.json vendor/")
+  cmsg.scopeIndex             GIT_CMSG_SCOPE_INDEX              تکمیل محدوده از همه دایرکتوری‌های مخزن
+  cmsg.trailers               GIT_CMSG_TRAILERS                 پرسیدن trailer ها (Co-authored-by، Reviewed-by، ...) بعد از ایشوها
+  cmsg.draftMaxAge            GIT_CMSG_DRAFT_MAX_AGE            ساعت‌های نگهداری پیش‌نویس برای --retry/--resume (پیش‌فرض: 168)
+  cmsg.issuePatterns          GIT_CMSG_ISSUE_PATTERNS           الگوهای اضافه کلید ایشو: name=regex;name2=regex2
+  مثال: git config --global cmsg.lang fa
 
 برای اطلاعات بیشتر، به مخزن پروژه مراجعه کنید.
 """,
@@ -149,6 +340,12 @@ Git-CMSG به شما کمک می‌کند پیام‌های کامیت گیت ر
 
          # --- Display Staged Files ---
         "staged_files_header": "تغییرات آماده کامیت:",
+        # --- نمای خلاصه برای لیست‌های بزرگ فایل (Used by output_writer.py) ---
+        "more_files": "... و {count} فایل دیگر",
+        "file_list_excluded": "... و {count} فایل کنار گذاشته شده با cmsg.exclude",
+        "file_list_excluded_one": "... و 1 فایل کنار گذاشته شده با cmsg.exclude",
+        "files_by_directory": "{count} فایل به تفکیک دایرکتوری سطح اول:",
+        "other_directories": "  ... و {count} دایرکتوری دیگر",
 
         # --- Interactive Prompts (Used by ui.py) ---
         "prompt_type": "نوع تغییر چیست؟ (Type)",
@@ -156,6 +353,7 @@ Git-CMSG به شما کمک می‌کند پیام‌های کامیت گیت ر
         "prompt_subject": "خلاصه کامیت؟ (Subject)",
         "prompt_body": "توضیحات کامل؟ (Body - اختیاری)",
         "prompt_issues": "Issues مرتبط؟ (اختیاری)",
+        "prompt_trailers": "Trailer ها؟ (اختیاری، هر بار یکی)",
 
         # --- Type Suggestions (Descriptions used in ui.py) ---
         "type_feat": "feat (قابلیت جدید)",
@@ -177,6 +375,8 @@ Git-CMSG به شما کمک می‌کند پیام‌های کامیت گیت ر
         # پیام راهنمای به روز شده
         "hint_body": "راهنما: چرایی تغییر، جزئیات مهم فنی، تفاوت با رفتار قبلی.\n(برای پایان، Alt+Enter یا Esc سپس Enter بزنید)",
         "hint_issues": "راهنما: مثال: Closes #123, Fixes #456",
+        "hint_trailers": "راهنما: کلید Tab کلیدها (Co-authored-by، Reviewed-by، Refs) و افراد تاریخچه را کامل می‌کند.\n(برای پایان، در سطر خالی Enter بزنید)",
+        "invalid_trailer": "Trailer نامعتبر '{line}'. از قالب 'Key: value' استفاده کنید، مثلاً 'Co-authored-by: Name <email>'.",
         "hint_skip": "(برای رد شدن، خالی بگذارید و Enter بزنید)",
 
         # --- Validator Messages (Used by ui.py validators) ---
@@ -189,9 +389,37 @@ Git-CMSG به شما کمک می‌کند پیام‌های کامیت گیت ر
 
         # --- Confirmation (Used by ui.py confirm_commit) ---
         "preview_header": "پیش‌نمایش کامیت مسیج:",
-        "confirm_prompt": "تایید می‌کنید؟ (y=بله, n=خیر, e=ویرایش دستی): ",
+        "confirm_prompt": "تایید می‌کنید؟ (y=بله, n=خیر, e=ویرایش دستی, f=نمایش کامل, r=بروزرسانی فایل‌ها): ",
         "commit_aborted": "عملیات کامیت لغو شد.",
         "commit_executed": "کامیت با موفقیت انجام شد!", # این پیام می‌تواند توسط main یا ui بعد از موفقیت git_utils نمایش داده شود
+        # --- بروزرسانی فایل‌های stage شده (Used by git_cmsg.py) ---
+        "index_unchanged": "فایل‌های stage شده تغییری نکرده‌اند.",
+        "index_refreshed": "فایل‌های stage شده بروز شدند: {added} اضافه، {removed} حذف، {changed} تغییر.",
+        "refreshed_suggestion": "پیشنهاد جدید: نوع '{type}'، محدوده '{scope}'",
+        "refreshed_header": "سرخط بروز شد (فقط بخش‌هایی که از پیشنهاد پذیرفته بودید): {header}",
+        "split_suggested": "به نظر می‌رسد این تغییرات {count} کامیت جداگانه باشند. برای دیدن طرح تقسیم `git-cmsg split` را اجرا کنید.",
+        # --- --amend و --fixup (استفاده در git_cmsg.py) ---
+        "amend_no_commit": "هنوز کامیتی برای بازنویسی وجود ندارد.",
+        "amend_prefilled": "بازنویسی {sha}؛ سوال‌ها با پیام فعلی آن پر شده‌اند.",
+        "fixup_invalid_target": "'{revision}' یک کامیت نیست.",
+        "fixup_target_not_found": "کامیتی برای fixup خطوط stage شده پیدا نشد (فقط فایل‌های جدید، یا بودجه زمانی تمام شد). از --fixup COMMIT استفاده کنید.",
+        "fixup_target_found": "هدف fixup: {sha} {subject} ({share}% خطوط تغییر یافته را نوشته است)",
+        # --- --retry و --resume (Used by git_cmsg.py) ---
+        "draft_saved_retry": "پاسخ‌ها و پیام ذخیره شدند. مشکل را برطرف کرده و `git-cmsg --retry` را اجرا کنید (یا `--resume` برای بازبینی پیام).",
+        "draft_not_found": "پیش‌نویسی برای ادامه وجود ندارد (کامیت شده یا منقضی شده است).",
+        "draft_retrying": "تلاش دوباره برای کامیت: {subject}",
+        "draft_changed": "تغییرات stage شده یا HEAD بعد از ذخیره پیش‌نویس عوض شده‌اند؛ سوال‌ها با پیش‌نویس پر می‌شوند.",
+        "draft_prefilled": "ادامه پیش‌نویس ذخیره شده؛ سوال‌ها با آن پر می‌شوند.",
+        # --- تغییرات نسخه (Used by changelog_generator.py) ---
+        "changelog_title": "تغییرات ({range})",
+        "changelog_breaking_changes": "تغییرات ناسازگار (BREAKING CHANGES)",
+        "changelog_type_feat": "قابلیت‌های جدید",
+        "changelog_type_fix": "رفع باگ‌ها",
+        "changelog_type_chore": "کارهای نگهداری",
+        "changelog_type_refactor": "بازسازی کد",
+        "changelog_type_docs": "مستندات",
+        "changelog_type_style": "قالب‌بندی کد",
+        "changelog_type_test": "تست‌ها",
 
         # --- General Error Messages (Could be used by ui.py or main, some used by git_utils) ---
         "git_command_error": "خطا در اجرای دستور گیت: {error}",
@@ -0,0 +1,98 @@
+# output_writer.py
+
+import os
+import shutil
+import subprocess
+import sys
+
+# Import messages for localization of the summary lines
+from messages import get_localized_message
+from message_formatter import find_file_list
+
+# تعداد پیش‌فرض مسیرهایی که در حالت خلاصه نمایش داده می‌شوند
+DEFAULT_SUMMARY_PATHS = 10
+# تعداد دایرکتوری‌های سطح اول که در خلاصه شمارش نمایش داده می‌شوند
+DEFAULT_SUMMARY_DIRECTORIES = 10
+
+
+def write_lines(lines, stream=None):
+    """
+    همه خطوط را با یک write و یک flush می‌نویسد.
+    برای لیست‌های بزرگ (مثلاً ده‌ها هزار فایل روی SSH) این کار بسیار سریع‌تر از
+    یک print() جداگانه برای هر خط است.
+    """
+    stream = stream or sys.stdout
+    stream.write("\n".join(lines) + "\n")
+    stream.flush()
+
+
+def count_by_top_directory(paths):
+    """تعداد فایل‌ها را به تفکیک دایرکتوری سطح اول برمی‌گرداند (فایل‌های ریشه با کلید '.')."""
+    counts = {}
+    for path in paths:
+        top, sep, _ = path.partition('/')
+        key = top if sep else '.'
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def summarize_paths(paths, language_code, max_paths=DEFAULT_SUMMARY_PATHS,
+                    max_directories=DEFAULT_SUMMARY_DIRECTORIES, bullet="- "):
+    """
+    خلاصه یک لیست مسیر را به صورت لیست خطوط برمی‌گرداند:
+    N مسیر اول، تعداد باقی‌مانده و شمارش فایل‌ها به تفکیک دایرکتوری سطح اول.
+    اگر تعداد مسیرها از max_paths بیشتر نباشد، همه مسیرها برگردانده می‌شوند.
+    """
+    lines = [f"{bullet}{path}" for path in paths[:max_paths]]
+    remaining = len(paths) - max_paths
+    if remaining <= 0:
+        return lines
+
+    lines.append(get_localized_message('more_files', language_code, count=remaining))
+    lines.append(get_localized_message('files_by_directory', language_code, count=len(paths)))
+
+    counts = count_by_top_directory(paths)
+    ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    for directory, count in ordered[:max_directories]:
+        lines.append(f"  {directory}: {count}")
+    if len(ordered) > max_directories:
+        lines.append(get_localized_message(
+            'other_directories', language_code, count=len(ordered) - max_directories))
+    return lines
+
+
+def summarize_message_for_preview(message, language_code, max_paths=DEFAULT_SUMMARY_PATHS):
+    """
+    پیام کامیت را برای پیش‌نمایش کوتاه می‌کند: سرخط، بدنه و footer بدون تغییر می‌مانند
+    و فقط بخش لیست فایل‌ها (که format_message اضافه می‌کند) خلاصه می‌شود.
+    """
+    lines = message.split("\n")
+    span = find_file_list(lines, language_code)
+    if span is None:
+        return message  # پیام لیست فایل ندارد (مثلاً کاربر آن را در ویرایشگر حذف کرده)
+
+    # خط فایل‌های کنار گذاشته شده (lines[paths_end:end]) بعد از خلاصه بدون تغییر می‌ماند
+    start, paths_end, _ = span
+    paths = [line[2:] for line in lines[start:paths_end]]
+    if len(paths) <= max_paths:
+        return message
+    return "\n".join(lines[:start] + summarize_paths(paths, language_code, max_paths) + lines[paths_end:])
+
+
+def page_text(text):
+    """
+    متن را در pager (GIT_PAGER، PAGER یا less) نمایش می‌دهد.
+    اگر خروجی ترمینال نیست یا pager در دسترس نیست، متن مستقیماً نوشته می‌شود.
+    """
+    pager = os.environ.get('GIT_PAGER') or os.environ.get('PAGER') or 'less'
+    if not sys.stdout.isatty() or pager == 'cat' or not shutil.which(pager.split()[0]):
+        write_lines([text])
+        return
+
+    env = dict(os.environ)
+    env.setdefault('LESS', 'FRX')  # مثل گیت: خروج خودکار اگر متن در یک صفحه جا شود
+    try:
+        subprocess.run(pager, shell=True, input=text, text=True, encoding='utf-8', env=env, check=False)
+    except Exception as e:
+        print(f"An unexpected error occurred while running the pager: {e}", file=sys.stderr)
+        write_lines([text])
@@ -0,0 +1,53 @@
+# path_exclusions.py
+
+from cmsg_config import get_setting
+
+# الگوهای cmsg.exclude (GIT_CMSG_EXCLUDE) با کاما یا فاصله از هم جدا می‌شوند، مثلاً:
+#   git config cmsg.exclude "package-lock.json poetry.lock __snapshots__/ vendor/"
+# معنای الگوها مثل .gitignore:
+#   بدون '/'           در هر دایرکتوری (package-lock.json ← **/package-lock.json)
+#   با '/' در انتها      کل یک دایرکتوری در هر عمقی (vendor/ ← **/vendor/**)
+#   با '/' در ابتدا      فقط نسبت به ریشه مخزن (/build/out.js)
+# هر الگو یک بار به pathspec گیت (magic 'top' و 'glob'، پس مستقل از دایرکتوری جاری) تبدیل می‌شود و فایل‌های منطبق در خود دستورهای
+# `git diff` کنار گذاشته می‌شوند، پس گیت آمار یا diff آن‌ها را اصلاً محاسبه نمی‌کند.
+
+# (مقدار خام تنظیم، pathspec های exclude، pathspec های include)؛ با تغییر مقدار دوباره ساخته می‌شود
+_compiled = (None, [], [])
+
+
+def parse_exclude_patterns(raw):
+    """رشته cmsg.exclude را به لیست الگوهای glob گیت (نسبت به ریشه مخزن) تبدیل می‌کند."""
+    patterns = []
+    for pattern in raw.replace(',', ' ').split():
+        anchored = pattern.startswith('/')
+        directory = pattern.endswith('/')
+        pattern = pattern.strip('/')
+        if not pattern:
+            continue
+        if not anchored and '/' not in pattern:
+            pattern = f"**/{pattern}"
+        if directory:
+            pattern = f"{pattern}/**"
+        patterns.append(pattern)
+    return patterns
+
+
+def _compile():
+    global _compiled
+    raw = get_setting('cmsg.exclude', '')
+    if raw != _compiled[0]:
+        patterns = parse_exclude_patterns(raw)
+        _compiled = (raw,
+                     [f":(top,exclude,glob){pattern}" for pattern in patterns],
+                     [f":(top,glob){pattern}" for pattern in patterns])
+    return _compiled
+
+
+def exclude_pathspecs():
+    """pathspec های ':(top,exclude,glob)...' برای افزودن به دستورهای diff (لیست خالی اگر الگویی تنظیم نشده)."""
+    return list(_compile()[1])
+
+
+def include_pathspecs():
+    """pathspec های ':(top,glob)...' همان الگوها، برای شمردن فایل‌های کنار گذاشته شده."""
+    return list(_compile()[2])
@@ -0,0 +1,235 @@
+# path_index.py
+
+import os
+import sys
+import threading
+from bisect import bisect_left
+from concurrent.futures import Future
+
+from git_executor import git_cwd, run_git
+
+# فهرست همه محدوده‌های ممکن مخزن (دایرکتوری‌ها و نام پکیج‌ها) برای تکمیل محدوده در سوال scope.
+# فهرست از `git ls-tree` همان tree کامیت HEAD ساخته شده و در دایرکتوری گیت ذخیره می‌شود؛ فقط وقتی
+# شناسه tree کامیت HEAD عوض شود دوباره ساخته می‌شود. قالب فایل:
+#   "cmsg-path-index <نسخه> <شناسه tree>\n" و سپس محدوده‌ها (مرتب) با NUL از هم جدا شده
+PATH_INDEX_FILENAME = 'cmsg-path-index'
+# با تغییر قالب یا قواعد ساخت محدوده‌ها افزایش دهید؛ فایل قدیمی دوباره ساخته می‌شود
+PATH_INDEX_VERSION = 2
+
+# دایرکتوری شامل یکی از این فایل‌ها یک پکیج است و نام آن (بدون مسیر) هم به عنوان محدوده پیشنهاد می‌شود
+# (مثلاً packages/ui/package.json ← 'ui')
+PACKAGE_MANIFESTS = frozenset(('package.json', 'pyproject.toml', 'setup.py', '__init__.py', 'Cargo.toml',
+                               'go.mod', 'pom.xml', 'build.gradle', 'build.gradle.kts', 'composer.json'))
+
+# حداکثر تعداد نتایج هر جستجو
+SCOPE_COMPLETION_LIMIT = 20
+
+
+def build_scopes(paths):
+    """
+    محدوده‌های ممکن از لیست مسیرهای مخزن: هر دایرکتوری (و همه والدهایش) و نام دایرکتوری پکیج‌ها.
+
+    Returns:
+        list: محدوده‌ها به ترتیب الفبایی، بدون تکرار.
+    """
+    directories = set()
+    packages = set()
+    for path in paths:
+        directory, _, filename = path.rpartition('/')
+        directories.add(directory)
+        if filename in PACKAGE_MANIFESTS and directory:
+            packages.add(directory.rpartition('/')[2])
+    # والدهای هر دایرکتوری (دایرکتوری‌هایی که خودشان فایل مستقیم ندارند)
+    for directory in list(directories):
+        parent = directory.rpartition('/')[0]
+        while parent and parent not in directories:
+            directories.add(parent)
+            parent = parent.rpartition('/')[0]
+    directories.discard('')
+    return sorted(directories | packages)
+
+
+class PathIndex:
+    """
+    جستجوی سریع در محدوده‌های مخزن (زیر یک میلی‌ثانیه برای صدها هزار دایرکتوری):
+      - پیشوند: لیست مرتب همه پسوندهای هر محدوده که از ابتدای یک جزء مسیر شروع می‌شوند
+        ('src/ui/button' ← 'src/ui/button'، 'ui/button'، 'button')؛ هر جستجو یک bisect است.
+      - میان‌کلمه: نمایه trigram نام آخرین جزء هر محدوده، برای عبارت‌های سه حرفی یا بلندتر
+        ('button' در 'iconbutton').
+    جستجو به حروف بزرگ و کوچک حساس نیست.
+    """
+
+    __slots__ = ('tree_id', 'scopes', '_names', '_keys', '_trigrams', '_top_level')
+
+    def __init__(self, scopes, tree_id=None):
+        self.tree_id = tree_id
+        self.scopes = list(scopes)
+        self._names = []
+        keys = []
+        trigrams = {}
+        for index, scope in enumerate(self.scopes):
+            lowered = scope.lower()
+            start = 0
+            while True:
+                keys.append((lowered[start:], index))
+                start = lowered.find('/', start) + 1
+                if not start:
+                    break
+            name = lowered[lowered.rfind('/') + 1:]
+            self._names.append(name)
+            for trigram in {name[i:i + 3] for i in range(len(name) - 2)}:
+                trigrams.setdefault(trigram, []).append(index)
+        keys.sort()
+        self._keys = keys
+        self._trigrams = trigrams
+        self._top_level = [scope for scope in self.scopes if '/' not in scope]
+
+    def __len__(self):
+        return len(self.scopes)
+
+    def lookup(self, query, limit=SCOPE_COMPLETION_LIMIT):
+        """
+        محدوده‌های منطبق با query: اول آن‌هایی که یک جزء مسیرشان با query شروع می‌شود،
+        سپس آن‌هایی که نام آخرین جزءشان query را در بر دارد. query خالی: دایرکتوری‌های سطح اول.
+        """
+        query = query.strip().strip('/').lower()
+        if not query:
+            return self._top_level[:limit]
+        found = []
+        seen = set()
+        keys = self._keys
+        position = bisect_left(keys, (query,))
+        while position < len(keys) and len(found) < limit:
+            key, index = keys[position]
+            if not key.startswith(query):
+                break
+            if index not in seen:
+                seen.add(index)
+                found.append(index)
+            position += 1
+        # در هر دسته: محدوده‌ای که خود مسیرش با query شروع می‌شود اول، سپس مسیر کوتاه‌تر
+        scopes = self.scopes
+        found.sort(key=lambda index: (not scopes[index].lower().startswith(query),
+                                      scopes[index].count('/'), scopes[index]))
+        if len(found) < limit and len(query) >= 3 and '/' not in query:
+            postings = [self._trigrams.get(query[i:i + 3]) for i in range(len(query) - 2)]
+            if all(postings):
+                names = self._names
+                for index in min(postings, key=len):
+                    if index not in seen and query in names[index]:
+                        seen.add(index)
+                        found.append(index)
+                        if len(found) >= limit:
+                            break
+        return [scopes[index] for index in found]
+
+
+def read_head_tree_id():
+    """شناسه tree کامیت HEAD، یا None (مخزن بدون کامیت یا خطای گیت)."""
+    try:
+        result = run_git(['git', 'rev-parse', '--verify', '-q', 'HEAD^{tree}'], check=False,
+                                capture_output=True, text=True, cwd=git_cwd())
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def read_tracked_paths(tree_id=None):
+    """
+    مسیرهای همه فایل‌های مخزن (نسبت به ریشه، حتی اگر از یک زیردایرکتوری اجرا شود) با یک فراخوانی گیت:
+    فایل‌های tree_id با `git ls-tree --full-tree` (همان tree که فهرست با آن ذخیره می‌شود)، یا در مخزن
+    بدون کامیت فایل‌های index با `git ls-files --full-name -- :/`.
+
+    Returns:
+        list: مسیرها، یا None در صورت خطا.
+    """
+    if tree_id:
+        args = ['git', 'ls-tree', '-r', '-z', '--name-only', '--full-tree', tree_id]
+    else:
+        args = ['git', 'ls-files', '-z', '--full-name', '--', ':/']
+    try:
+        result = run_git(args, check=False, capture_output=True, text=True,
+                                encoding='utf-8', errors='surrogateescape', cwd=git_cwd())
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        print(f"Warning: Could not list repository files ({' '.join(args[:2])}):\n{result.stderr}",
+              file=sys.stderr)
+        return None
+    return [path for path in result.stdout.split('\0') if path]
+
+
+def _read_cache(cache_path, tree_id):
+    """محدوده‌های ذخیره شده اگر فایل برای همین نسخه و tree ساخته شده باشد، وگرنه None."""
+    try:
+        with open(cache_path, encoding='utf-8', errors='surrogateescape') as cache:
+            header = cache.readline()
+            if header != f"{PATH_INDEX_FILENAME} {PATH_INDEX_VERSION} {tree_id}\n":
+                return None
+            content = cache.read()
+    except OSError:
+        return None
+    return content.split('\0') if content else []
+
+
+def _write_cache(cache_path, tree_id, scopes):
+    # نوشتن در فایل موقت و جایگزینی اتمی، تا اجرای همزمان دیگر فایل نیمه‌کاره نخواند
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8', errors='surrogateescape') as cache:
+            cache.write(f"{PATH_INDEX_FILENAME} {PATH_INDEX_VERSION} {tree_id}\n")
+            cache.write('\0'.join(scopes))
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # فقط کش است؛ دفعه بعد دوباره ساخته می‌شود
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def load_path_index(git_dir=None):
+    """
+    PathIndex مخزن جاری: از فایل ذخیره شده اگر tree کامیت HEAD عوض نشده باشد، وگرنه با
+    `git ls-tree` ساخته و ذخیره می‌شود (در مخزن بدون کامیت از index خوانده و ذخیره نمی‌شود).
+
+    Returns:
+        PathIndex: یا None اگر فهرست فایل‌ها خوانده نشد.
+    """
+    if git_dir is None:
+        from git_utils import get_git_dir
+        git_dir = get_git_dir()
+    tree_id = read_head_tree_id()
+    cache_path = os.path.join(git_dir, PATH_INDEX_FILENAME) if git_dir else None
+    if cache_path and tree_id:
+        scopes = _read_cache(cache_path, tree_id)
+        if scopes is not None:
+            return PathIndex(scopes, tree_id)
+    paths = read_tracked_paths(tree_id)
+    if paths is None:
+        return None
+    scopes = build_scopes(paths)
+    if cache_path and tree_id:
+        _write_cache(cache_path, tree_id, scopes)
+    return PathIndex(scopes, tree_id)
+
+
+def start_loading_path_index():
+    """
+    load_path_index را در یک thread پس‌زمینه اجرا می‌کند (همزمان با سوال‌های قبل از scope).
+
+    Returns:
+        Future: نتیجه PathIndex یا None (خطاها هم به None تبدیل می‌شوند).
+    """
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(load_path_index())
+        except Exception:
+            future.set_result(None)
+
+    threading.Thread(target=run, name='cmsg-path-index', daemon=True).start()
+    return future
@@ -0,0 +1,141 @@
+# progressive_analysis.py
+
+import threading
+import time
+from concurrent.futures import Future
+
+from change_analyzer import IncrementalAnalyzer, analyze_content
+from file_attributes import read_file_attributes
+from git_utils import get_index_path, get_index_signature
+from staged_files import read_staged_files
+
+# مهلت پیش‌فرض (میلی‌ثانیه) برای پیشنهاد اولیه؛ بعد از آن prompt بدون انتظار برای سطوح عمیق‌تر نمایش داده می‌شود
+SUGGESTION_DEADLINE_MS = 150
+
+# سطوح تحلیل به ترتیب هزینه؛ هر سطح پیشنهاد سطح قبلی را کامل‌تر می‌کند
+#   paths    فقط مسیرها و وضعیت‌ها (`git diff --cached --raw`، بدون مقایسه محتوا) و ویژگی‌های .gitattributes
+#   numstat  به همراه تعداد خطوط اضافه/حذف شده
+#   content  به همراه سیگنال‌های فاصله‌گذاری/توضیح، نمادهای پایتون و خلاصه تاریخچه submodule ها
+SUGGESTION_TIERS = ('paths', 'numstat', 'content')
+
+
+class ProgressiveAnalysis:
+    """
+    تحلیل تغییرات stage شده را در چند سطح در پس‌زمینه اجرا می‌کند تا اولین prompt منتظر
+    تحلیل کامل نماند. نتیجه هر سطح یک Future است: {'staged', 'analyzer', 'suggestions'}.
+    تاریخچه (شاخه، reflog و footer ها برای پیشنهاد ایشوها) در یک thread جدا خوانده می‌شود.
+
+    نتیجه هر سطح فقط یک بار محاسبه می‌شود (موضوع پیشنهادی تصادفی است و نباید با هر بار رسم prompt عوض شود).
+    """
+
+    def __init__(self, stats=None, base=None):
+        # base: کامیت مبنای diff به جای HEAD (برای --amend: والد HEAD)
+        self.stats = stats
+        self.base = base
+        self.tiers = {name: Future() for name in SUGGESTION_TIERS}
+        self.history = Future()
+        self.tier_ms = {}
+        # امضای فایل index درست قبل از خواندن اولین snapshot؛ مبنای تشخیص `git add` های بعدی
+        # (حتی آن‌هایی که هنگام سوال‌ها انجام شده‌اند) در اکشن 'r' مرحله تایید
+        self.index_signature = None
+        self._start = time.perf_counter()
+        threading.Thread(target=self._run_tiers, name='cmsg-analysis', daemon=True).start()
+        threading.Thread(target=self._run_history, name='cmsg-history', daemon=True).start()
+
+    def _finish(self, name, result):
+        self.tier_ms[name] = round((time.perf_counter() - self._start) * 1000, 1)
+        self.tiers[name].set_result(result)
+
+    def _run_tiers(self):
+        name = SUGGESTION_TIERS[0]
+        try:
+            self.index_signature = get_index_signature(get_index_path())
+            paths = read_staged_files(with_numstat=False, base=self.base)
+            if not paths:
+                # خطای گیت یا چیزی stage نشده؛ سطوح بعدی هم همین نتیجه را دارند
+                for name in SUGGESTION_TIERS:
+                    self._finish(name, {'staged': paths, 'analyzer': None, 'suggestions': {}})
+                return
+            # ویژگی‌های .gitattributes یک بار خوانده و در همه سطوح استفاده می‌شوند
+            attributes = read_file_attributes(paths.paths)
+            analyzer = IncrementalAnalyzer(paths, base=self.base, attributes=attributes)
+            self._finish(name, {'staged': paths, 'analyzer': analyzer, 'suggestions': analyzer.suggestions()})
+
+            name = 'numstat'
+            staged = read_staged_files(base=self.base) or paths
+            analyzer = IncrementalAnalyzer(staged, base=self.base, attributes=attributes)
+            self._finish(name, {'staged': staged, 'analyzer': analyzer, 'suggestions': analyzer.suggestions()})
+
+            name = 'content'
+            analyzer = analyze_content(staged, stats=self.stats, base=self.base, attributes=attributes)
+            self._finish(name, {'staged': staged, 'analyzer': analyzer, 'suggestions': analyzer.suggestions()})
+        except Exception as e:
+            # سطح ناموفق و سطوح بعد از آن خطا برمی‌گردانند؛ آخرین سطح موفق همچنان استفاده می‌شود
+            for remaining in SUGGESTION_TIERS[SUGGESTION_TIERS.index(name):]:
+                if not self.tiers[remaining].done():
+                    self.tiers[remaining].set_exception(e)
+
+    def _run_history(self):
+        try:
+            from issue_matcher import read_issue_candidates
+            self.history.set_result(read_issue_candidates())
+        except Exception as e:
+            self.history.set_exception(e)
+
+    def staged_paths(self):
+        """منتظر سطح 'paths' می‌ماند و StagedFiles آن را برمی‌گرداند (None در صورت خطای گیت)."""
+        try:
+            return self.tiers['paths'].result()['staged']
+        except Exception:
+            return None
+
+    def wait_initial(self, deadline_ms=SUGGESTION_DEADLINE_MS):
+        """
+        حداکثر تا deadline_ms (از شروع تحلیل) منتظر سطوح می‌ماند و نام عمیق‌ترین سطح کامل شده
+        را برمی‌گرداند (None اگر هیچ سطحی به موقع تمام نشد).
+        """
+        deadline = self._start + deadline_ms / 1000
+        for name in SUGGESTION_TIERS:
+            try:
+                self.tiers[name].result(timeout=max(0.0, deadline - time.perf_counter()))
+            except Exception:
+                break
+        return self.latest_tier()
+
+    def latest_tier(self):
+        """نام عمیق‌ترین سطحی که با موفقیت تمام شده (بدون انتظار)."""
+        latest = None
+        for name in SUGGESTION_TIERS:
+            future = self.tiers[name]
+            if not future.done() or future.exception() is not None:
+                break
+            latest = name
+        return latest
+
+    def suggestion(self, key):
+        """پیشنهاد فعلی برای 'type'، 'scope' یا 'subject' از عمیق‌ترین سطح کامل شده ('' اگر هنوز نیست)."""
+        latest = self.latest_tier()
+        if latest is None:
+            return ''
+        return self.tiers[latest].result()['suggestions'].get(key, '')
+
+    def pending(self):
+        """Future سطوحی که هنوز تمام نشده‌اند (برای رسم دوباره prompt بعد از هر سطح)."""
+        return [future for future in self.tiers.values() if not future.done()]
+
+    def final(self):
+        """منتظر همه سطوح می‌ماند و نتیجه عمیق‌ترین سطح موفق را برمی‌گرداند."""
+        for future in self.tiers.values():
+            try:
+                future.result()
+            except Exception:
+                pass
+        latest = self.latest_tier()
+        return self.tiers[latest].result() if latest else None
+
+    def issue_candidates(self):
+        """کلیدهای ایشوی پیشنهادی از شاخه و تاریخچه (منتظر thread تاریخچه می‌ماند)."""
+        try:
+            return self.history.result()
+        except Exception:
+            return []
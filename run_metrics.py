@@ -0,0 +1,241 @@
+# run_metrics.py
+
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from cmsg_config import get_setting
+# git_executor فراخوانی‌های git را می‌شمارد (همان نقطه‌ای که executor ضبط/پخش از آن عبور می‌کند)
+from git_executor import git_call_count, git_cwd
+
+# ثبت معیارها فقط با این متغیر محیطی (یا `git config cmsg.metrics true`) فعال می‌شود
+# (opt-in؛ هیچ داده‌ای به شبکه ارسال نمی‌شود)
+METRICS_ENV_VAR = 'GIT_CMSG_METRICS'
+# وقتی فایل از این اندازه بزرگ‌تر شود به metrics.jsonl.1 منتقل می‌شود (حداکثر دو فایل نگه داشته می‌شود)
+# قابل تغییر با cmsg.metricsMaxBytes
+METRICS_MAX_BYTES = 1024 * 1024
+METRICS_FILENAME = 'metrics.jsonl'
+# بازه‌های تعداد فایل برای مقایسه اجراهای کند
+FILE_COUNT_BUCKETS = ((1, 9), (10, 99), (100, 999), (1000, None))
+PERCENTILES = (50, 95, 99)
+
+
+def metrics_enabled():
+    """آیا ثبت معیارها فعال است؟ (GIT_CMSG_METRICS یا cmsg.metrics)"""
+    return get_setting('cmsg.metrics', False)
+
+
+def get_metrics_path():
+    """مسیر فایل معیارها در دایرکتوری state کاربر (XDG_STATE_HOME یا ~/.local/state)."""
+    state_home = os.environ.get('XDG_STATE_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'state')
+    return os.path.join(state_home, 'git-cmsg', METRICS_FILENAME)
+
+
+def read_repository_root():
+    """
+    ریشه work tree (`git rev-parse --show-toplevel`) تا اجراها از زیردایرکتوری‌های یک مخزن
+    در `git-cmsg stats` یک گروه باشند؛ خارج از مخزن، خود دایرکتوری فعلی.
+    """
+    from git_utils import GitNotFoundError, NotARepositoryError, find_repository
+    try:
+        return find_repository()[0]
+    except (GitNotFoundError, NotARepositoryError):
+        return os.path.abspath(git_cwd())
+
+
+class RunMetrics:
+    """
+    زمان هر مرحله و شمارنده‌های یک اجرا را جمع می‌کند و در پایان یک خط JSON به فایل معیارها اضافه می‌کند.
+    اگر ثبت معیارها غیرفعال باشد، save() کاری انجام نمی‌دهد.
+    """
+
+    def __init__(self, enabled=None):
+        self.enabled = metrics_enabled() if enabled is None else enabled
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.values = {}
+        self._open_phases = {}
+        # فقط فراخوانی‌های git همین اجرا شمرده می‌شوند (cmsg_api ممکن است چند اجرا در یک فرایند داشته باشد)
+        self._git_calls_start = git_call_count()
+
+    def start_phase(self, name):
+        self._open_phases[name] = time.perf_counter()
+
+    def end_phase(self, name):
+        """زمان سپری شده از start_phase را (به میلی‌ثانیه) به مرحله name اضافه می‌کند."""
+        phase_start = self._open_phases.pop(name, None)
+        if phase_start is not None:
+            elapsed = (time.perf_counter() - phase_start) * 1000
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    @contextmanager
+    def phase(self, name):
+        """زمان اجرای بلوک را به مرحله name اضافه می‌کند."""
+        self.start_phase(name)
+        try:
+            yield
+        finally:
+            self.end_phase(name)
+
+    def record(self, key, value):
+        self.values[key] = value
+
+    def add(self, key, amount):
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def save(self, outcome):
+        """یک ورودی به فایل معیارها اضافه می‌کند؛ خطاها فقط هشدار هستند و اجرای برنامه را متوقف نمی‌کنند."""
+        if not self.enabled:
+            return
+        # زمان و تعداد فراخوانی‌ها قبل از rev-parse خود معیارها خوانده می‌شوند
+        total_ms = round((time.perf_counter() - self.start) * 1000, 1)
+        git_calls = git_call_count() - self._git_calls_start
+        entry = {
+            'time': int(time.time()),
+            'repo': read_repository_root(),
+            'outcome': outcome,
+            'total_ms': total_ms,
+            'phases': {name: round(ms, 1) for name, ms in self.phases.items()},
+            'git_calls': git_calls,
+        }
+        entry.update(self.values)
+        try:
+            append_entry(get_metrics_path(), entry)
+        except OSError as e:
+            print(f"Warning: Could not write metrics: {e}", file=sys.stderr)
+
+
+def append_entry(path, entry, max_bytes=None):
+    """یک خط JSON به انتهای فایل اضافه می‌کند؛ فایل بزرگ‌تر از max_bytes اول به path.1 منتقل می‌شود."""
+    if max_bytes is None:
+        max_bytes = get_setting('cmsg.metricsmaxbytes', METRICS_MAX_BYTES)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        if os.path.getsize(path) >= max_bytes:
+            os.replace(path, path + '.1')
+    except FileNotFoundError:
+        pass
+    with open(path, 'a', encoding='utf-8') as metrics_file:
+        metrics_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def read_entries(path):
+    """ورودی‌های فایل چرخش یافته (path.1) و فایل فعلی را به ترتیب زمانی برمی‌گرداند."""
+    entries = []
+    for candidate in (path + '.1', path):
+        try:
+            with open(candidate, 'r', encoding='utf-8') as metrics_file:
+                for line in metrics_file:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue  # خط ناقص (مثلاً اجرایی که وسط نوشتن قطع شده)
+        except FileNotFoundError:
+            continue
+    return entries
+
+
+def percentile(sorted_values, percent):
+    """صدک به روش nearest-rank روی یک لیست مرتب شده."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-percent * len(sorted_values) // 100))  # ceil
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _percentile_row(label, values):
+    values = sorted(values)
+    cells = "  ".join(f"p{p}={percentile(values, p):>9.1f}" for p in PERCENTILES)
+    return f"  {label:<28} n={len(values):<5} {cells}"
+
+
+def _bucket_label(low, high):
+    return f"{low}+ files" if high is None else f"{low}-{high} files"
+
+
+def format_stats(entries):
+    """گزارش صدک‌ها به تفکیک مرحله، تعداد فایل و مخزن را به صورت لیست خطوط برمی‌گرداند."""
+    lines = [f"{len(entries)} runs recorded."]
+
+    phase_values = {'total': [entry.get('total_ms', 0) for entry in entries]}
+    for entry in entries:
+        for name, ms in entry.get('phases', {}).items():
+            phase_values.setdefault(name, []).append(ms)
+    lines.append("\nPhase durations (ms):")
+    for name, values in phase_values.items():
+        lines.append(_percentile_row(name, values))
+
+    # 'interactive' زمان فکر کردن کاربر است؛ برای مقایسه کندی فقط زمان خود ابزار شمرده می‌شود
+    def tool_ms(entry):
+        return sum(ms for name, ms in entry.get('phases', {}).items() if name != 'interactive')
+
+    lines.append("\nTool time (ms, excluding prompts) by staged file count:")
+    for low, high in FILE_COUNT_BUCKETS:
+        values = [tool_ms(entry) for entry in entries
+                  if entry.get('files', 0) >= low and (high is None or entry.get('files', 0) <= high)]
+        if values:
+            lines.append(_percentile_row(_bucket_label(low, high), values))
+
+    lines.append("\nTool time (ms, excluding prompts) by repository, slowest p95 first:")
+    by_repo = {}
+    for entry in entries:
+        by_repo.setdefault(entry.get('repo', '?'), []).append(tool_ms(entry))
+    ranked = sorted(by_repo.items(), key=lambda item: -percentile(sorted(item[1]), 95))
+    for repo, values in ranked[:10]:
+        lines.append(_percentile_row(os.path.basename(repo.rstrip(os.sep)) or repo, values))
+
+    git_calls = sorted(entry.get('git_calls', 0) for entry in entries)
+    lines.append(f"\nGit calls per run: p50={percentile(git_calls, 50)} p95={percentile(git_calls, 95)}")
+    hits = sum(entry.get('symbol_cache_hits', 0) for entry in entries)
+    parsed = sum(entry.get('symbols_parsed', 0) for entry in entries)
+    if hits or parsed:
+        lines.append(f"Symbol cache: {hits} hits, {parsed} blobs parsed ({100 * hits / (hits + parsed):.0f}% hit rate)")
+    backends = {}
+    for entry in entries:
+        backends[entry.get('backend', '?')] = backends.get(entry.get('backend', '?'), 0) + 1
+    lines.append("Commit backends: " + ", ".join(f"{name}={count}" for name, count in sorted(backends.items())))
+    tiers = {}
+    for entry in entries:
+        if 'suggestion_tier' in entry:
+            tier = entry['suggestion_tier'] or 'none'
+            tiers[tier] = tiers.get(tier, 0) + 1
+    if tiers:
+        lines.append("Initial suggestion tier: " + ", ".join(f"{name}={count}" for name, count in sorted(tiers.items())))
+    return lines
+
+
+def run_stats_command(argv):
+    """
+    Entry point of `git-cmsg stats`.
+
+    Returns:
+        int: The process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog='git-cmsg stats',
+        description=f"Report the local run metrics recorded when {METRICS_ENV_VAR}=1.")
+    parser.add_argument('--clear', action='store_true', help="Delete the recorded metrics.")
+    parser.add_argument('--path', action='store_true', help="Print the metrics file path and exit.")
+    args = parser.parse_args(argv)
+
+    path = get_metrics_path()
+    if args.path:
+        print(path)
+        return 0
+    if args.clear:
+        for candidate in (path, path + '.1'):
+            if os.path.exists(candidate):
+                os.unlink(candidate)
+        print("Metrics cleared.")
+        return 0
+
+    entries = read_entries(path)
+    if not entries:
+        print(f"No metrics recorded yet. Set {METRICS_ENV_VAR}=1 to record them in {path}.", file=sys.stderr)
+        return 0
+    from output_writer import write_lines
+    write_lines(format_stats(entries))
+    return 0
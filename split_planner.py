@@ -0,0 +1,289 @@
+# split_planner.py
+
+import argparse
+import sys
+
+from change_analyzer import IncrementalAnalyzer, classify_file_type, path_type_hint
+from staged_files import read_staged_files
+import message_formatter
+from cmsg_config import get_setting
+
+# یک گره (دایرکتوری) فقط وقتی خوشه مستقل می‌شود که حداقل این تعداد فایل داشته باشد
+SPLIT_MIN_CLUSTER_FILES = 3
+# حداکثر تعداد کامیت‌های پیشنهادی؛ خوشه‌های کوچک‌تر در یک کامیت باقی‌مانده ادغام می‌شوند
+SPLIT_MAX_COMMITS = 8
+# گره‌ای که بیش از این سهم از فایل‌های دسته خود را دارد، در صورت امکان به زیرشاخه‌هایش شکسته می‌شود
+SPLIT_DESCEND_RATIO = 0.5
+# در جریان تعاملی، طرح تقسیم فقط برای مجموعه‌های بزرگ‌تر از این پیشنهاد می‌شود
+SPLIT_HINT_MIN_FILES = 20
+
+# ترتیب دسته‌ها در طرح (کد اصلی اول، مستندات و تنظیمات آخر) و نوع کامیت متناظر
+CATEGORY_ORDER = ('code', 'test', 'style', 'docs', 'chore')
+CATEGORY_TYPES = {'test': 'test', 'style': 'style', 'docs': 'docs', 'chore': 'chore'}
+
+
+def file_category(path):
+    """دسته یک فایل برای خوشه‌بندی: 'test'، 'docs'، 'style'، 'chore' یا 'code'."""
+    hint = path_type_hint(path)
+    if hint:
+        return hint
+    keys = {key for key, _ in classify_file_type(path)}
+    if 'document' in keys:
+        return 'docs'
+    if 'style' in keys:
+        return 'style'
+    if 'config' in keys:
+        return 'chore'
+    return 'code'
+
+
+class _TrieNode:
+    """یک دایرکتوری در درخت مسیرها: زیرشاخه‌ها، فایل‌های مستقیم و تعداد کل فایل‌های زیر آن."""
+
+    __slots__ = ('children', 'indices', 'count')
+
+    def __init__(self):
+        self.children = {}
+        self.indices = []
+        self.count = 0
+
+
+def build_directory_trie(paths, indices):
+    """درخت دایرکتوری فایل‌های indices را می‌سازد؛ هزینه متناسب با مجموع اجزای مسیرهاست."""
+    root = _TrieNode()
+    for index in indices:
+        node = root
+        node.count += 1
+        for part in paths[index].split('/')[:-1]:
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = _TrieNode()
+            node = child
+            node.count += 1
+        node.indices.append(index)
+    return root
+
+
+def _collect_indices(node, output):
+    """همه فایل‌های زیر یک گره را به output اضافه می‌کند."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        output.extend(current.indices)
+        stack.extend(current.children.values())
+    return output
+
+
+def cut_trie(root, min_files=SPLIT_MIN_CLUSTER_FILES, descend_ratio=SPLIT_DESCEND_RATIO):
+    """
+    درخت را به خوشه‌ها تقسیم می‌کند و لیست (مسیر دایرکتوری، indices) برمی‌گرداند.
+
+    از ریشه شروع می‌کنیم؛ گره‌ای که سهم بزرگی از فایل‌ها را دارد و حداقل دو زیرشاخه
+    به اندازه کافی بزرگ دارد، به آن زیرشاخه‌ها شکسته می‌شود و فایل‌های باقی‌مانده آن
+    (فایل‌های مستقیم و زیرشاخه‌های کوچک) یک خوشه جدا می‌شوند. هر گره حداکثر یک بار
+    دیده می‌شود و هر فایل یک بار جمع‌آوری می‌شود، پس هزینه تقریباً خطی است.
+    """
+    clusters = []
+    stack = [(root, '')]
+    while stack:
+        node, prefix = stack.pop()
+        big_children = [(name, child) for name, child in node.children.items() if child.count >= min_files]
+        # ریشه همیشه شکسته می‌شود (اگر زیرشاخه بزرگ داشته باشد)، بقیه فقط اگر بزرگ و متنوع باشند
+        should_descend = big_children and (
+            node is root or (node.count > root.count * descend_ratio and len(big_children) >= 2))
+        if not should_descend:
+            clusters.append((prefix, _collect_indices(node, [])))
+            continue
+
+        big_names = {name for name, _ in big_children}
+        leftover = list(node.indices)
+        for name, child in node.children.items():
+            if name not in big_names:
+                _collect_indices(child, leftover)
+        if leftover:
+            clusters.append((prefix, leftover))
+        # به ترتیب معکوس push می‌شوند تا خوشه‌ها به ترتیب الفبایی مسیر از stack خارج شوند
+        for name, child in sorted(big_children, key=lambda item: item[0], reverse=True):
+            stack.append((child, f"{prefix}/{name}" if prefix else name))
+    return clusters
+
+
+def _limit_clusters(clusters, max_commits):
+    """
+    تعداد خوشه‌ها را به max_commits می‌رساند: بزرگ‌ترین خوشه‌ها حفظ می‌شوند و بقیه در یک
+    خوشه باقی‌مانده برای هر دسته ادغام می‌شوند (تا نوع کامیت آن‌ها حفظ شود). اگر حتی این هم
+    جا نشود، همه باقی‌مانده‌ها یک کامیت مختلط می‌شوند.
+    """
+    ranked = sorted(range(len(clusters)), key=lambda i: -len(clusters[i][2]))
+    for keep in range(max_commits, -1, -1):
+        dropped_categories = {clusters[i][0] for i in ranked[keep:]}
+        if keep + len(dropped_categories) <= max_commits:
+            break
+    else:
+        keep, dropped_categories = max_commits - 1, {None}
+
+    kept = [clusters[i] for i in sorted(ranked[:keep])]
+    rest = {}
+    for i in ranked[keep:]:
+        category = clusters[i][0] if None not in dropped_categories else None
+        rest.setdefault(category, []).extend(clusters[i][2])
+    # باقی‌مانده هر دسته بعد از خوشه‌های همان دسته قرار می‌گیرد
+    order = {category: position for position, category in enumerate(CATEGORY_ORDER)}
+    merged = kept + [(category, '', indices) for category, indices in rest.items()]
+    merged.sort(key=lambda cluster: order.get(cluster[0], len(order)))
+    return merged
+
+
+def cluster_staged_files(staged_files, max_commits=SPLIT_MAX_COMMITS, min_files=SPLIT_MIN_CLUSTER_FILES):
+    """
+    فایل‌های stage شده را بر اساس دسته (کد، تست، مستندات، ...) و دایرکتوری خوشه‌بندی می‌کند.
+
+    Returns:
+        list: (دسته، مسیر دایرکتوری، indices) برای هر کامیت پیشنهادی؛ دسته None یعنی مختلط.
+    """
+    by_category = {}
+    for index, path in enumerate(staged_files.paths):
+        # اشاره‌گرهای submodule با هم در یک کامیت chore قرار می‌گیرند
+        category = 'chore' if path in staged_files.gitlinks else file_category(path)
+        by_category.setdefault(category, []).append(index)
+
+    clusters = []
+    for category in CATEGORY_ORDER:
+        indices = by_category.get(category)
+        if not indices:
+            continue
+        small = []
+        for directory, cluster_indices in cut_trie(build_directory_trie(staged_files.paths, indices), min_files):
+            if len(cluster_indices) >= min_files:
+                clusters.append((category, directory, cluster_indices))
+            else:
+                small.extend(cluster_indices)
+        if small:
+            # خوشه‌های خیلی کوچک یک دسته با هم یک کامیت می‌شوند
+            clusters.append((category, '', small))
+
+    if len(clusters) > max_commits:
+        clusters = _limit_clusters(clusters, max_commits)
+    return clusters
+
+
+def plan_split(staged_files, max_commits=SPLIT_MAX_COMMITS, min_files=SPLIT_MIN_CLUSTER_FILES,
+               signals=None, symbols=None, submodules=None, attributes=None):
+    """
+    طرح تقسیم فایل‌های stage شده به چند کامیت (خوشه‌ها به همراه پیشنهاد هر کامیت).
+    signals، symbols، submodules و attributes (اختیاری) خروجی read_diff_signals، read_symbol_changes،
+    read_submodule_summaries و read_file_attributes برای همه فایل‌ها هستند و بین کامیت‌ها مشترک‌اند.
+
+    Returns:
+        list: دیکشنری برای هر کامیت پیشنهادی با کلیدهای 'category'، 'directory'، 'indices'
+              و 'files' (یک StagedFiles) و پیشنهادهای 'type'، 'scope' و 'subject'.
+              فایل‌های cmsg.exclude (staged_files.excluded) به آخرین کامیت اضافه می‌شوند.
+    """
+    plan = []
+    for category, directory, indices in cluster_staged_files(staged_files, max_commits, min_files):
+        indices.sort()
+        files = staged_files.select(indices)
+        suggestions = IncrementalAnalyzer(files, signals, symbols, submodules, attributes=attributes).suggestions()
+        plan.append({
+            'category': category,
+            'directory': directory,
+            'indices': indices,
+            'files': files,
+            'type': CATEGORY_TYPES.get(category) or suggestions['type'],
+            'scope': directory.rsplit('/', 1)[-1] if directory else suggestions['scope'],
+            'subject': suggestions['subject'],
+        })
+    if plan and staged_files.excluded:
+        # در خوشه‌بندی شرکت نکرده‌اند ولی باید کامیت شوند
+        plan[-1]['files'].excluded = list(staged_files.excluded)
+    return plan
+
+
+def format_plan_messages(plan, language_code):
+    """پیام کامل هر کامیت طرح را با همان قالب جریان تعاملی (format_message) می‌سازد."""
+    return [
+        message_formatter.format_message(
+            {'type': step['type'], 'scope': step['scope'], 'subject': step['subject']},
+            step['files'], language_code)
+        for step in plan
+    ]
+
+
+def run_split_command(argv):
+    """
+    Entry point of `git-cmsg split`: prints a plan for splitting the staged changes
+    into several commits and, with --apply, creates them in one batch.
+
+    Returns:
+        int: The process exit code (0 success, 1 nothing to split or commit failed, 2 usage or git error).
+    """
+    from output_writer import write_lines, summarize_paths
+
+    parser = argparse.ArgumentParser(
+        prog='git-cmsg split',
+        description="Propose splitting the staged changes into coherent commits.")
+    parser.add_argument('--max-commits', type=int, default=SPLIT_MAX_COMMITS,
+                        help=f"Maximum number of commits in the plan (default: {SPLIT_MAX_COMMITS}).")
+    parser.add_argument('--min-files', type=int, default=SPLIT_MIN_CLUSTER_FILES,
+                        help=f"Minimum files for a directory to get its own commit (default: {SPLIT_MIN_CLUSTER_FILES}).")
+    parser.add_argument('--lang', choices=('en', 'fa'), default=None,
+                        help="Language of the file list in the commit messages (default: cmsg.lang or en).")
+    parser.add_argument('--apply', action='store_true',
+                        help="Create the planned commits (temporary index; the working tree is not touched).")
+    parser.add_argument('--no-verify', action='store_true',
+                        help="Required with --apply: the commits are created without running hooks.")
+    args = parser.parse_args(argv)
+    args.lang = args.lang or get_setting('cmsg.lang', 'en')
+
+    if args.apply and not args.no_verify:
+        # مثل حالت plumbing: hook ها اجرا نمی‌شوند، پس باید صریحاً درخواست شود
+        print("Error: --apply creates the commits with plumbing commands, skips git hooks "
+              "and requires --no-verify.", file=sys.stderr)
+        return 2
+
+    # rename ها به صورت حذف + اضافه خوانده می‌شوند تا هر دو مسیر در طرح باشند
+    staged_files = read_staged_files(detect_renames=False)
+    if staged_files is None:
+        return 2
+    if not staged_files:
+        print("No changes are staged. Please stage changes (`git add .`) before committing.", file=sys.stderr)
+        return 1
+
+    from diff_signals import read_diff_signals
+    from symbol_diff import read_symbol_changes
+    from submodule_summary import read_submodule_summaries
+    from file_attributes import read_file_attributes
+    attributes = read_file_attributes(staged_files.paths)
+    excluded = attributes.content_excluded()
+    plan = plan_split(staged_files, max(1, args.max_commits), max(1, args.min_files),
+                      read_diff_signals(exclude=excluded), read_symbol_changes(exclude=excluded),
+                      read_submodule_summaries(staged_files.gitlinks), attributes)
+    messages = format_plan_messages(plan, args.lang)
+
+    lines = [f"Split plan: {len(plan)} commits for {len(staged_files)} files"]
+    for number, (step, message) in enumerate(zip(plan, messages), start=1):
+        lines.append(f"\n{number}. {message.split(chr(10), 1)[0]}  ({len(step['files'])} files)")
+        lines.extend(summarize_paths(step['files'], args.lang, max_paths=5, bullet="   - "))
+    write_lines(lines)
+
+    if not args.apply:
+        if len(plan) > 1:
+            print("\nRun `git-cmsg split --apply --no-verify` to create these commits.", file=sys.stderr)
+        return 0
+
+    from git_utils import get_staged_index_entries, commit_batch_with_plumbing
+    entries = get_staged_index_entries()
+    if entries is None:
+        return 2
+    commits = []
+    for step, message in zip(plan, messages):
+        paths = list(step['files']) + step['files'].excluded
+        index_info = "".join(f"{entries[path]}\t{path}\0" for path in paths if path in entries)
+        commits.append((message, index_info))
+
+    commit_ids = commit_batch_with_plumbing(commits)
+    if commit_ids is None:
+        return 1
+    write_lines([f"[{commit_id[:7]}] {message.split(chr(10), 1)[0]}"
+                 for commit_id, message in zip(commit_ids, messages)])
+    return 0
@@ -0,0 +1,287 @@
+# staged_files.py
+
+import subprocess
+import sys
+from array import array
+
+from path_exclusions import exclude_pathspecs, include_pathspecs
+from git_executor import git_cwd, run_git
+
+# mode ورودی‌های gitlink (اشاره‌گر submodule) در خروجی `git diff --raw`
+GITLINK_MODE = '160000'
+# بایت‌های نگه داشته شده از شناسه هر blob (اندازه SHA-1؛ شناسه‌های SHA-256 کوتاه می‌شوند)
+BLOB_ID_SIZE = 20
+NO_BLOB = bytes(BLOB_ID_SIZE)
+
+# --- کدهای نوع عملیات هر فایل (ستون operations) ---
+OP_ADD = 0
+OP_REMOVE = 1
+OP_ENHANCE = 2
+OP_MODIFY = 3
+OPERATION_NAMES = ('add', 'remove', 'enhance', 'modify')
+
+
+def classify_operation(status, additions, deletions):
+    """نوع عملیات یک فایل را از وضعیت و تعداد خطوط آن تعیین می‌کند (همان قواعد قبلی تحلیلگر)."""
+    if status == 'A':
+        return OP_ADD
+    if deletions > additions * 2:
+        return OP_REMOVE
+    if additions > deletions * 2:
+        return OP_ENHANCE
+    return OP_MODIFY
+
+
+def iter_nul_fields(text):
+    """فیلدهای جدا شده با NUL را یکی یکی برمی‌گرداند (بدون ساختن لیست کامل مثل split)."""
+    start = 0
+    while True:
+        end = text.find('\0', start)
+        if end < 0:
+            if start < len(text):
+                yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+class StagedFiles:
+    """
+    نمایش ستونی (columnar) فایل‌های stage شده.
+
+    به جای یک dict برای هر فایل، هر ویژگی در یک ستون فشرده نگه داشته می‌شود:
+      paths       لیست مسیرها (intern شده)
+      additions   array('I') تعداد خطوط اضافه شده
+      deletions   array('I') تعداد خطوط حذف شده
+      operations  bytearray کد عملیات (OP_ADD, OP_REMOVE, ...)
+      statuses    bytearray حرف وضعیت گیت (A, M, D, R, ...)
+      blobs       bytearray شناسه blob نسخه stage شده هر فایل (BLOB_ID_SIZE بایت برای هر فایل؛ صفر اگر
+                  معلوم نباشد یا فایل حذف شده باشد)؛ برای تشخیص تغییر محتوا با همان تعداد خطوط
+      gitlinks    dict {مسیر: (SHA قدیمی، SHA جدید)} فقط برای اشاره‌گرهای submodule (mode 160000)؛
+                  SHA طرف غایب (submodule جدید یا حذف شده) None است
+      excluded    لیست مسیرهای stage شده‌ای که با cmsg.exclude کنار گذاشته شده‌اند (بدون آمار؛
+                  در ستون‌های دیگر نیستند و در لیست فایل‌های پیام فقط تعدادشان می‌آید)
+
+    این ساختار یک بار از خروجی گیت ساخته می‌شود و بین طبقه‌بندی، تعیین محدوده و
+    قالب‌بندی پیام مشترک است. برای سازگاری با کدهای قبلی، مثل یک لیست مسیرها رفتار می‌کند
+    (len، پیمایش و اندیس‌گذاری مسیرها را برمی‌گردانند).
+    """
+
+    __slots__ = ('paths', 'additions', 'deletions', 'operations', 'statuses', 'blobs', 'gitlinks', 'excluded')
+
+    def __init__(self):
+        self.paths = []
+        self.additions = array('I')
+        self.deletions = array('I')
+        self.operations = bytearray()
+        self.statuses = bytearray()
+        self.blobs = bytearray()
+        self.gitlinks = {}
+        self.excluded = []
+
+    def append(self, path, status, additions=0, deletions=0, blob=None):
+        """یک فایل را به همه ستون‌ها اضافه می‌کند (blob: شناسه hex نسخه stage شده، اختیاری)."""
+        self.paths.append(sys.intern(path))
+        self.additions.append(additions)
+        self.deletions.append(deletions)
+        self.operations.append(classify_operation(status, additions, deletions))
+        self.statuses.append(ord(status))
+        # SHA-256 هم به BLOB_ID_SIZE بایت کوتاه می‌شود؛ فقط برای مقایسه لازم است
+        self.blobs += bytes.fromhex(blob)[:BLOB_ID_SIZE].ljust(BLOB_ID_SIZE, b'\0') if blob else NO_BLOB
+
+    # --- رفتار شبیه لیست مسیرها ---
+    def __len__(self):
+        return len(self.paths)
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __getitem__(self, index):
+        return self.paths[index]
+
+    def __bool__(self):
+        return bool(self.paths)
+
+    # --- دسترسی به ستون‌ها ---
+    def status(self, index):
+        """حرف وضعیت گیت برای فایل شماره index."""
+        return chr(self.statuses[index])
+
+    def operation(self, index):
+        """نام عملیات ('add', 'remove', ...) برای فایل شماره index."""
+        return OPERATION_NAMES[self.operations[index]]
+
+    def blob(self, index):
+        """شناسه (کوتاه شده) blob نسخه stage شده فایل شماره index به صورت bytes؛ NO_BLOB اگر معلوم نباشد."""
+        start = index * BLOB_ID_SIZE
+        return bytes(self.blobs[start:start + BLOB_ID_SIZE])
+
+    def paths_with_status(self, status):
+        """مسیر فایل‌هایی که وضعیت گیت آن‌ها برابر status است."""
+        code = ord(status)
+        return [path for path, file_status in zip(self.paths, self.statuses) if file_status == code]
+
+    def total_additions(self):
+        return sum(self.additions)
+
+    def total_deletions(self):
+        return sum(self.deletions)
+
+    def select(self, indices):
+        """یک StagedFiles جدید فقط با فایل‌های شماره indices (مثلاً برای یک کامیت از طرح تقسیم)."""
+        subset = StagedFiles()
+        for index in indices:
+            subset.paths.append(self.paths[index])
+            subset.additions.append(self.additions[index])
+            subset.deletions.append(self.deletions[index])
+            subset.operations.append(self.operations[index])
+            subset.statuses.append(self.statuses[index])
+            subset.blobs += self.blobs[index * BLOB_ID_SIZE:(index + 1) * BLOB_ID_SIZE]
+            if self.paths[index] in self.gitlinks:
+                subset.gitlinks[self.paths[index]] = self.gitlinks[self.paths[index]]
+        return subset
+
+    @classmethod
+    def from_paths(cls, paths):
+        """ساخت از یک لیست ساده مسیرها (بدون آمار diff)، مثلاً برای فراخوانی‌های قدیمی."""
+        staged = cls()
+        for path in paths:
+            staged.append(path, 'M')
+        return staged
+
+    @classmethod
+    def from_diff_output(cls, output):
+        """
+        ساخت از خروجی `git diff --cached --raw --numstat -z`.
+
+        بخش raw (وضعیت هر فایل) اول و بخش numstat (تعداد خطوط) بعد از آن و با همان ترتیب
+        می‌آید، پس آمار هر فایل بر اساس جایگاهش به ستون‌ها نسبت داده می‌شود.
+        """
+        staged = cls()
+        # فیلدها به صورت تنبل پیمایش می‌شوند تا برای خروجی‌های خیلی بزرگ لیست موقت ساخته نشود
+        fields = iter_nul_fields(output)
+        numstat_index = 0
+        for token in fields:
+            if not token:
+                continue
+
+            if token[0] == ':':
+                # :old_mode new_mode old_sha new_sha STATUS\0path\0 (یا دو مسیر برای rename/copy)
+                old_mode, new_mode, old_sha, new_sha, status = token[1:].split(' ')
+                status = status[:1]
+                if status in ('R', 'C'):
+                    next(fields, None)  # مسیر قبلی
+                path = next(fields, '')
+                staged.append(path, status, blob=new_sha)
+                if GITLINK_MODE in (old_mode, new_mode):
+                    # اشاره‌گر submodule؛ SHA صفر یعنی آن طرف وجود ندارد
+                    staged.gitlinks[path] = (old_sha if old_mode == GITLINK_MODE else None,
+                                             new_sha if new_mode == GITLINK_MODE else None)
+                continue
+
+            # additions\tdeletions\tpath\0 (یا مسیر خالی و سپس دو مسیر برای rename/copy)
+            additions, deletions, path = token.split('\t', 2)
+            if path == '':
+                next(fields, None)
+                next(fields, None)
+            if numstat_index < len(staged.paths):
+                # فایل‌های باینری به جای عدد '-' دارند
+                adds = int(additions) if additions != '-' else 0
+                dels = int(deletions) if deletions != '-' else 0
+                staged.additions[numstat_index] = adds
+                staged.deletions[numstat_index] = dels
+                staged.operations[numstat_index] = classify_operation(
+                    chr(staged.statuses[numstat_index]), adds, dels)
+            numstat_index += 1
+        return staged
+
+
+def read_staged_files(paths=None, detect_renames=True, with_numstat=True, base=None, raise_errors=False,
+                      apply_exclusions=True):
+    """
+    فایل‌های stage شده را با یک فراخوانی گیت خوانده و StagedFiles برمی‌گرداند.
+
+    Args:
+        paths (list): محدود کردن به این مسیرها (اختیاری، نسبت به ریشه مخزن).
+        detect_renames (bool): اگر False باشد، هر rename به صورت یک حذف و یک اضافه گزارش می‌شود
+            (هر دو مسیر جداگانه در لیست می‌آیند).
+        with_numstat (bool): اگر False باشد، تعداد خطوط خوانده نمی‌شود (صفر می‌ماند) و گیت محتوای
+            فایل‌ها را مقایسه نمی‌کند؛ برای سطح سریع تحلیل (progressive_analysis).
+        base (str): مقایسه index با این کامیت یا tree به جای HEAD (مثلاً HEAD^ برای --amend).
+        raise_errors (bool): به جای چاپ خطا و برگرداندن None، CalledProcessError ایجاد می‌شود
+            (برای API کتابخانه، git_utils.read_staged_snapshot).
+        apply_exclusions (bool): فایل‌های منطبق با cmsg.exclude با ':(exclude)' در همان دستور گیت
+            کنار گذاشته شده و فقط مسیرشان در StagedFiles.excluded می‌آید. اگر همه فایل‌های stage شده
+            منطبق باشند، الگوها نادیده گرفته می‌شوند (چیز دیگری برای تحلیل نیست).
+
+    Returns:
+        StagedFiles: ساختار ستونی فایل‌ها، یا None اگر دستور گیت ناموفق بود.
+    """
+    # --no-abbrev: SHA کامل اشاره‌گرهای submodule برای خواندن تاریخچه آن‌ها لازم است
+    command = ['git', 'diff', '--cached', '--raw', '-z', '--no-abbrev']
+    if with_numstat:
+        command.insert(4, '--numstat')
+    if not detect_renames:
+        command.append('--no-renames')
+    if base:
+        command.append(base)
+    exclusions = exclude_pathspecs() if apply_exclusions else []
+    if paths or exclusions:
+        # مسیرها نسبت به ریشه مخزن هستند (مثل خروجی خود diff)، پس با 'top' از هر زیردایرکتوری درست‌اند
+        command += ['--'] + [f":(top,literal){path}" for path in paths or ()] + exclusions
+    result = run_git(
+        command,
+        check=False,
+        capture_output=True,
+        text=True,
+        encoding='utf-8',
+        errors='surrogateescape',
+        cwd=git_cwd()
+    )
+    if result.returncode != 0:
+        if raise_errors:
+            raise subprocess.CalledProcessError(result.returncode, command, result.stdout, result.stderr)
+        print(f"Error running 'git diff --cached --raw --numstat':\n{result.stderr}", file=sys.stderr)
+        return None
+    staged = StagedFiles.from_diff_output(result.stdout)
+    if exclusions:
+        staged.excluded = read_excluded_paths(paths, base)
+        if not staged and staged.excluded:
+            return read_staged_files(paths, detect_renames, with_numstat, base, raise_errors, apply_exclusions=False)
+    return staged
+
+
+def read_excluded_paths(paths=None, base=None):
+    """
+    مسیرهای stage شده منطبق با cmsg.exclude را با `git diff --cached --name-only` برمی‌گرداند
+    (بدون مقایسه محتوا، پس برای lockfile های بزرگ هم ارزان است).
+    """
+    command = ['git', 'diff', '--cached', '--name-only', '-z', '--no-renames']
+    if base:
+        command.append(base)
+    result = run_git(
+        command + ['--'] + include_pathspecs(),
+        check=False,
+        capture_output=True,
+        text=True,
+        encoding='utf-8',
+        errors='surrogateescape',
+        cwd=git_cwd()
+    )
+    if result.returncode != 0:
+        return []
+    excluded = [path for path in result.stdout.split('\0') if path]
+    if paths:
+        wanted = set(paths)
+        excluded = [path for path in excluded if path in wanted]
+    return excluded
+
+
+def as_staged_files(staged_files):
+    """یک StagedFiles را همان‌طور که هست و یک لیست مسیر را با یک فراخوانی گیت به StagedFiles تبدیل می‌کند."""
+    if isinstance(staged_files, StagedFiles):
+        return staged_files
+    staged = read_staged_files(staged_files) if staged_files else None
+    if staged is None or len(staged) == 0:
+        return StagedFiles.from_paths(staged_files or [])
+    return staged
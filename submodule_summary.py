@@ -0,0 +1,145 @@
+# submodule_summary.py
+
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from commit_linter import HEADER_PATTERN
+from git_executor import git_cwd, run_git
+
+# حداکثر زمان خواندن تاریخچه هر submodule (میلی‌ثانیه)؛ قابل تغییر با cmsg.submoduleTimeout
+SUBMODULE_TIMEOUT_MS = 2000
+# حداکثر تعداد submodule هایی که همزمان خوانده می‌شوند (کار اصلی در فرآیندهای گیت است، پس thread کافی است)
+SUBMODULE_MAX_WORKERS = 16
+
+
+def summarize_submodule(root, path, old_sha, new_sha, timeout):
+    """
+    بازه کامیت‌هایی که اشاره‌گر یک submodule از old_sha به new_sha جابجا می‌کند را خلاصه می‌کند.
+
+    Returns:
+        dict: 'old'، 'new'، 'status' ('ok'، 'added'، 'removed'، 'timeout' یا 'unavailable')،
+              'commits' (تعداد کامیت‌ها) و 'types' ({نوع: تعداد} از سرخط‌های conventional).
+    """
+    summary = {'old': old_sha, 'new': new_sha, 'status': 'ok', 'commits': 0, 'types': {}}
+    if old_sha is None or new_sha is None:
+        summary['status'] = 'added' if old_sha is None else 'removed'
+        return summary
+
+    submodule_dir = os.path.join(root, path)
+    # submodule مقداردهی نشده (checkout نشده) تاریخچه محلی ندارد
+    if not os.path.exists(os.path.join(submodule_dir, '.git')):
+        summary['status'] = 'unavailable'
+        return summary
+
+    try:
+        result = run_git(
+            ['git', '-C', submodule_dir, 'log', '--no-merges', '--format=%s%x00', f"{old_sha}..{new_sha}"],
+            check=False,
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        summary['status'] = 'timeout'
+        return summary
+    if result.returncode != 0:
+        # کامیت‌ها در clone محلی submodule نیستند (fetch نشده‌اند)
+        summary['status'] = 'unavailable'
+        return summary
+
+    types = summary['types']
+    for header in result.stdout.split('\0'):
+        header = header.strip()
+        if not header:
+            continue
+        summary['commits'] += 1
+        match = HEADER_PATTERN.match(header)
+        if match:
+            types[match.group('type')] = types.get(match.group('type'), 0) + 1
+    return summary
+
+
+def _show_toplevel():
+    result = run_git(
+        ['git', 'rev-parse', '--show-toplevel'],
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=git_cwd()
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def read_submodule_summaries(gitlinks, previous=None, workers=None, timeout_ms=None):
+    """
+    همه submodule های stage شده را به صورت همزمان (با یک thread pool) و با سقف زمانی برای
+    هر کدام خلاصه می‌کند؛ یک submodule کند فقط خلاصه خودش را از دست می‌دهد.
+
+    Args:
+        gitlinks (dict): {مسیر: (SHA قدیمی، SHA جدید)} از StagedFiles.gitlinks.
+        previous (dict): خلاصه‌های قبلی؛ خلاصه‌هایی که SHA هایشان تغییر نکرده دوباره خوانده نمی‌شوند.
+        workers (int): حداکثر thread ها (پیش‌فرض: cmsg.workers یا SUBMODULE_MAX_WORKERS).
+        timeout_ms (int): سقف زمان هر submodule (پیش‌فرض: cmsg.submoduleTimeout).
+
+    Returns:
+        dict: {مسیر: خلاصه} (ساختار summarize_submodule).
+    """
+    from cmsg_config import get_setting
+    if not gitlinks or not get_setting('cmsg.submodulesummary', True):
+        return {}
+
+    summaries = {}
+    pending = []
+    for path, (old_sha, new_sha) in gitlinks.items():
+        cached = (previous or {}).get(path)
+        if cached is not None and (cached['old'], cached['new']) == (old_sha, new_sha):
+            summaries[path] = cached
+        else:
+            pending.append((path, old_sha, new_sha))
+    if not pending:
+        return summaries
+
+    root = _show_toplevel()
+    if root is None:
+        return summaries
+    if timeout_ms is None:
+        timeout_ms = get_setting('cmsg.submoduletimeout', SUBMODULE_TIMEOUT_MS)
+    workers = workers or get_setting('cmsg.workers') or SUBMODULE_MAX_WORKERS
+    with ThreadPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+        futures = {path: pool.submit(summarize_submodule, root, path, old_sha, new_sha, timeout_ms / 1000)
+                   for path, old_sha, new_sha in pending}
+        for path, future in futures.items():
+            summaries[path] = future.result()
+    return summaries
+
+
+def format_type_counts(types, limit=3):
+    """{نوع: تعداد} را به رشته‌ای مثل "3 feat, 1 fix" تبدیل می‌کند (پرتکرارترها اول)."""
+    ranked = sorted(types.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return ", ".join(f"{count} {type_name}" for type_name, count in ranked)
+
+
+def submodule_subject(gitlinks, summaries):
+    """
+    موضوع پیشنهادی برای کامیتی که فقط اشاره‌گر submodule ها را تغییر می‌دهد، مثلاً
+    "update libfoo (3 feat, 1 fix)" یا "update 60 submodules (12 feat, 5 fix)".
+    """
+    paths = list(gitlinks)
+    types = {}
+    for path in paths:
+        for type_name, count in summaries.get(path, {}).get('types', {}).items():
+            types[type_name] = types.get(type_name, 0) + count
+    counts = f" ({format_type_counts(types)})" if types else ""
+
+    if len(paths) == 1:
+        name = os.path.basename(paths[0])
+        old_sha, new_sha = gitlinks[paths[0]]
+        if old_sha is None:
+            return f"add {name} submodule"
+        if new_sha is None:
+            return f"remove {name} submodule"
+        return f"update {name}{counts}" if counts else f"update {name} to {new_sha[:7]}"
+    return f"update {len(paths)} submodules{counts}"
@@ -0,0 +1,234 @@
+# suggest_command.py
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# این ماژول عمداً به prompt_toolkit (ui.py) وابسته نیست تا افزونه‌های ویرایشگر بدون TTY از آن استفاده کنند
+from staged_files import read_staged_files
+from change_analyzer import analyze_content, rank_scope_candidates
+from issue_matcher import read_issue_candidates
+from git_utils import get_git_dir, get_index_path, get_index_signature
+from cmsg_config import get_setting
+import message_formatter
+
+# --- طرح (schema) خروجی `git-cmsg suggest --json` ---
+# هر رکورد یک شیء JSON در یک خط است (در حالت --watch: NDJSON، یک رکورد برای هر تغییر index).
+# تغییرات ناسازگار در ساختار رکورد با افزایش SUGGEST_SCHEMA_VERSION همراه است؛ افزودن فیلد جدید ناسازگار نیست.
+#   schema       همیشه SUGGEST_SCHEMA
+#   version      نسخه طرح (عدد صحیح)
+#   sequence     شماره رکورد در این اجرا (از 0)
+#   staged       تعداد فایل‌های stage شده
+#   stats        {'additions', 'deletions', 'new_files', 'submodules', 'excluded'} (excluded: فایل‌های cmsg.exclude)
+#   suggestion   خروجی analyze_staged_changes: {'type', 'scope', 'subject'} (null اگر چیزی stage نشده)
+#   scopes       محدوده‌های ممکن، به ترتیب اولویت (rank_scope_candidates)
+#   issues       کلیدهای ایشو از نام شاخه و تاریخچه، تازه‌ترین اول (read_issue_candidates)
+#   preview      پیام قالب‌بندی شده با پیشنهادها و لیست فایل‌ها (null اگر چیزی stage نشده)
+#   timings_ms   {'read_staged', 'analysis', 'issues', 'preview', 'total'} زمان هر مرحله
+#   error        پیام خطا، یا null
+SUGGEST_SCHEMA = 'git-cmsg.suggest'
+SUGGEST_SCHEMA_VERSION = 1
+
+# فاصله بررسی index در حالت --watch و مدتی که index باید ثابت بماند تا رکورد جدید ساخته شود
+WATCH_POLL_MS = 100
+WATCH_DEBOUNCE_MS = 300
+
+
+def _elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def empty_record(sequence=0, error=None):
+    """رکورد بدون پیشنهاد (چیزی stage نشده یا خطای گیت)، با همه فیلدهای طرح."""
+    return {
+        'schema': SUGGEST_SCHEMA,
+        'version': SUGGEST_SCHEMA_VERSION,
+        'sequence': sequence,
+        'staged': 0,
+        'stats': {'additions': 0, 'deletions': 0, 'new_files': 0, 'submodules': 0, 'excluded': 0},
+        'suggestion': None,
+        'scopes': [],
+        'issues': [],
+        'preview': None,
+        'timings_ms': {},
+        'error': error,
+    }
+
+
+class SuggestionFeed:
+    """
+    رکوردهای پیشنهاد را می‌سازد و تحلیلگر را بین رکوردها نگه می‌دارد: در حالت --watch اگر فقط
+    index تغییر کرده باشد، فقط ورودی‌های تغییر یافته دوباره تحلیل می‌شوند (apply_snapshot)؛
+    بعد از جابجایی HEAD (کامیت، checkout) تحلیل و کلیدهای ایشو از نو خوانده می‌شوند.
+    """
+
+    def __init__(self, language_code):
+        self.language_code = language_code
+        self.sequence = 0
+        self.analyzer = None
+        self.issues = None
+
+    def reset(self):
+        """بعد از جابجایی HEAD: diff همه فایل‌ها و تاریخچه ممکن است تغییر کرده باشد."""
+        self.analyzer = None
+        self.issues = None
+
+    def record(self):
+        start = time.perf_counter()
+        timings = {}
+
+        staged = read_staged_files()
+        timings['read_staged'] = _elapsed_ms(start)
+        if staged is None:
+            record = empty_record(self.sequence, error="git diff --cached failed")
+            self.sequence += 1
+            return record
+
+        if self.issues is None:
+            phase = time.perf_counter()
+            self.issues = read_issue_candidates()
+            timings['issues'] = _elapsed_ms(phase)
+
+        if not staged:
+            self.analyzer = None
+            record = empty_record(self.sequence)
+            record['issues'] = self.issues
+        else:
+            phase = time.perf_counter()
+            if self.analyzer is None:
+                self.analyzer = analyze_content(staged)
+            else:
+                self.analyzer.apply_snapshot(staged)
+            suggestion = self.analyzer.suggestions()
+            timings['analysis'] = _elapsed_ms(phase)
+
+            phase = time.perf_counter()
+            preview = message_formatter.format_message(suggestion, staged, self.language_code)
+            timings['preview'] = _elapsed_ms(phase)
+
+            record = empty_record(self.sequence)
+            record.update({
+                'staged': len(staged),
+                'stats': {
+                    'additions': self.analyzer.total_additions,
+                    'deletions': self.analyzer.total_deletions,
+                    'new_files': len(self.analyzer.new_files),
+                    'submodules': len(staged.gitlinks),
+                    'excluded': len(staged.excluded),
+                },
+                'suggestion': suggestion,
+                'scopes': rank_scope_candidates(staged, suggestion['scope']),
+                'issues': self.issues,
+                'preview': preview,
+            })
+
+        timings['total'] = _elapsed_ms(start)
+        record['timings_ms'] = timings
+        self.sequence += 1
+        return record
+
+
+def _state_signature(index_path, git_dir):
+    """
+    امضای ارزان (stat) وضعیتی که پیشنهادها به آن وابسته‌اند: فایل index، و HEAD و reflog آن
+    (که با هر کامیت، checkout یا reset تغییر می‌کنند).
+    """
+    return (get_index_signature(index_path),
+            get_index_signature(os.path.join(git_dir, 'HEAD')),
+            get_index_signature(os.path.join(git_dir, 'logs', 'HEAD')))
+
+
+def write_record(record, as_json):
+    """یک رکورد را در stdout می‌نویسد (JSON در یک خط، یا متن خوانا) و flush می‌کند."""
+    if as_json:
+        sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    else:
+        lines = []
+        if record['error']:
+            lines.append(f"error: {record['error']}")
+        elif record['suggestion'] is None:
+            lines.append("No changes are staged.")
+        else:
+            lines += [f"{key}: {record['suggestion'][key]}" for key in ('type', 'scope', 'subject')]
+            lines.append(f"scopes: {', '.join(record['scopes'])}")
+            lines.append(f"issues: {', '.join(record['issues'])}")
+            lines += ["", record['preview']]
+        lines.append(f"({record['timings_ms'].get('total', 0)} ms)")
+        sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+
+def watch(feed, as_json, debounce_ms=WATCH_DEBOUNCE_MS, poll_ms=WATCH_POLL_MS):
+    """
+    بعد از هر تغییر index یا HEAD یک رکورد جدید می‌نویسد. تغییرات پشت سر هم (مثلاً چند `git add`
+    پیاپی از ویرایشگر) با debounce یکی می‌شوند: رکورد فقط وقتی ساخته می‌شود که وضعیت به مدت
+    debounce_ms ثابت مانده باشد. تا بسته شدن stdout یا Ctrl+C ادامه پیدا می‌کند.
+    """
+    git_dir = get_git_dir()
+    index_path = get_index_path(git_dir)
+    emitted = _state_signature(index_path, git_dir)
+    write_record(feed.record(), as_json)
+    while True:
+        time.sleep(poll_ms / 1000)
+        current = _state_signature(index_path, git_dir)
+        if current == emitted:
+            continue
+        # منتظر می‌مانیم تا تغییرات پشت سر هم تمام شوند
+        while True:
+            time.sleep(debounce_ms / 1000)
+            settled = _state_signature(index_path, git_dir)
+            if settled == current:
+                break
+            current = settled
+        if current == emitted:
+            continue
+        if current[1:] != emitted[1:]:
+            feed.reset()
+        emitted = current
+        write_record(feed.record(), as_json)
+
+
+def run_suggest_command(argv):
+    """
+    Entry point of `git-cmsg suggest`: prints the suggestions for the staged changes without
+    any prompt (for editor integrations). --json prints one record of the documented schema;
+    --watch keeps running and prints a fresh NDJSON record whenever the index changes.
+
+    Returns:
+        int: The process exit code (0 success, 2 usage or git error).
+    """
+    parser = argparse.ArgumentParser(
+        prog='git-cmsg suggest',
+        description="Print commit message suggestions for the staged changes without prompting.")
+    parser.add_argument('--json', action='store_true',
+                        help=f"Print a JSON record ({SUGGEST_SCHEMA} version {SUGGEST_SCHEMA_VERSION}).")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running and print a new record (NDJSON with --json) whenever the index changes.")
+    parser.add_argument('--debounce', type=int, default=WATCH_DEBOUNCE_MS, metavar='MS',
+                        help=f"With --watch, wait until the index is unchanged for MS milliseconds "
+                             f"(default: {WATCH_DEBOUNCE_MS}).")
+    parser.add_argument('--lang', choices=('en', 'fa'), default=None,
+                        help="Language of the file list in the preview (default: cmsg.lang or en).")
+    args = parser.parse_args(argv)
+    args.lang = args.lang or get_setting('cmsg.lang', 'en')
+
+    if get_git_dir() is None:
+        write_record(empty_record(error="not a git repository"), args.json)
+        return 2
+
+    feed = SuggestionFeed(args.lang)
+    if not args.watch:
+        record = feed.record()
+        write_record(record, args.json)
+        return 2 if record['error'] else 0
+
+    try:
+        watch(feed, args.json, debounce_ms=max(0, args.debounce))
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        # خواننده (افزونه ویرایشگر) stdout را بسته است؛ خطای flush هنگام خروج هم نادیده گرفته می‌شود
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 0
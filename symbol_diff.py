@@ -0,0 +1,319 @@
+# symbol_diff.py
+
+import ast
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from path_exclusions import exclude_pathspecs
+from git_executor import git_cwd, popen_git, run_git
+
+# جدول نمادهای هر blob بر اساس SHA در این فایل داخل دایرکتوری گیت نگه داشته می‌شود
+SYMBOL_CACHE_FILENAME = 'cmsg-symbol-cache.sqlite'
+# با تغییر ساختار جدول نمادها این عدد را بالا ببرید تا کش قدیمی دور ریخته شود
+SYMBOL_CACHE_SCHEMA_VERSION = 2
+# فقط اگر تعداد blob های جدید حداقل این مقدار باشد process pool ساخته می‌شود
+# (برای چند فایل، هزینه شروع pool از خود parse بیشتر است)
+POOL_MIN_BLOBS = 16
+# blob های بزرگ‌تر از این اندازه parse نمی‌شوند (مثلاً فایل‌های تولید شده)
+MAX_PARSE_BYTES = 1024 * 1024
+# وقتی تعداد ردیف‌های کش از این بیشتر شود، قدیمی‌ترین ردیف‌ها حذف می‌شوند (cmsg.symbolCacheMaxEntries)
+SYMBOL_CACHE_MAX_ENTRIES = 200000
+# تعداد SHA در هر پرس‌وجوی sqlite
+CACHE_QUERY_BATCH = 500
+
+_NULL_SHA_CHARS = frozenset('0')
+
+
+def _body_hash(node):
+    """اثر انگشت بدنه یک تابع یا کلاس (بدون نام آن) برای تشخیص تغییر نام."""
+    parts = [ast.dump(statement) for statement in node.body]
+    if hasattr(node, 'args'):
+        parts.append(ast.dump(node.args))
+    return hashlib.sha1("\n".join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def parse_symbols(source):
+    """
+    توابع، کلاس‌ها و متدهای سطح بالای یک فایل پایتون را برمی‌گرداند (در worker ها اجرا می‌شود).
+
+    Returns:
+        list: [نام کامل، نوع، اثر انگشت بدنه] برای هر نماد، یا None اگر فایل parse نشود.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    symbols = []
+    stack = [(tree.body, '', False)]
+    while stack:
+        body, prefix, in_class = stack.pop()
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                symbols.append([prefix + node.name, 'method' if in_class else 'function', _body_hash(node)])
+            elif isinstance(node, ast.ClassDef):
+                symbols.append([prefix + node.name, 'class', _body_hash(node)])
+                stack.append((node.body, f"{prefix}{node.name}.", True))
+    return symbols
+
+
+def diff_symbols(old_symbols, new_symbols):
+    """
+    دو جدول نماد را مقایسه می‌کند. نماد حذف شده و نماد اضافه شده‌ای که نوع و بدنه یکسان
+    (و والد یکسان) دارند، تغییر نام حساب می‌شوند.
+
+    Returns:
+        dict: لیست‌های 'added'، 'removed' و 'renamed' (جفت‌های [قدیمی، جدید]).
+    """
+    old_by_name = {name: (kind, body) for name, kind, body in old_symbols or ()}
+    new_by_name = {name: (kind, body) for name, kind, body in new_symbols or ()}
+    added = [name for name in new_by_name if name not in old_by_name]
+    removed = [name for name in old_by_name if name not in new_by_name]
+
+    renamed = []
+    removed_by_body = {}
+    for name in removed:
+        parent = name.rpartition('.')[0]
+        removed_by_body.setdefault((parent,) + old_by_name[name], []).append(name)
+    still_added = []
+    for name in added:
+        candidates = removed_by_body.get((name.rpartition('.')[0],) + new_by_name[name])
+        if candidates:
+            old_name = candidates.pop(0)
+            renamed.append([old_name, name])
+            removed.remove(old_name)
+        else:
+            still_added.append(name)
+    return {'added': still_added, 'removed': removed, 'renamed': renamed}
+
+
+def read_python_blob_pairs(base=None, exclude=()):
+    """
+    (مسیر، SHA قدیمی، SHA جدید) را برای فایل‌های .py stage شده با یک فراخوانی گیت برمی‌گرداند.
+    برای فایل جدید SHA قدیمی و برای فایل حذف شده SHA جدید None است.
+    فایل‌های exclude (مثلاً generated یا vendored) کنار گذاشته می‌شوند تا blob آن‌ها parse نشود.
+    """
+    exclude = set(exclude)
+    result = run_git(
+        ['git', 'diff', '--cached', '--raw', '-z', '--no-abbrev'] + ([base] if base else [])
+        + ['--'] + exclude_pathspecs(),
+        check=False,
+        capture_output=True,
+        text=True,
+        encoding='utf-8',
+        errors='surrogateescape',
+        cwd=git_cwd()
+    )
+    if result.returncode != 0:
+        return []
+
+    pairs = []
+    fields = iter(result.stdout.split('\0'))
+    for token in fields:
+        if not token.startswith(':'):
+            continue
+        # :old_mode new_mode old_sha new_sha STATUS
+        _, _, old_sha, new_sha, status = token[1:].split(' ')
+        path = next(fields, '')
+        if status[:1] in ('R', 'C'):
+            path = next(fields, '')  # مسیر جدید
+        if path.endswith('.py') and path not in exclude:
+            pairs.append((path,
+                          None if set(old_sha) <= _NULL_SHA_CHARS else old_sha,
+                          None if set(new_sha) <= _NULL_SHA_CHARS else new_sha))
+    return pairs
+
+
+def iter_blobs(shas):
+    """
+    محتوای blob ها را با یک فرآیند `git cat-file --batch` به صورت جریانی برمی‌گرداند: (sha، bytes یا None).
+    SHA ها در یک thread جدا نوشته می‌شوند تا pipe ها قفل نشوند.
+    """
+    process = popen_git(
+        ['git', 'cat-file', '--batch'],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        cwd=git_cwd()
+    )
+
+    def feed():
+        try:
+            for sha in shas:
+                process.stdin.write(sha.encode('ascii') + b"\n")
+        finally:
+            process.stdin.close()
+
+    writer = threading.Thread(target=feed, daemon=True)
+    writer.start()
+    try:
+        for sha in shas:
+            header = process.stdout.readline().split()
+            if len(header) < 3 or header[1] != b'blob':
+                yield sha, None  # "<sha> missing"
+                continue
+            size = int(header[2])
+            content = process.stdout.read(size)
+            process.stdout.read(1)  # newline بعد از محتوا
+            yield sha, content if size <= MAX_PARSE_BYTES else None
+    finally:
+        writer.join()
+        process.stdout.close()
+        process.wait()
+
+
+class SymbolCache:
+    """جدول نمادها بر اساس SHA blob؛ ':memory:' یعنی بدون ذخیره روی دیسک."""
+
+    def __init__(self, cache_path):
+        self.connection = sqlite3.connect(cache_path)
+        self.connection.execute("PRAGMA synchronous = OFF")  # فقط کش است
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != SYMBOL_CACHE_SCHEMA_VERSION:
+            self.connection.execute("DROP TABLE IF EXISTS symbols")
+            self.connection.execute(f"PRAGMA user_version = {SYMBOL_CACHE_SCHEMA_VERSION}")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS symbols (blob TEXT PRIMARY KEY, symbols TEXT, stored REAL) WITHOUT ROWID")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS symbols_stored ON symbols (stored)")
+        self.hits = 0
+
+    def lookup(self, shas):
+        """{sha: symbols} برای SHA هایی که در کش هستند."""
+        found = {}
+        shas = list(shas)
+        for start in range(0, len(shas), CACHE_QUERY_BATCH):
+            batch = shas[start:start + CACHE_QUERY_BATCH]
+            query = f"SELECT blob, symbols FROM symbols WHERE blob IN ({','.join('?' * len(batch))})"
+            for sha, symbols in self.connection.execute(query, batch):
+                found[sha] = json.loads(symbols)
+        self.hits += len(found)
+        return found
+
+    def store(self, parsed, max_entries=SYMBOL_CACHE_MAX_ENTRIES):
+        """
+        نمادهای parse شده را ذخیره می‌کند؛ اگر کش از max_entries بزرگ‌تر شود، قدیمی‌ترین ردیف‌ها
+        (بر اساس زمان ذخیره) حذف می‌شوند تا جا باز شود.
+        """
+        count = self.connection.execute("SELECT COUNT(*) FROM symbols").fetchone()[0]
+        excess = count + len(parsed) - max_entries
+        if excess > 0:
+            self.connection.execute(
+                "DELETE FROM symbols WHERE blob IN (SELECT blob FROM symbols ORDER BY stored LIMIT ?)",
+                (excess,))
+        stored = time.time()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO symbols VALUES (?, ?, ?)",
+            ((sha, json.dumps(symbols), stored) for sha, symbols in parsed.items()))
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+def parse_blobs(shas, workers=None):
+    """blob ها را از cat-file می‌خواند و parse می‌کند؛ برای تعداد زیاد از process pool استفاده می‌شود."""
+    parsed = {}
+    if len(shas) < POOL_MIN_BLOBS:
+        for sha, content in iter_blobs(shas):
+            parsed[sha] = parse_symbols(content) if content is not None else None
+        return parsed
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for sha, content in iter_blobs(shas):
+            if content is None:
+                parsed[sha] = None
+            else:
+                # parse همزمان با خواندن blob های بعدی از pipe شروع می‌شود
+                futures[sha] = pool.submit(parse_symbols, content)
+        for sha, future in futures.items():
+            parsed[sha] = future.result()
+    return parsed
+
+
+def read_symbol_changes(cache_path=None, stats=None, base=None, exclude=()):
+    """
+    تغییرات نمادها (توابع، کلاس‌ها و متدها) را برای هر فایل .py stage شده برمی‌گرداند.
+
+    Args:
+        cache_path (str): فایل کش؛ None یعنی cmsg-symbol-cache.sqlite در دایرکتوری گیت.
+        stats (dict): اگر داده شود، 'symbol_cache_hits' و 'symbols_parsed' به آن اضافه می‌شوند.
+        base (str): مقایسه index با این کامیت به جای HEAD (برای --amend).
+        exclude (list): مسیرهایی که نمادهایشان خوانده نمی‌شود (FileAttributes.content_excluded).
+
+    Returns:
+        dict: {مسیر: {'added', 'removed', 'renamed'}} فقط برای فایل‌هایی که نمادشان تغییر کرده.
+    """
+    pairs = read_python_blob_pairs(base, exclude)
+    if not pairs:
+        return {}
+
+    if cache_path is None:
+        from git_utils import get_git_dir
+        git_dir = get_git_dir()
+        cache_path = os.path.join(git_dir, SYMBOL_CACHE_FILENAME) if git_dir else ':memory:'
+
+    wanted = {sha for _, old_sha, new_sha in pairs for sha in (old_sha, new_sha) if sha}
+    try:
+        cache = SymbolCache(cache_path)
+    except sqlite3.Error as e:
+        print(f"Warning: Could not open the symbol cache '{cache_path}': {e}", file=sys.stderr)
+        cache = SymbolCache(':memory:')
+    try:
+        tables = cache.lookup(wanted)
+        missing = sorted(wanted - tables.keys())
+        if missing:
+            from cmsg_config import get_setting
+            parsed = parse_blobs(missing, workers=get_setting('cmsg.workers') or None)
+            try:
+                cache.store(parsed, get_setting('cmsg.symbolcachemaxentries', SYMBOL_CACHE_MAX_ENTRIES))
+            except sqlite3.Error as e:
+                # git dir فقط‌خواندنی یا کش قفل شده توسط اجرای همزمان؛ نتیجه این اجرا معتبر است
+                print(f"Warning: Could not update the symbol cache '{cache_path}': {e}", file=sys.stderr)
+            tables.update(parsed)
+    finally:
+        cache.close()
+    if stats is not None:
+        stats['symbol_cache_hits'] = stats.get('symbol_cache_hits', 0) + cache.hits
+        stats['symbols_parsed'] = stats.get('symbols_parsed', 0) + len(missing)
+
+    changes = {}
+    for path, old_sha, new_sha in pairs:
+        old_symbols = tables.get(old_sha) if old_sha else []
+        new_symbols = tables.get(new_sha) if new_sha else []
+        if old_symbols is None or new_symbols is None:
+            continue  # یکی از دو طرف parse نشد (خطای نحوی یا فایل خیلی بزرگ)
+        file_changes = diff_symbols(old_symbols, new_symbols)
+        if any(file_changes.values()):
+            changes[path] = file_changes
+    return changes
+
+
+def summarize_symbol_names(symbol_changes, max_names=2):
+    """
+    نام نمادهای تغییر یافته را برای استفاده در موضوع کامیت خلاصه می‌کند،
+    مثلاً "parse_config" یا "parse_config, Loader and 3 more". اگر نمادی تغییر نکرده باشد "" برمی‌گرداند.
+    """
+    def top_level(symbol_names):
+        # متدهای یک کلاس اضافه (یا حذف) شده جداگانه نام برده نمی‌شوند
+        listed = set(symbol_names)
+        return [name for name in symbol_names if name.rpartition('.')[0] not in listed]
+
+    names = []
+    for file_changes in symbol_changes.values():
+        names.extend(top_level(file_changes['added']))
+        names.extend(new for _, new in file_changes['renamed'])
+    if not names:
+        for file_changes in symbol_changes.values():
+            names.extend(top_level(file_changes['removed']))
+    if not names:
+        return ""
+    if len(names) <= max_names:
+        return " and ".join(names)
+    return f"{', '.join(names[:max_names])} and {len(names) - max_names} more"
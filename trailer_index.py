@@ -0,0 +1,347 @@
+# trailer_index.py
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+from bisect import bisect_left
+from concurrent.futures import Future
+from heapq import nsmallest
+
+from git_executor import git_cwd, run_git
+
+# نمایه افراد و trailer های تاریخچه برای تکمیل سطرهای trailer (Co-authored-by، Reviewed-by، Refs، ...).
+# از `git log --format=...%an%x00%ae%x00%(trailers)` ساخته و در این فایل sqlite داخل دایرکتوری گیت
+# نگه داشته می‌شود. هر اجرا فقط کامیت‌هایی را می‌خواند که از نوک‌های قبلاً نمایه شده (tips) قابل
+# دسترسی نیستند (`git log HEAD ^tip...`)، پس بعد از اولین ساخت هر بار فقط چند کامیت تازه خوانده می‌شود.
+TRAILER_INDEX_FILENAME = 'cmsg-trailer-index.sqlite'
+# با تغییر جدول‌ها افزایش دهید؛ نمایه قدیمی دور ریخته می‌شود
+TRAILER_INDEX_SCHEMA_VERSION = 1
+# اولین ساخت (یا بعد از حذف نوک‌ها با rebase و gc) فقط این تعداد از تازه‌ترین کامیت‌ها را می‌خواند
+INITIAL_HISTORY_LIMIT = 20000
+# حداکثر نوک‌های نگه داشته شده؛ قدیمی‌ترها کنار می‌روند (خواندن دوباره یک کامیت نمایه را تغییر نمی‌دهد)
+MAX_INDEXED_TIPS = 32
+# فعالیت هر فرد به تفکیک پیشوند مسیر تا این عمق ثبت می‌شود ('src'، 'src/ui')
+PATH_PREFIX_DEPTH = 2
+# حداکثر مقدارهای قبلی هر کلید (مثلاً Refs) که در حافظه بارگذاری می‌شود (تازه‌ترین‌ها)
+MAX_VALUES_PER_KEY = 1000
+# حداکثر تعداد نتایج هر جستجو
+TRAILER_COMPLETION_LIMIT = 20
+# بیش از این تعداد تطبیق در نمایه کلمات، افراد به ترتیب رتبه پیمایش می‌شوند (lookup_people)
+BROAD_QUERY_MATCHES = 2000
+
+# کلیدهایی که همیشه پیشنهاد می‌شوند، حتی اگر در تاریخچه نیامده باشند
+DEFAULT_TRAILER_KEYS = ('Co-authored-by', 'Reviewed-by', 'Refs')
+# کلیدهایی که مقدارشان یک فرد است ("Name <email>")؛ برای بقیه، مقدارهای قبلی همان کلید پیشنهاد می‌شود
+PERSON_TRAILER_KEYS = frozenset(key.lower() for key in (
+    'Co-authored-by', 'Reviewed-by', 'Signed-off-by', 'Acked-by', 'Tested-by', 'Reported-by',
+    'Suggested-by', 'Helped-by'))
+
+TRAILER_LINE_PATTERN = re.compile(r'^(?P<key>[A-Za-z][\w-]*):[ \t]*(?P<value>\S.*)$')
+IDENTITY_PATTERN = re.compile(r'^(?P<name>[^<>]*?)\s*<(?P<email>[^<>\s]+@[^<>\s]+)>$')
+# هر رکورد با RS شروع می‌شود؛ فیلدها با NUL جدا شده و مسیرهای --name-only بعد از آخرین NUL می‌آیند
+LOG_FORMAT = '%x1e%H%x00%ct%x00%an%x00%ae%x00%(trailers:only,unfold)%x00'
+
+
+def is_person_key(key):
+    """آیا مقدار این کلید trailer یک فرد است؟"""
+    return key.strip().lower() in PERSON_TRAILER_KEYS
+
+
+def path_prefixes(paths, depth=PATH_PREFIX_DEPTH):
+    """پیشوندهای دایرکتوری مسیرها تا عمق depth ('src/ui/a.py' ← 'src'، 'src/ui')."""
+    prefixes = set()
+    for path in paths:
+        parts = path.strip('"').split('/')[:-1]
+        for level in range(1, min(depth, len(parts)) + 1):
+            prefixes.add('/'.join(parts[:level]))
+    return prefixes
+
+
+def open_index(index_path):
+    """نمایه را باز می‌کند (یا می‌سازد)؛ ':memory:' یعنی بدون ذخیره."""
+    connection = sqlite3.connect(index_path, check_same_thread=False)
+    # فقط کش است: از دست رفتن آخرین نوشتن‌ها در crash مشکلی ندارد
+    connection.execute("PRAGMA synchronous = OFF")
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version != TRAILER_INDEX_SCHEMA_VERSION:
+        for table in ('identities', 'activity', 'trailer_keys', 'trailer_values', 'tips'):
+            connection.execute(f"DROP TABLE IF EXISTS {table}")
+        connection.execute(f"PRAGMA user_version = {TRAILER_INDEX_SCHEMA_VERSION}")
+    # هر فرد یک بار (ایمیل با حروف کوچک)، با نام و زمان تازه‌ترین کامیت
+    connection.execute("CREATE TABLE IF NOT EXISTS identities ("
+                       " email TEXT PRIMARY KEY, name TEXT, last_time INTEGER) WITHOUT ROWID")
+    # تازه‌ترین زمان کامیت هر فرد زیر هر پیشوند مسیر
+    connection.execute("CREATE TABLE IF NOT EXISTS activity ("
+                       " email TEXT, prefix TEXT, last_time INTEGER,"
+                       " PRIMARY KEY (prefix, email)) WITHOUT ROWID")
+    connection.execute("CREATE TABLE IF NOT EXISTS trailer_keys ("
+                       " key TEXT PRIMARY KEY, display TEXT, last_time INTEGER) WITHOUT ROWID")
+    connection.execute("CREATE TABLE IF NOT EXISTS trailer_values ("
+                       " key TEXT, value TEXT, last_time INTEGER, PRIMARY KEY (key, value)) WITHOUT ROWID")
+    connection.execute("CREATE TABLE IF NOT EXISTS tips (id TEXT PRIMARY KEY, indexed_at INTEGER) WITHOUT ROWID")
+    connection.commit()
+    return connection
+
+
+def _read_head():
+    result = run_git(['git', 'rev-parse', '--verify', '-q', 'HEAD'], check=False,
+                            capture_output=True, text=True, cwd=git_cwd())
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _read_log(tips):
+    """خروجی `git log` کامیت‌های HEAD که از tips قابل دسترسی نیستند، یا None در صورت خطا."""
+    command = ['git', '-c', 'core.quotepath=false', 'log', f'--format={LOG_FORMAT}', '--name-only', 'HEAD']
+    if tips:
+        command += [f'^{tip}' for tip in tips]
+    else:
+        command.append(f'-n{INITIAL_HISTORY_LIMIT}')
+    result = run_git(command, check=False, capture_output=True, text=True,
+                            encoding='utf-8', errors='replace', cwd=git_cwd())
+    return result.stdout if result.returncode == 0 else None
+
+
+def _keep_latest(table, key, value, time):
+    current = table.get(key)
+    if current is None or time > current[1]:
+        table[key] = (value, time)
+
+
+def parse_log_output(output):
+    """
+    رکوردهای خروجی `git log --format=LOG_FORMAT --name-only` را جمع می‌کند.
+
+    Returns:
+        tuple: (identities, activity, keys, values)
+            identities  {ایمیل: (نام، زمان)}
+            activity    {(ایمیل، پیشوند): (None، زمان)}
+            keys        {کلید با حروف کوچک: (شکل نوشته شده، زمان)}
+            values      {(کلید با حروف کوچک، مقدار): (None، زمان)} فقط برای کلیدهای غیر فرد
+    """
+    identities, activity, keys, values = {}, {}, {}, {}
+    for record in output.split('\x1e')[1:]:
+        fields = record.split('\0')
+        if len(fields) < 6:
+            continue
+        _, commit_time, name, email, trailers, names = fields[:6]
+        try:
+            time = int(commit_time)
+        except ValueError:
+            continue
+        people = [(name, email)]
+        for line in trailers.splitlines():
+            match = TRAILER_LINE_PATTERN.match(line)
+            if not match:
+                continue
+            key, value = match.group('key'), match.group('value').strip()
+            _keep_latest(keys, key.lower(), key, time)
+            person = IDENTITY_PATTERN.match(value)
+            if person:
+                people.append((person.group('name'), person.group('email')))
+            elif not is_person_key(key):
+                _keep_latest(values, (key.lower(), value), None, time)
+        prefixes = path_prefixes(path for path in names.split('\n') if path)
+        for person_name, person_email in people:
+            person_email = person_email.strip().lower()
+            if not person_email:
+                continue
+            _keep_latest(identities, person_email, person_name.strip() or person_email, time)
+            for prefix in prefixes:
+                _keep_latest(activity, (person_email, prefix), None, time)
+    return identities, activity, keys, values
+
+
+def update_index(connection):
+    """
+    کامیت‌های تازه HEAD را به نمایه اضافه می‌کند.
+
+    Returns:
+        int: تعداد کامیت‌های خوانده شده (0 اگر HEAD قبلاً نمایه شده باشد).
+    """
+    head = _read_head()
+    if head is None:
+        return 0
+    tips = [row[0] for row in connection.execute("SELECT id FROM tips ORDER BY indexed_at DESC")]
+    if head in tips:
+        return 0
+    output = _read_log(tips)
+    if output is None and tips:
+        # یکی از نوک‌ها دیگر وجود ندارد (rebase و gc)؛ از تازه‌ترین کامیت‌ها دوباره خوانده می‌شود
+        connection.execute("DELETE FROM tips")
+        output = _read_log([])
+    if output is None:
+        return 0
+    identities, activity, keys, values = parse_log_output(output)
+    # upsert ها فقط زمان تازه‌تر را نگه می‌دارند، پس خواندن دوباره یک کامیت بی‌اثر است
+    connection.executemany(
+        "INSERT INTO identities VALUES (?, ?, ?) ON CONFLICT (email) DO UPDATE SET"
+        " name = CASE WHEN excluded.last_time > last_time THEN excluded.name ELSE name END,"
+        " last_time = max(last_time, excluded.last_time)",
+        [(email, name, time) for email, (name, time) in identities.items()])
+    connection.executemany(
+        "INSERT INTO activity VALUES (?, ?, ?) ON CONFLICT (prefix, email) DO UPDATE SET"
+        " last_time = max(last_time, excluded.last_time)",
+        [(email, prefix, time) for (email, prefix), (_, time) in activity.items()])
+    connection.executemany(
+        "INSERT INTO trailer_keys VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE SET"
+        " display = CASE WHEN excluded.last_time > last_time THEN excluded.display ELSE display END,"
+        " last_time = max(last_time, excluded.last_time)",
+        [(key, display, time) for key, (display, time) in keys.items()])
+    connection.executemany(
+        "INSERT INTO trailer_values VALUES (?, ?, ?) ON CONFLICT (key, value) DO UPDATE SET"
+        " last_time = max(last_time, excluded.last_time)",
+        [(key, value, time) for (key, value), (_, time) in values.items()])
+    indexed_at = (connection.execute("SELECT max(indexed_at) FROM tips").fetchone()[0] or 0) + 1
+    connection.execute("INSERT OR REPLACE INTO tips VALUES (?, ?)", (head, indexed_at))
+    connection.execute("DELETE FROM tips WHERE id NOT IN"
+                       " (SELECT id FROM tips ORDER BY indexed_at DESC LIMIT ?)", (MAX_INDEXED_TIPS,))
+    connection.commit()
+    return output.count('\x1e')
+
+
+class TrailerIndex:
+    """
+    نمایه درون حافظه برای یک اجرا، رتبه‌بندی شده برای مسیرهای stage شده:
+    افراد به ترتیب تازه‌ترین فعالیت زیر پیشوندهای همین مسیرها و سپس تازه‌ترین فعالیت کلی.
+    جستجوی افراد یک bisect روی لیست مرتب کلمات نام و ایمیل است (مستقل از طول تاریخچه).
+    """
+
+    __slots__ = ('people', 'keys', '_values', '_words', '_tokens')
+
+    def __init__(self, people, keys=(), values=None):
+        # people: "Name <email>" به ترتیب رتبه؛ keys: کلیدها به ترتیب پیشنهاد؛ values: {کلید: [مقدار، ...]}
+        self.people = list(people)
+        self.keys = list(keys)
+        self._values = values or {}
+        self._words = []
+        tokens = []
+        for rank, person in enumerate(self.people):
+            lowered = person.lower()
+            words = set(re.split(r'[\s<>@.]+', lowered))
+            # کل نام و کل ایمیل هم (برای جستجوی 'alice s' یا 'bob@x.io')
+            words.update((lowered, lowered[lowered.rfind('<') + 1:].rstrip('>')))
+            words.discard('')
+            self._words.append(tuple(words))
+            tokens.extend((word, rank) for word in words)
+        tokens.sort()
+        self._tokens = tokens
+
+    def lookup_people(self, query, limit=TRAILER_COMPLETION_LIMIT):
+        """افرادی که یکی از کلمات نام یا ایمیلشان با query شروع می‌شود (query چند کلمه‌ای: شامل همه آن)."""
+        query = query.strip().lower()
+        if not query:
+            return self.people[:limit]
+        people = self.people
+        tokens = self._tokens
+        # محدوده هر کلمه query در لیست مرتب کلمات؛ باریک‌ترین محدوده استفاده می‌شود
+        ranges = []
+        for word in query.split():
+            word = word.strip('<>')
+            if word:
+                start = bisect_left(tokens, (word,))
+                ranges.append((bisect_left(tokens, (word + '\U0010ffff',), start) - start, start, word))
+        if not ranges:
+            return []
+        size, start, word = min(ranges)
+        if size > BROAD_QUERY_MATCHES:
+            # جستجوی کوتاه با تطبیق‌های زیاد ('a'): پیمایش به ترتیب رتبه زود به limit نتیجه می‌رسد
+            found = []
+            for rank, words in enumerate(self._words):
+                if any(token.startswith(word) for token in words) and query in people[rank].lower():
+                    found.append(people[rank])
+                    if len(found) >= limit:
+                        break
+            return found
+        ranks = {rank for _, rank in tokens[start:start + size]}
+        if word != query:
+            ranks = {rank for rank in ranks if query in people[rank].lower()}
+        return [people[rank] for rank in nsmallest(limit, ranks)]
+
+    def lookup_keys(self, query, limit=TRAILER_COMPLETION_LIMIT):
+        """کلیدهایی که با query شروع می‌شوند."""
+        query = query.strip().lower()
+        return [key for key in self.keys if key.lower().startswith(query)][:limit]
+
+    def lookup_values(self, key, query, limit=TRAILER_COMPLETION_LIMIT):
+        """مقدارهای قبلی یک کلید غیر فرد (تازه‌ترین اول) که query را در بر دارند."""
+        query = query.strip().lower()
+        found = []
+        for value in self._values.get(key.strip().lower(), ()):
+            if query in value.lower():
+                found.append(value)
+                if len(found) >= limit:
+                    break
+        return found
+
+
+def _read_user_email():
+    result = run_git(['git', 'config', 'user.email'], check=False,
+                            capture_output=True, text=True, cwd=git_cwd())
+    return result.stdout.strip().lower()
+
+
+def read_trailer_index(connection, staged_paths=(), exclude_email=None):
+    """TrailerIndex رتبه‌بندی شده برای پیشوندهای staged_paths از نمایه ذخیره شده."""
+    prefixes = path_prefixes(staged_paths)
+    connection.execute("CREATE TEMP TABLE IF NOT EXISTS run_prefixes (prefix TEXT PRIMARY KEY)")
+    connection.execute("DELETE FROM run_prefixes")
+    connection.executemany("INSERT INTO run_prefixes VALUES (?)", [(prefix,) for prefix in prefixes])
+    rows = connection.execute(
+        "SELECT i.name, i.email, i.last_time, max(a.last_time) FROM identities i"
+        " LEFT JOIN activity a ON a.email = i.email AND a.prefix IN (SELECT prefix FROM run_prefixes)"
+        " GROUP BY i.email")
+    ranked = sorted((row for row in rows if row[1] != exclude_email),
+                    key=lambda row: (-(row[3] or 0), -row[2], row[0].lower()))
+    people = [f"{name} <{email}>" for name, email, _, _ in ranked]
+
+    history_keys = [display for (display,) in connection.execute(
+        "SELECT display FROM trailer_keys ORDER BY last_time DESC")]
+    default_keys = {key.lower() for key in DEFAULT_TRAILER_KEYS}
+    keys = list(DEFAULT_TRAILER_KEYS) + [key for key in history_keys if key.lower() not in default_keys]
+
+    values = {}
+    for (key,) in connection.execute("SELECT DISTINCT key FROM trailer_values"):
+        values[key] = [value for (value,) in connection.execute(
+            "SELECT value FROM trailer_values WHERE key = ? ORDER BY last_time DESC LIMIT ?",
+            (key, MAX_VALUES_PER_KEY))]
+    return TrailerIndex(people, keys, values)
+
+
+def load_trailer_index(staged_paths=(), git_dir=None):
+    """
+    نمایه را بروز کرده و TrailerIndex رتبه‌بندی شده برای staged_paths را برمی‌گرداند.
+    کاربر فعلی (git config user.email) پیشنهاد نمی‌شود.
+    """
+    if git_dir is None:
+        from git_utils import get_git_dir
+        git_dir = get_git_dir()
+    index_path = os.path.join(git_dir, TRAILER_INDEX_FILENAME) if git_dir else ':memory:'
+    connection = open_index(index_path)
+    try:
+        update_index(connection)
+        return read_trailer_index(connection, staged_paths, exclude_email=_read_user_email())
+    finally:
+        connection.close()
+
+
+def start_loading_trailer_index(staged_paths=()):
+    """
+    load_trailer_index را در یک thread پس‌زمینه اجرا می‌کند (همزمان با سوال‌های قبل از trailer ها).
+
+    Returns:
+        Future: نتیجه TrailerIndex یا None (خطاها هم به None تبدیل می‌شوند).
+    """
+    future = Future()
+    staged_paths = list(staged_paths)
+
+    def run():
+        try:
+            future.set_result(load_trailer_index(staged_paths))
+        except Exception as e:
+            print(f"Warning: Could not read the trailer index: {e}", file=sys.stderr)
+            future.set_result(None)
+
+    threading.Thread(target=run, name='cmsg-trailer-index', daemon=True).start()
+    return future
@@ -1,41 +1,156 @@
 # ui.py
 
 # Import necessary libraries
-from prompt_toolkit import prompt
-from prompt_toolkit.completion import WordCompleter
+from prompt_toolkit import PromptSession
+from prompt_toolkit.completion import Completer, Completion, WordCompleter
+from prompt_toolkit.history import InMemoryHistory
 from prompt_toolkit.validation import Validator, ValidationError
+import asyncio
 import sys
 import os
-import re # Import regular expressions for parsing branch name
 
 # Import messages for localization
 from messages import get_localized_message, MESSAGES
 
-# Import git utilities to get branch name (used in get_commit_issues)
-from git_utils import get_current_branch_name
+# Import git utilities (the git dir is used for the external editor's message file)
+from git_utils import get_git_dir
+
+# Commit type tables shared with the linter (defined in message_formatter, which has no prompt_toolkit import)
+from message_formatter import ORDERED_TYPE_KEYS, TYPE_KEY_TO_STRING, TYPE_STRING_TO_KEY
+
+# Import buffered output helpers for the preview
+from output_writer import write_lines, page_text, summarize_message_for_preview, DEFAULT_SUMMARY_PATHS
+
+# Import the shared issue key matcher (read_issue_candidates also runs without a TTY, see suggest_command.py)
+from issue_matcher import rank_issue_candidates, read_issue_candidates
+
+# Staged directories ranked by file count (also used by `git-cmsg suggest`)
+from change_analyzer import rank_scope_candidates
+
+# Trailer keys and line format (the history index itself is loaded in git_cmsg.py)
+from trailer_index import DEFAULT_TRAILER_KEYS, TRAILER_LINE_PATTERN, is_person_key
 
 # Import libraries for editing if confirm_commit allows editing
 import tempfile # For creating a temporary file
 import subprocess # For opening an external editor
 
+# File inside the git dir used for editing the message externally
+EDIT_MESSAGE_FILENAME = 'CMSG_EDITMSG'
+
+# --- Shared prompt session ---
+# All steps of the interactive flow run on one long-lived PromptSession, so the terminal
+# is detected and the Application is built only once instead of once per question.
+_prompt_session = None
+# One input history per step (type, subject, scope, ...), so Up only recalls earlier answers
+# to the same question instead of every answer given on the shared session
+_step_histories = {}
+
+
+def get_prompt_session():
+    """Returns the shared PromptSession, creating it on first use."""
+    global _prompt_session
+    if _prompt_session is None:
+        _prompt_session = PromptSession()
+    return _prompt_session
+
+
+def _use_step_history(session, step):
+    """
+    Switches the session to the history of step (None: a fresh, empty history).
+    The session's buffer keeps the history it was built with, so it is replaced there too;
+    prompt() resets the buffer and loads the new history before each question.
+    """
+    history = _step_histories.setdefault(step, InMemoryHistory()) if step else InMemoryHistory()
+    session.history = session.default_buffer.history = history
+
+
+def ask(message, multiline=False, validator=None, completer=None, bottom_toolbar=None, default='', step=None):
+    """
+    Asks one question on the shared session; step names the question's own input history.
+    PromptSession.prompt() treats None as "keep the previous value", so the per-question
+    options are assigned on the session directly to reset them between questions.
+    """
+    session = get_prompt_session()
+    _use_step_history(session, step)
+    session.validator = validator
+    session.completer = completer
+    session.bottom_toolbar = bottom_toolbar
+    return session.prompt(message, multiline=multiline, default=default)
+
+
+def ask_with_updates(message, updates, multiline=False, validator=None, completer=None,
+                     bottom_toolbar=None, default='', step=None):
+    """
+    Like ask(), but message is a callable that is redrawn whenever one of the futures in
+    updates finishes (e.g. a deeper analysis tier in progressive_analysis.py).
+    The prompt runs with prompt_async next to a task that awaits the futures; the task is
+    cancelled as soon as the question is answered, so later results no longer change it.
+    """
+    session = get_prompt_session()
+    _use_step_history(session, step)
+    session.validator = validator
+    session.completer = completer
+    session.bottom_toolbar = bottom_toolbar
+
+    async def redraw_on_updates():
+        for future in updates:
+            try:
+                # shield: cancelling this task must not cancel the analysis future itself
+                await asyncio.shield(asyncio.wrap_future(future))
+            except Exception:
+                continue  # A failed tier keeps the previous suggestion
+            session.app.invalidate()
+
+    async def run():
+        watcher = asyncio.ensure_future(redraw_on_updates())
+        try:
+            return await session.prompt_async(message, multiline=multiline, default=default)
+        finally:
+            watcher.cancel()
+
+    return asyncio.run(run())
+
+
+def _suggestion_text(suggestion):
+    """A suggestion is either a string or a callable returning the current one (progressive analysis)."""
+    return suggestion() if callable(suggestion) else suggestion
+
+
+def _ask_suggested(message, updates, **kwargs):
+    """Asks with ask_with_updates while analysis results are pending, otherwise with ask()."""
+    if updates:
+        return ask_with_updates(message, updates, **kwargs)
+    return ask(message(), **kwargs)
+
+
+def build_context_toolbar(commit_type, commit_subject=None, commit_scope=None, commit_body=None):
+    """
+    Builds the one-line summary of the answers so far, shown in the bottom toolbar.
+    The toolbar is redrawn in place, so the context is not reprinted above every question.
+    """
+    parts = [f"Type: {commit_type}"]
+    if commit_subject is not None:
+        parts.append(f"Subject: {commit_subject}")
+    if commit_scope is not None:
+        parts.append(f"Scope: {commit_scope if commit_scope else '(skipped)'}")
+    if commit_body is not None:
+        parts.append(f"Body: {'(skipped)' if not commit_body.strip() else '...'}")
+    return " | ".join(parts)
+
+
 # --- Validator for Commit Type ---
 class TypeValidator(Validator):
     def validate(self, document):
         text = document.text
         try:
             type_index = int(text)
-            # Ensure this list matches the order and keys in messages.py
-            ordered_type_keys = [
-                'type_feat', 'type_fix', 'type_chore', 'type_refactor',
-                'type_docs', 'type_style', 'type_test'
-            ]
-            if 1 <= type_index <= len(ordered_type_keys):
+            if 1 <= type_index <= len(ORDERED_TYPE_KEYS):
                 return # Input is a valid number for a type
             else:
                 # If number is out of range, raise validation error with message
                 raise ValidationError(
                     message=get_localized_message("invalid_type_choice", 'en', # Use a fallback language for validator messages
-                                                valid_range=f"1-{len(ordered_type_keys)}"),
+                                                valid_range=f"1-{len(ORDERED_TYPE_KEYS)}"),
                     cursor_position=len(text)) # Keep cursor at the end
 
         except ValueError:
@@ -46,54 +161,53 @@ class TypeValidator(Validator):
 
 
 # --- Function to get Commit Type ---
-def get_commit_type(language_code, suggested_type=""):
-    """Prompts user for commit type and returns the selected type string."""
-
-    # Ensure this list matches the order and keys in messages.py and TypeValidator
-    ordered_type_keys = [
-        'type_feat', 'type_fix', 'type_chore', 'type_refactor',
-        'type_docs', 'type_style', 'type_test'
-    ]
-    # Map the message key to the actual conventional commit string
-    type_key_to_string = {
-        'type_feat': 'feat', 'type_fix': 'fix', 'type_chore': 'chore',
-        'type_refactor': 'refactor', 'type_docs': 'docs',
-        'type_style': 'style', 'type_test': 'test'
-    }
-    # معکوس نگاشت بالا برای پیدا کردن کلید از نوع کامیت
-    type_string_to_key = {v: k for k, v in type_key_to_string.items()}
-
-    # Build the prompt message with numbered options
-    prompt_message = f"{get_localized_message('prompt_type', language_code)}\n"
-    
-    # اضافه کردن پیشنهاد به پیام، اگر وجود داشته باشد - بدون شماره
-    if suggested_type and suggested_type in type_string_to_key:
-        suggested_key = type_string_to_key[suggested_type]
-        suggested_desc = get_localized_message(suggested_key, language_code)
-        
-        suggestion_message = get_localized_message('suggestion', language_code)
-        prompt_message += f"{suggestion_message}: {suggested_desc}\n"
-    
-    # ادامه با نمایش گزینه‌ها
-    for i, key in enumerate(ordered_type_keys):
-        # Get localized description for each type
-        localized_type_desc = get_localized_message(key, language_code)
-        prompt_message += f"{i + 1}. {localized_type_desc}\n" # Add numbered option
-
-    prompt_message += "> " # Add input indicator
+def get_commit_type(language_code, suggested_type="", updates=(), default_type=None):
+    """
+    Prompts user for commit type and returns the selected type string.
+    suggested_type may be a callable; the prompt is then redrawn when a future in updates finishes.
+    default_type (e.g. from `git config cmsg.defaultType`) pre-fills its number, so Enter selects it.
+    """
+    default_number = ''
+    if default_type in TYPE_STRING_TO_KEY:
+        default_number = str(ORDERED_TYPE_KEYS.index(TYPE_STRING_TO_KEY[default_type]) + 1)
+
+    def prompt_message():
+        # Build the prompt message with numbered options
+        message = f"{get_localized_message('prompt_type', language_code)}\n"
+
+        # اضافه کردن پیشنهاد به پیام، اگر وجود داشته باشد - بدون شماره
+        current_type = _suggestion_text(suggested_type)
+        if current_type and current_type in TYPE_STRING_TO_KEY:
+            suggested_key = TYPE_STRING_TO_KEY[current_type]
+            suggested_desc = get_localized_message(suggested_key, language_code)
+
+            suggestion_message = get_localized_message('suggestion', language_code)
+            message += f"{suggestion_message}: {suggested_desc}\n"
+
+        # ادامه با نمایش گزینه‌ها
+        for i, key in enumerate(ORDERED_TYPE_KEYS):
+            # Get localized description for each type
+            localized_type_desc = get_localized_message(key, language_code)
+            message += f"{i + 1}. {localized_type_desc}\n" # Add numbered option
+
+        return message + "> " # Add input indicator
 
     # Loop until valid input is received
     while True:
         try:
-            # Use prompt from prompt_toolkit
-            user_input = prompt(
-                prompt_message # The question with options
+            # Ask on the shared prompt session
+            user_input = _ask_suggested(
+                prompt_message, # The question with options
+                [future for future in updates if not future.done()],
+                validator=TypeValidator(),
+                default=default_number,
+                step='type'
             ).strip()
 
             # Convert valid input (which passed validation) to the actual type string
             type_index = int(user_input)
-            selected_key = ordered_type_keys[type_index - 1] # Get key from 0-based index
-            return type_key_to_string[selected_key] # Return the standard type string (e.g., 'feat')
+            selected_key = ORDERED_TYPE_KEYS[type_index - 1] # Get key from 0-based index
+            return TYPE_KEY_TO_STRING[selected_key] # Return the standard type string (e.g., 'feat')
 
         except (ValueError, IndexError, ValidationError):
              # Validator prints the error message, so just continue the loop if validation failed
@@ -101,24 +215,30 @@ def get_commit_type(language_code, suggested_type=""):
 
 
 # --- Function to get Commit Subject ---
-def get_commit_subject(language_code, commit_type, suggested_subject=""):
-    """Prompts user for commit subject."""
-
-    # Build the prompt message
-    prompt_message = f"Type: {commit_type}\n"
-    prompt_message += f"{get_localized_message('prompt_subject', language_code)}\n"
-    
-    # اضافه کردن پیشنهاد به پیام، اگر وجود داشته باشد
-    if suggested_subject:
-        suggestion_message = get_localized_message('suggestion', language_code)
-        prompt_message += f"{suggestion_message}: {suggested_subject}\n"
-    
-    # اضافه کردن راهنمای موضوع
-    prompt_message += f"{get_localized_message('hint_subject', language_code)}\n"
-    prompt_message += "> " # Input indicator
+def get_commit_subject(language_code, commit_type, suggested_subject="", updates=(), default=''):
+    """
+    Prompts user for commit subject (suggested_subject may be a callable, see get_commit_type).
+    default pre-fills the input (e.g. HEAD's subject for --amend).
+    """
 
-    # Get user input using prompt_toolkit
-    user_input = prompt(prompt_message).strip()
+    def prompt_message():
+        # Build the prompt message (answers so far are shown in the bottom toolbar)
+        message = f"{get_localized_message('prompt_subject', language_code)}\n"
+
+        # اضافه کردن پیشنهاد به پیام، اگر وجود داشته باشد
+        current_subject = _suggestion_text(suggested_subject)
+        if current_subject:
+            suggestion_message = get_localized_message('suggestion', language_code)
+            message += f"{suggestion_message}: {current_subject}\n"
+
+        # اضافه کردن راهنمای موضوع
+        message += f"{get_localized_message('hint_subject', language_code)}\n"
+        return message + "> " # Input indicator
+
+    # Get user input on the shared prompt session
+    user_input = _ask_suggested(prompt_message, [future for future in updates if not future.done()],
+                                bottom_toolbar=build_context_toolbar(commit_type), default=default,
+                                step='subject').strip()
 
     return user_input
 
@@ -146,111 +266,126 @@ def generate_scope_suggestions(staged_files):
     return sorted_suggestions[:5]
 
 
-# --- Function to get Commit Scope (with more guidance) ---
-def get_commit_scope(language_code, commit_type, commit_subject, staged_files, suggested_scope=""):
-    """Prompts user for commit scope, providing suggestions based on staged files."""
-
-    # Generate suggestions based on staged files
-    suggestions = generate_scope_suggestions(staged_files)
-
-    # --- Build the prompt message with improved structure ---
-    prompt_message = f"Type: {commit_type}\n"
-    prompt_message += f"Subject: {commit_subject}\n"
-    prompt_message += f"{get_localized_message('prompt_scope', language_code)}\n"
-    
-    # اضافه کردن پیشنهاد به پیام، اگر وجود داشته باشد
-    if suggested_scope:
-        suggestion_message = get_localized_message('suggestion', language_code)
-        prompt_message += f"{suggestion_message}: {suggested_scope}\n"
+# --- Scope completion: staged directories first, then every directory and package in the repository ---
+class ScopeCompleter(Completer):
+    """
+    Completes the scope from the staged directories (ranked by file count) and then from the
+    repository-wide PathIndex (path_index.py). scope_index is a callable returning the index, or
+    None while it is still loading in the background; completion never waits for it.
+    """
 
-    # --- توضیحات کوتاه‌تر و مختصرتر (فقط به زبان کاربر) ---
-    if language_code == 'fa':
-        prompt_message += f"{get_localized_message('scope_explanation_short_fa', language_code)}\n"
-    else:
-        prompt_message += f"{get_localized_message('scope_explanation_short_en', language_code)}\n"
+    def __init__(self, staged_scopes, scope_index=None):
+        self.staged_scopes = staged_scopes
+        self.scope_index = scope_index
+
+    def get_completions(self, document, complete_event):
+        text = document.text_before_cursor
+        query = text.strip().lower()
+        seen = set()
+        candidates = [scope for scope in self.staged_scopes if query in scope.lower()]
+        index = self.scope_index() if self.scope_index else None
+        if index is not None:
+            candidates += index.lookup(query)
+        for scope in candidates:
+            if scope not in seen:
+                seen.add(scope)
+                # The whole input is one scope, so the completion replaces all of it
+                yield Completion(scope, start_position=-len(text))
 
-    # Add suggestions if any
-    if suggestions:
-        suggestions_header = get_localized_message('suggestions_header', language_code)
-        # Format suggestions as a comma-separated list
-        prompt_message += f"{suggestions_header}: {', '.join(suggestions)}\n"
 
-    # Add the optional/skip guideline
-    prompt_message += f"{get_localized_message('hint_skip', language_code)}\n"
-    prompt_message += "> " # Input indicator
+# --- Function to get Commit Scope (with more guidance) ---
+def get_commit_scope(language_code, commit_type, commit_subject, staged_files, suggested_scope="", updates=(),
+                     default='', scope_index=None):
+    """
+    Prompts user for commit scope, providing suggestions based on staged files
+    (suggested_scope may be a callable, see get_commit_type). default pre-fills the input.
+    scope_index (optional) returns the repository's PathIndex for Tab completion (see ScopeCompleter).
+    """
 
-    # Get user input using prompt_toolkit
-    user_input = prompt(prompt_message).strip()
+    # Generate suggestions based on staged files
+    suggestions = generate_scope_suggestions(staged_files)
+    completer = ScopeCompleter(rank_scope_candidates(staged_files), scope_index)
+
+    def prompt_message():
+        # --- Build the prompt message with improved structure (context goes to the toolbar) ---
+        message = f"{get_localized_message('prompt_scope', language_code)}\n"
+
+        # اضافه کردن پیشنهاد به پیام، اگر وجود داشته باشد
+        current_scope = _suggestion_text(suggested_scope)
+        if current_scope:
+            suggestion_message = get_localized_message('suggestion', language_code)
+            message += f"{suggestion_message}: {current_scope}\n"
+
+        # --- توضیحات کوتاه‌تر و مختصرتر (فقط به زبان کاربر) ---
+        if language_code == 'fa':
+            message += f"{get_localized_message('scope_explanation_short_fa', language_code)}\n"
+        else:
+            message += f"{get_localized_message('scope_explanation_short_en', language_code)}\n"
+
+        # Add suggestions if any
+        if suggestions:
+            suggestions_header = get_localized_message('suggestions_header', language_code)
+            # Format suggestions as a comma-separated list
+            message += f"{suggestions_header}: {', '.join(suggestions)}\n"
+
+        # Add the optional/skip guideline
+        message += f"{get_localized_message('hint_skip', language_code)}\n"
+        return message + "> " # Input indicator
+
+    # Get user input on the shared prompt session
+    user_input = _ask_suggested(prompt_message, [future for future in updates if not future.done()],
+                                completer=completer,
+                                bottom_toolbar=build_context_toolbar(commit_type, commit_subject),
+                                default=default, step='scope').strip()
 
     return user_input
 
 
 # --- Function to get Commit Body (Full Description) ---
-def get_commit_body(language_code, commit_type, commit_subject, commit_scope):
-    """Prompts user for commit body (multi-line input)."""
-
-    # Build the prompt message
-    prompt_message = f"Type: {commit_type}\n"
-    prompt_message += f"Subject: {commit_subject}\n"
-    prompt_message += f"Scope: {commit_scope if commit_scope else '(skipped)'}\n"
-    prompt_message += f"{get_localized_message('prompt_body', language_code)}\n"
+def get_commit_body(language_code, commit_type, commit_subject, commit_scope, default=''):
+    """Prompts user for commit body (multi-line input); default pre-fills the input."""
+
+    # Build the prompt message (answers so far are shown in the bottom toolbar)
+    prompt_message = f"{get_localized_message('prompt_body', language_code)}\n"
     prompt_message += f"{get_localized_message('hint_body', language_code)}\n"
     prompt_message += "> " # Input indicator
 
-    # Use prompt_toolkit.prompt with multiline=True for multi-line input
-    user_input = prompt(prompt_message, multiline=True).strip()
+    # Use multiline=True on the shared session for multi-line input
+    user_input = ask(prompt_message, multiline=True,
+                     bottom_toolbar=build_context_toolbar(commit_type, commit_subject, commit_scope),
+                     default=default, step='body').strip()
 
     return user_input
 
 
-# --- Function to generate Issue Suggestions from branch name ---
-def generate_issue_suggestions_from_branch(branch_name):
-    """Generates potential issue number suggestions from a branch name."""
-    suggestions = set() # Use a set for unique suggestions
-
-    # Return empty list if no branch name or detached HEAD
-    if not branch_name or branch_name == 'HEAD':
-        return []
-
-    # Common patterns in branch names for issue numbers
-    issue_number_pattern = re.compile(r'[^0-9](\d+)([^0-9]|$)|(^(\d+))')
-
-    # Find all potential issue numbers in the branch name
-    found_matches = issue_number_pattern.findall(branch_name)
-    numbers = []
-    for match in found_matches:
-        # In the regex, the number is either in group 1 or group 4
-        if match[0] and match[1]: # If first part of regex matched (e.g., non-digit followed by digits)
-             numbers.append(match[1]) # The number is in group 1
-        elif match[3]: # If second part of regex matched (start of string followed by digits)
-             numbers.append(match[3]) # The number is in group 4
-
-    # Format as #issue_number
-    for num_str in numbers:
-        suggestions.add(f"#{num_str}") # Suggest format like #123
-
-    # Convert set to sorted list
-    sorted_suggestions = sorted(list(suggestions))
-    # Limit to a reasonable number, e.g., first 3 (کاهش تعداد پیشنهادها)
-    return sorted_suggestions[:3]
+# --- Function to generate Issue Suggestions from branch name and recent history ---
+def generate_issue_suggestions_from_branch(branch_name, reflog_entries=(), commit_footers=()):
+    """
+    Generates issue key suggestions (#123, PAY-1234, !42, ...) from the branch name
+    and, optionally, recent reflog entries and commit footers.
+    Candidates are ranked by recency (branch name first, then newest history first).
+    """
+    # All tracker patterns are compiled once into a single matcher (see issue_matcher.py)
+    return rank_issue_candidates(branch_name, reflog_entries, commit_footers)
 
 
 # --- Function to get Commit Issues (with more guidance) ---
-def get_commit_issues(language_code, commit_type, commit_subject, commit_scope, commit_body):
-    """Prompts user for related issues, providing suggestions from the branch name."""
-
-    # Get current branch name using the git_utils function
-    branch_name = get_current_branch_name()
+def get_commit_issues(language_code, commit_type, commit_subject, commit_scope, commit_body, candidates=None,
+                      default=''):
+    """
+    Prompts user for related issues, providing suggestions from the branch name.
+    default pre-fills the input (e.g. HEAD's footers for --amend).
+    """
 
-    # Generate issue suggestions based on branch name
-    suggestions = generate_issue_suggestions_from_branch(branch_name)
+    # Generate issue suggestions (all candidates are offered as completions)
+    # The candidates may already have been read in the background (progressive_analysis)
+    if candidates is None:
+        candidates = read_issue_candidates()
+    # Only show the most recent few in the prompt text (کاهش تعداد پیشنهادها)
+    suggestions = candidates[:3]
 
-    # --- Build the prompt message with improved structure ---
-    prompt_message = f"Type: {commit_type}\n"
-    prompt_message += f"Subject: {commit_subject}\n"
-    prompt_message += f"Scope: {commit_scope if commit_scope else '(skipped)'}\n"
-    prompt_message += f"Body: {'(skipped)' if not commit_body.strip() else '...'}\n"
-    prompt_message += f"{get_localized_message('prompt_issues', language_code)}\n"
+    # --- Build the prompt message with improved structure (context goes to the toolbar) ---
+    prompt_message = f"{get_localized_message('prompt_issues', language_code)}\n"
 
     # --- توضیحات کوتاه‌تر و مختصرتر (فقط به زبان کاربر) ---
     if language_code == 'fa':
@@ -268,32 +403,124 @@ def get_commit_issues(language_code, commit_type, commit_subject, commit_scope,
     prompt_message += f"{get_localized_message('hint_issues', language_code)}\n"
     prompt_message += "> " # Input indicator
 
-    # Get user input using prompt_toolkit
-    user_input = prompt(prompt_message).strip()
+    # Get user input on the shared prompt session (Tab completes any issue candidate)
+    # WORD=True so keys like '#123' and '!42' are completed as whole words
+    completer = WordCompleter(candidates, WORD=True) if candidates else None
+    user_input = ask(prompt_message, completer=completer,
+                     bottom_toolbar=build_context_toolbar(
+                         commit_type, commit_subject, commit_scope, commit_body),
+                     default=default, step='issues').strip()
 
     return user_input
 
 
+# --- Trailer completion: keys, then people or earlier values from the history index ---
+class TrailerCompleter(Completer):
+    """
+    Completes one trailer line: first the key ("Co-a" -> "Co-authored-by: "), then the value:
+    people ("Name <email>", ranked by recent work under the staged paths) for person trailers,
+    issue keys and earlier values of the same key for the others (e.g. Refs).
+    trailer_index is a callable returning the TrailerIndex (trailer_index.py), or None while it
+    is still loading in the background; completion never waits for it.
+    """
+
+    def __init__(self, trailer_index=None, issue_candidates=()):
+        self.trailer_index = trailer_index
+        self.issue_candidates = list(issue_candidates)
+
+    def get_completions(self, document, complete_event):
+        text = document.text_before_cursor
+        index = self.trailer_index() if self.trailer_index else None
+        key, separator, value = text.partition(':')
+        if not separator:
+            keys = index.lookup_keys(text) if index is not None else [
+                default for default in DEFAULT_TRAILER_KEYS if default.lower().startswith(text.strip().lower())]
+            for trailer_key in keys:
+                yield Completion(f"{trailer_key}: ", start_position=-len(text), display=trailer_key)
+            return
+        query = value.strip()
+        if is_person_key(key):
+            candidates = index.lookup_people(query) if index is not None else []
+        else:
+            candidates = [issue for issue in self.issue_candidates if query.lower() in issue.lower()]
+            if index is not None:
+                candidates += index.lookup_values(key, query)
+        seen = set()
+        for candidate in candidates:
+            if candidate not in seen:
+                seen.add(candidate)
+                # Replaces everything after the colon
+                yield Completion(f" {candidate}", start_position=-len(value), display=candidate)
+
+
+# --- Function to get Commit Trailers (one per question, Enter on an empty line finishes) ---
+def get_commit_trailers(language_code, commit_type, commit_subject, commit_scope, commit_body,
+                        trailer_index=None, issue_candidates=(), default=''):
+    """
+    Prompts for trailer lines ("Co-authored-by: Name <email>", "Reviewed-by: ...", "Refs: ...")
+    until an empty answer. trailer_index (optional) returns the history index for Tab completion.
+    default (optional): trailer lines kept from a previous run (git-cmsg --resume); they are
+    printed and further lines are appended to them.
+
+    Returns:
+        str: The trailer lines joined by newlines (empty if none were entered).
+    """
+    completer = TrailerCompleter(trailer_index, issue_candidates)
+    trailers = [line for line in default.split('\n') if line]
+    for line in trailers:
+        print(f"> {line}")
+    while True:
+        prompt_message = f"{get_localized_message('prompt_trailers', language_code)}\n"
+        if not trailers:
+            prompt_message += f"{get_localized_message('hint_trailers', language_code)}\n"
+        prompt_message += "> " # Input indicator
+
+        user_input = ask(prompt_message, completer=completer,
+                         bottom_toolbar=build_context_toolbar(
+                             commit_type, commit_subject, commit_scope, commit_body),
+                         step='trailers').strip()
+        if not user_input:
+            return "\n".join(trailers)
+        if TRAILER_LINE_PATTERN.match(user_input):
+            trailers.append(user_input)
+        else:
+            print(get_localized_message('invalid_trailer', language_code, line=user_input))
+
+
 # --- Function to display final preview and confirm ---
-def confirm_commit(commit_message_string, language_code):
+def confirm_commit(commit_message_string, language_code, full_view=False,
+                   preview_paths=DEFAULT_SUMMARY_PATHS, on_refresh=None):
     """
     Displays the final commit message preview and asks for user confirmation.
     Allows editing the message externally.
+
+    The preview shows the header, body and footer with a summarized file list,
+    unless full_view is True. 'f' shows the full message through a pager.
+    The preview is only reprinted when the message has changed (after an edit or refresh).
+
+    on_refresh (callable, optional): called with the current message when the user
+    chooses 'r' (e.g. after `git add` in another terminal); returns the updated
+    message, or None if nothing changed.
     """
-    while True: # Loop until user confirms, aborts, or edits successfully
-        # Display the formatted message preview
-        preview_header = get_localized_message('preview_header', language_code)
-        confirm_prompt_text = get_localized_message('confirm_prompt', language_code)
+    preview_header = get_localized_message('preview_header', language_code)
+    confirm_prompt_text = get_localized_message('confirm_prompt', language_code)
+    show_preview = True
 
-        # Use print for the multi-line message preview
-        print(f"\n{preview_header}\n{'-' * 30}") # Header and separator
-        print(commit_message_string) # The actual message
-        print(f"{'-' * 30}\n") # Separator
+    while True: # Loop until user confirms, aborts, or edits successfully
+        if show_preview:
+            # Display the formatted message preview with a single buffered write
+            if full_view:
+                preview = commit_message_string
+            else:
+                preview = summarize_message_for_preview(commit_message_string, language_code, preview_paths)
+            write_lines([f"\n{preview_header}", '-' * 30, preview, f"{'-' * 30}\n"])
+            show_preview = False
 
         # Get user input for confirmation
         try:
-            user_choice = prompt(
-                f"{confirm_prompt_text} "
+            user_choice = ask(
+                f"{confirm_prompt_text} ",
+                step='confirm'
             ).strip().lower()
 
             if user_choice == 'y':
@@ -303,19 +530,31 @@ def confirm_commit(commit_message_string, language_code):
                 print(get_localized_message('commit_aborted', language_code), file=sys.stderr)
                 return None # User aborts
 
+            elif user_choice == 'r' and on_refresh is not None:
+                # Re-read the index and update the file list and suggestions in place
+                refreshed_message = on_refresh(commit_message_string)
+                if refreshed_message is not None and refreshed_message != commit_message_string:
+                    commit_message_string = refreshed_message
+                    show_preview = True
+
+            elif user_choice == 'f':
+                # Show the whole message (including the full file list) through the pager
+                page_text(commit_message_string)
+
             elif user_choice == 'e':
                 # User wants to edit externally
                 edited_message = edit_message_externally(commit_message_string)
                 if edited_message is not None:
-                     # If editing was successful, update the message and loop to show preview again
+                     # If editing was successful, update the message and show the preview again
                      commit_message_string = edited_message
+                     show_preview = True
                 else:
                      # If editing failed or was cancelled in editor, prompt again
                      print("Editing cancelled or failed. Please try again or choose y/n.", file=sys.stderr)
 
             else:
                 # Invalid input, prompt again
-                print("Invalid choice. Please enter 'y', 'n', or 'e'.", file=sys.stderr)
+                print("Invalid choice. Please enter 'y', 'n', 'e', 'f' or 'r'.", file=sys.stderr)
 
         except EOFError: # User pressed Ctrl+D
             print("\nCommit process aborted by user.", file=sys.stderr)
@@ -337,17 +576,25 @@ def edit_message_externally(initial_message):
              os.environ.get('EDITOR') or \
              'nano' # Default to nano if no editor is set
 
-    # Create a temporary file to write the message to
-    with tempfile.NamedTemporaryFile(mode='w+', suffix=".gitmessage", delete=False, encoding='utf-8') as tmp_file:
-        tmp_file_path = tmp_file.name
-        tmp_file.write(initial_message)
-        tmp_file.flush() # Ensure all data is written to disk before opening editor
+    # Write the message to CMSG_EDITMSG inside the git dir (like git's own COMMIT_EDITMSG),
+    # so no temporary file has to be created and cleaned up in the system temp dir.
+    # Falls back to a temporary file when the git dir cannot be determined.
+    git_dir = get_git_dir()
+    if git_dir:
+        tmp_file_path = os.path.join(git_dir, EDIT_MESSAGE_FILENAME)
+        with open(tmp_file_path, 'w', encoding='utf-8') as tmp_file:
+            tmp_file.write(initial_message)
+    else:
+        with tempfile.NamedTemporaryFile(mode='w+', suffix=".gitmessage", delete=False, encoding='utf-8') as tmp_file:
+            tmp_file_path = tmp_file.name
+            tmp_file.write(initial_message)
+            tmp_file.flush() # Ensure all data is written to disk before opening editor
 
     try:
-        # Open the editor with the temporary file
+        # Open the editor with the message file
         subprocess.run(f'{editor} "{tmp_file_path}"', shell=True, check=True)
 
-        # Read the edited content back from the temporary file
+        # Read the edited content back from the message file
         with open(tmp_file_path, 'r', encoding='utf-8') as tmp_file:
             edited_message = tmp_file.read().strip() # Read all content and remove leading/trailing whitespace
 
@@ -367,6 +614,6 @@ def edit_message_externally(initial_message):
         return None # Indicate editing failed
 
     finally:
-        # Ensure the temporary file is deleted regardless of success, failure, or exceptions
+        # Ensure the message file is deleted regardless of success, failure, or exceptions
         if os.path.exists(tmp_file_path):
-            os.unlink(tmp_file_path) # Delete the temporary file
\ No newline at end of file
+            os.unlink(tmp_file_path) # Delete the message file
\ No newline at end of file